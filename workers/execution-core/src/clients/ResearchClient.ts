@@ -0,0 +1,38 @@
+export type ResearchTicket = {
+    ticket_id: string;
+    asset: string;
+    decision: string;
+    status: "pending" | "ready" | "failed";
+    summary: string | null;
+    error: string | null;
+    created_at: number;
+    completed_at: number | null;
+};
+
+/**
+ * Deferred Kimi research from the Python Strategy Engine.
+ * Evaluations return a research_ticket straight away; the summary is
+ * written in the background and fetched here by ticket id.
+ */
+export class ResearchClient {
+    static readonly MAX_WAIT_SECONDS = 30;
+
+    constructor(private engine: Fetcher) { }
+
+    /**
+     * Ticket as it stands after long-polling up to waitSeconds (0 = don't wait).
+     * Returns null for unknown/expired tickets or an unavailable engine.
+     */
+    async getTicket(ticketId: string, waitSeconds = 0): Promise<ResearchTicket | null> {
+        const wait = Math.min(Math.max(waitSeconds, 0), ResearchClient.MAX_WAIT_SECONDS);
+        const url = `http://strategy-engine/research/ticket?id=${encodeURIComponent(ticketId)}&wait=${wait}`;
+        try {
+            const resp = await this.engine.fetch(url);
+            if (!resp.ok) return null;
+            return await resp.json() as ResearchTicket;
+        } catch (err) {
+            console.error(`Research ticket ${ticketId} fetch failed:`, err);
+            return null;
+        }
+    }
+}
@@ -1,5 +1,6 @@
 import { Context } from 'hono';
 import { Bindings } from '../bindings';
+import { ResearchClient } from '../clients/ResearchClient';
 
 export class ResearchController {
 
@@ -16,6 +17,8 @@ export class ResearchController {
             }
 
             const snapshot: any = await resp.json();
+            // Kimi analysis is deferred; return the ticket now rather than wait on the LLM
+            const aiAnalysis = snapshot.ai_analysis || null;
             const fund = snapshot.fundamentals || {};
             const price = fund.price || 0;
             const intrinsic = fund.intrinsic_value || 0;
@@ -37,7 +40,8 @@ export class ResearchController {
                 },
                 methodology: "SignalOps Research Core (Python/Kimi) - Real Data Only",
                 timestamp: snapshot.timestamp,
-                ai_analysis: snapshot.ai_analysis // Pass through Kimi analysis
+                ai_analysis: aiAnalysis, // Kimi analysis (null while still being written)
+                research_ticket: snapshot.research_ticket // Poll /api/v1/research/ticket?id=... if ai_analysis is null
             });
 
         } catch (e: any) {
@@ -45,6 +49,28 @@ export class ResearchController {
         }
     }
 
+    /**
+     * GET /api/v1/research/ticket?id=...&wait=N
+     * Deferred Kimi research for a research_ticket; wait long-polls up to N seconds.
+     */
+    async getResearchTicket(c: Context<{ Bindings: Bindings }>) {
+        try {
+            const ticketId = c.req.query('id');
+            if (!ticketId) return c.json({ error: "Missing research ticket id" }, 400);
+
+            const wait = Number(c.req.query('wait') || "0");
+            if (!Number.isFinite(wait) || wait < 0) {
+                return c.json({ error: "wait must be a non-negative number of seconds" }, 400);
+            }
+
+            const ticket = await new ResearchClient(c.env.STRATEGY_ENGINE).getTicket(ticketId, wait);
+            if (!ticket) return c.json({ error: "Unknown research ticket" }, 404);
+            return c.json(ticket);
+        } catch (e: any) {
+            return c.json({ error: e.message }, 500);
+        }
+    }
+
     async getPredictionMarket(c: Context<{ Bindings: Bindings }>) {
         try {
             // Proxy to Python for consistency (it has the Polymerket Feed)
@@ -60,12 +60,17 @@ export class StrategyController {
                     let strength = 0.0;
                     let reason = "Insufficient Data";
                     let aiResearch = "Not available";
+                    let researchTicket: string | null = null;
 
                     if (strategyResult && strategyResult.decision) {
                         signal = strategyResult.decision; // BUY, SELL, HOLD
                         strength = strategyResult.confidence;
                         reason = JSON.stringify(strategyResult.reasoning);
-                        aiResearch = strategyResult.research_summary || "AI Analysis Pending";
+                        // Kimi research is deferred: the engine returns a ticket and writes the summary later.
+                        // Never wait on it here; the client polls /api/v1/research/ticket?id=...
+                        researchTicket = strategyResult.research_ticket || null;
+                        aiResearch = strategyResult.research_summary
+                            || (researchTicket ? "AI Analysis Pending" : "Not available");
 
                         // Safety Override: High Risk Event
                         // (Redundant check if Python Engine does it, but good for safety depth)
@@ -92,6 +97,7 @@ export class StrategyController {
                         current_price: quote.price,
                         reason: reason,
                         research_report: aiResearch,
+                        research_ticket: researchTicket,
                         source: "Kimi K2.5 Research Core"
                     };
 
@@ -74,6 +74,7 @@ const research = new Hono<{ Bindings: Bindings }>()
 research.get('/intrinsic-value', (c) => researchController.getIntrinsicValue(c))
 research.get('/prediction', (c) => researchController.getPredictionMarket(c))
 research.get('/decision-tree', (c) => researchController.getDecisionTree(c))
+research.get('/ticket', (c) => researchController.getResearchTicket(c))
 app.route('/api/v1/research', research)
 
 // User Group (New: UI Persistence)
@@ -18,7 +18,7 @@ Example from README:
 - Outcome: BTC dropped 12% more (SVB collapse)
 """
 
-from agents.base_agent import BaseAgent, Signal
+from agents.base_agent import BaseAgent, Signal, SignalFrame
 from typing import Dict, Optional
 from datetime import datetime
 
@@ -141,6 +141,21 @@ class FundamentalAgent(BaseAgent):
             price=price
         )
 
+    def generate_signals(self, bars: Dict, event_data: Optional[Dict] = None) -> SignalFrame:
+        """
+        Vectorized signal over a price series.
+
+        The Graham checks only read the unified snapshot (fundamentals,
+        events, technicals), not the bar price, so one evaluation is
+        broadcast across every bar.
+        """
+        frame = SignalFrame.empty(len(bars['price']))
+        signal = self.generate_signal({'unified': bars.get('unified')})
+        if signal:
+            frame.action[:] = {'BUY': 1, 'SELL': -1}.get(signal.action, 0)
+            frame.confidence[:] = signal.confidence
+        return frame
+
     def _check_value_criteria(self, unified: Dict) -> tuple[bool, str]:
         """
         Check Benjamin Graham's value criteria.
@@ -3,7 +3,7 @@ Event-driven trading agent using prediction market probabilities.
 """
 
 from typing import Dict, Optional
-from agents.base_agent import BaseAgent, Signal
+from agents.base_agent import BaseAgent, Signal, SignalFrame
 
 
 class PredictionMarketAgent(BaseAgent):
@@ -102,6 +102,16 @@ class PredictionMarketAgent(BaseAgent):
         )
 
 
+    def generate_signals(self, bars, event_data=None):
+        """
+        Vectorized signal over a price series.
+
+        Without event data generate_signal never fires, so every bar is
+        empty. The vectorized path never passes event data.
+        """
+        return SignalFrame.empty(len(bars['price']))
+
+
 class FedHikeAgent(BaseAgent):
     """
     Specialized agent focused only on Fed rate decisions.
@@ -1,8 +1,14 @@
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from typing import Dict, Optional
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+import inspect
 import math
 
+try:
+    import numpy as np
+except ImportError:  # Vectorized signal paths are unavailable without NumPy
+    np = None
+
 @dataclass
 class Signal:
     timestamp: float
@@ -13,6 +19,61 @@ class Signal:
     reason: str
     agent_name: str
     price: float
+    metadata: Dict = field(default_factory=dict)
+
+
+@dataclass
+class SignalFrame:
+    """
+    Column-wise signals for a whole price series (one row per bar).
+
+    action uses 1 for BUY, -1 for SELL and 0 for HOLD. confidence is NaN
+    on bars where the agent produced no signal (generate_signal -> None).
+    """
+    action: Any
+    confidence: Any
+
+    @classmethod
+    def empty(cls, n: int) -> 'SignalFrame':
+        """Frame with no signal on any of the n bars."""
+        return cls(action=np.zeros(n, dtype=np.int8), confidence=np.full(n, np.nan))
+
+    @property
+    def has_signal(self):
+        return ~np.isnan(self.confidence)
+
+
+def rolling_mean(values, window: int):
+    """
+    Trailing mean over `window` bars, NaN until the window is full.
+
+    Windows are summed left to right, in the same order as the per-bar
+    agents' sum(slice), so vectorized and looped signals match exactly.
+    """
+    out = np.full(len(values), np.nan)
+    count = len(values) - window + 1
+    if count <= 0:
+        return out
+    total = values[:count].copy()
+    for offset in range(1, window):
+        total += values[offset:offset + count]
+    out[window - 1:] = total / window
+    return out
+
+
+def rolling_std(values, window: int, mean):
+    """Trailing population std-dev around a precomputed rolling_mean."""
+    out = np.full(len(values), np.nan)
+    count = len(values) - window + 1
+    if count <= 0:
+        return out
+    centre = mean[window - 1:]
+    total = (values[:count] - centre) ** 2
+    for offset in range(1, window):
+        total += (values[offset:offset + count] - centre) ** 2
+    out[window - 1:] = (total / window) ** 0.5
+    return out
+
 
 class BaseAgent(ABC):
     """
@@ -45,6 +106,45 @@ class BaseAgent(ABC):
             Signal object or None if no action.
         """
         pass
+
+    def generate_signals(self, bars: Dict[str, Any], event_data=None) -> SignalFrame:
+        """
+        Vectorized counterpart of generate_signal over a whole series.
+
+        Args:
+            bars: Dict of equal-length NumPy columns ('price', 'volume', ...)
+                  plus an optional 'unified' snapshot from MultiSourceDataFeed.
+            event_data: Same as generate_signal.
+
+        Returns:
+            SignalFrame with one row per bar, matching what generate_signal
+            would return if it were called bar by bar on a fresh agent.
+        """
+        raise NotImplementedError(f"{type(self).__name__} has no vectorized signal path")
+
+    def get_params(self) -> Dict[str, Any]:
+        """
+        Current values of the agent's tunable parameters.
+
+        Tunables are the constructor arguments (other than name and
+        initial_capital), read back from the attributes of the same name.
+        """
+        params = inspect.signature(type(self).__init__).parameters
+        return {
+            name: getattr(self, name) for name in params
+            if name not in ('self', 'name', 'initial_capital') and hasattr(self, name)
+        }
+
+    def get_state(self) -> Dict[str, Any]:
+        """
+        Snapshot of the agent's internal state (price_history, counters, ...)
+        for checkpointing. Shallow, so serialise it before the next bar.
+        """
+        return dict(vars(self))
+
+    def set_state(self, state: Dict[str, Any]):
+        """Restore a snapshot taken with get_state."""
+        vars(self).update(state)
     
     def update_performance(self, trade_result):
         """Update metrics after a trade."""
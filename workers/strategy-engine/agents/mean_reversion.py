@@ -3,7 +3,7 @@ Mean reversion strategy using Bollinger Bands.
 Baseline strategy for comparison.
 """
 
-from agents.base_agent import BaseAgent, Signal
+from agents.base_agent import BaseAgent, Signal, SignalFrame, rolling_mean, rolling_std, np
 # import numpy as np # Removed for deployment compatibility
 
 
@@ -71,3 +71,27 @@ class MeanReversion(BaseAgent):
             agent_name=self.name,
             price=price
         )
+
+    def generate_signals(self, bars, event_data=None):
+        """Vectorized Bollinger Band touches over the whole series (see generate_signal)."""
+        prices = np.asarray(bars['price'], dtype=float)
+        frame = SignalFrame.empty(len(prices))
+        if len(prices) < self.window:
+            return frame
+        
+        mean_price = rolling_mean(prices, self.window)
+        std_price = rolling_std(prices, self.window, mean_price)
+        upper_band = mean_price + self.num_std * std_price
+        lower_band = mean_price - self.num_std * std_price
+        
+        oversold = prices <= lower_band
+        overbought = ~oversold & (prices >= upper_band)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            distance = np.where(oversold, (lower_band - prices) / lower_band,
+                                (prices - upper_band) / upper_band)
+        confidence = np.minimum(0.5 + distance * 5, 0.9)
+        
+        frame.action[:] = np.where(oversold, 1, np.where(overbought, -1, 0))
+        frame.confidence[:] = np.where(oversold | overbought, confidence, np.nan)
+        return frame
@@ -3,7 +3,7 @@ Classic trend-following agent using moving average crossover.
 Baseline strategy for comparison against event-driven agents.
 """
 
-from agents.base_agent import BaseAgent, Signal
+from agents.base_agent import BaseAgent, Signal, SignalFrame, rolling_mean, np
 # import numpy as np # Removed for deployment compatibility
 
 # Alias for compatibility with StrategyEvaluator import "from agents.trend_follower import TrendFollowerAgent"
@@ -75,5 +75,31 @@ class TrendFollower(BaseAgent):
             price=price
         )
 
+    def generate_signals(self, bars, event_data=None):
+        """Vectorized MA crossover over the whole series (see generate_signal)."""
+        prices = np.asarray(bars['price'], dtype=float)
+        frame = SignalFrame.empty(len(prices))
+        if len(prices) <= self.slow_period:
+            return frame
+        
+        fast_ma = rolling_mean(prices, self.fast_period)
+        slow_ma = rolling_mean(prices, self.slow_period)
+        
+        # generate_signal needs slow_period + 1 prices before it compares crossovers
+        start = self.slow_period
+        fast, slow = fast_ma[start:], slow_ma[start:]
+        prev_fast, prev_slow = fast_ma[start - 1:-1], slow_ma[start - 1:-1]
+        
+        bullish = (prev_fast <= prev_slow) & (fast > slow)
+        bearish = (prev_fast >= prev_slow) & (fast < slow)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            spread = np.where(bullish, fast - slow, slow - fast) / slow * 10
+        confidence = np.maximum(np.minimum(spread, 0.9), 0.5)
+        
+        frame.action[start:] = np.where(bullish, 1, np.where(bearish, -1, 0))
+        frame.confidence[start:] = np.where(bullish | bearish, confidence, np.nan)
+        return frame
+
 # Alias for compatibility with StrategyEvaluator import "from agents.trend_follower import TrendFollowerAgent"
 TrendFollowerAgent = TrendFollower
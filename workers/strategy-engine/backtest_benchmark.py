@@ -0,0 +1,384 @@
+"""
+Benchmark suite for the backtest path.
+
+Replays deterministic synthetic OHLCV series (1k, 100k and 10M bars by
+default) against a stubbed unified feed, so runs are offline and
+repeatable. For every target and size it records:
+- bars per second
+- peak RSS of the process
+- garbage-collector passes during the timed run (a proxy for how many
+  container objects the path allocates)
+- tracemalloc peak bytes and retained blocks, from a second traced run
+  (sizes up to trace_max_bars only; tracing is slow)
+
+Each case runs in its own spawned process so peak RSS belongs to that case
+alone. Results are written as JSON; compare_results against an earlier
+file says which targets got faster or slower.
+
+Usage:
+    python backtest_benchmark.py --out bench.json
+    python backtest_benchmark.py --sizes 1000 100000 --baseline bench.json
+"""
+import argparse
+import gc
+import json
+import logging
+import multiprocessing
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from backtest_columns import EquityCurve, TradeLog, compute_metrics, to_epoch_ns
+from backtest_engine import BacktestEngine
+from backtest_vectorized import np, price_bars, require_numpy
+from strategy_evaluator import StrategyEvaluator
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZES = (1_000, 100_000, 10_000_000)
+DEFAULT_STRATEGIES = ('trend_follower', 'graham')
+
+# Above this the per-bar loop is fed a chunk stream instead of a bar-dict list
+MAX_MATERIALIZED_BARS = 1_000_000
+CHUNK_BARS = 100_000
+
+BAR_NS = 60 * 10**9  # One-minute bars
+START = datetime(2000, 1, 1)
+
+# Unified view the stub feed returns: passes the Graham screen, no macro risk
+STUB_SNAPSHOT = {
+    'fundamentals': {
+        'source': 'benchmark',
+        'price_to_book': 0.9,
+        'price_to_earnings': 9.0,
+        'debt_to_equity': 0.2
+    },
+    'events': {},
+    'onchain': {},
+    'technical': {'rsi_14': 28.0},
+    'conflicts': [],
+    'consensus': {'action': 'BUY', 'sources_count': 2}
+}
+
+
+class StubFeed:
+    """Offline stand-in for MultiSourceDataFeed with one fixed snapshot"""
+
+    data_version = 'benchmark-stub'
+
+    def get_unified_data(self, symbol: str, market_data: Dict, event_config: Optional[Dict] = None) -> Dict:
+        return {**STUB_SNAPSHOT, 'symbol': symbol, 'market': market_data}
+
+
+def synthetic_chunks(n_bars: int, seed: int = 7, chunk_bars: int = CHUNK_BARS) -> Iterator[Dict[str, Any]]:
+    """
+    Deterministic OHLCV columns in chunks of chunk_bars.
+
+    A random walk whose drift flips every 500 bars, so crossover and
+    mean-reversion agents trade. Each chunk has its own seeded generator,
+    so the series is fixed by (n_bars, seed, chunk_bars) and never needs
+    to be held whole.
+    """
+    require_numpy()
+    price = 100.0
+    for first in range(0, n_bars, chunk_bars):
+        n = min(chunk_bars, n_bars - first)
+        rng = np.random.default_rng([seed, first])
+        index = np.arange(first, first + n)
+        drift = np.where((index // 500) % 2, 0.0004, -0.0004)
+        path = price * np.exp(np.cumsum(drift + rng.normal(0, 0.002, n)))
+        price = float(path[-1])
+        spread = np.abs(rng.normal(0, 0.001, n))
+        yield {
+            'timestamp': to_epoch_ns(START) + index.astype(np.int64) * BAR_NS,
+            'price': path,
+            'open': path * (1 - spread / 2),
+            'high': path * (1 + spread),
+            'low': path * (1 - spread),
+            'volume': rng.uniform(1e3, 1e5, n)
+        }
+
+
+def synthetic_ohlcv(n_bars: int, seed: int = 7) -> Dict[str, Any]:
+    """synthetic_chunks concatenated into one set of columns"""
+    chunks = list(synthetic_chunks(n_bars, seed))
+    if not chunks:
+        return {name: np.array([], dtype=np.int64 if name == 'timestamp' else float)
+                for name in ('timestamp', 'price', 'open', 'high', 'low', 'volume')}
+    return {name: np.concatenate([chunk[name] for chunk in chunks]) for name in chunks[0]}
+
+
+@dataclass
+class BenchmarkResult:
+    """One (target, size) measurement"""
+    target: str
+    n_bars: int
+    seconds: float
+    bars_per_sec: float
+    peak_rss_mb: float
+    gc_collections: int
+    alloc_peak_bytes: Optional[int] = None  # None when the traced run was skipped
+    alloc_retained_blocks: Optional[int] = None
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+
+# Target setups: (n_bars, seed) -> zero-arg callable to time, plus notes for the result
+Setup = Callable[[int, int], Tuple[Callable[[], Any], Dict[str, Any]]]
+
+
+def _setup_run_backtest(strategy: str) -> Setup:
+    def setup(n_bars: int, seed: int):
+        engine = BacktestEngine(feed=StubFeed())
+        if n_bars > MAX_MATERIALIZED_BARS:
+            def run():
+                return engine.fork().run_backtest(
+                    strategy, 'BENCH', 'start', 'end', price_data=synthetic_chunks(n_bars, seed)
+                )
+            return run, {'input': 'stream'}
+        bars = price_bars(synthetic_ohlcv(n_bars, seed))
+        return (lambda: engine.fork().run_backtest(strategy, 'BENCH', 'start', 'end', price_data=bars),
+                {'input': 'bars'})
+    return setup
+
+
+def _setup_run_vectorized(strategy: str) -> Setup:
+    def setup(n_bars: int, seed: int):
+        engine = BacktestEngine(feed=StubFeed())
+        columns = synthetic_ohlcv(n_bars, seed)
+        return (lambda: engine.run_backtest(strategy, 'BENCH', 'start', 'end',
+                                            price_data=columns, vectorized=True),
+                {'input': 'columns'})
+    return setup
+
+
+def _setup_compute_metrics(n_bars: int, seed: int):
+    columns = synthetic_ohlcv(n_bars, seed)
+    equity = EquityCurve(columns['timestamp'], 100000.0 * columns['price'] / columns['price'][0])
+    # A round trip every 50 bars
+    entry = np.arange(0, max(n_bars - 1, 0), 50)
+    exit_ = np.minimum(entry + 25, n_bars - 1)
+    quantity = 100000.0 / columns['price'][entry]
+    trades = TradeLog.from_round_trips(
+        columns['timestamp'][entry], columns['timestamp'][exit_],
+        columns['price'][entry], columns['price'][exit_], quantity,
+        (columns['price'][exit_] - columns['price'][entry]) * quantity
+    )
+    return lambda: compute_metrics(trades, equity, 100000.0), {'trades': len(trades)}
+
+
+def _setup_generate_signal(agent_name: str) -> Setup:
+    def setup(n_bars: int, seed: int):
+        evaluator = StrategyEvaluator(use_mock=False, feed=StubFeed())
+        agent = evaluator.agents[agent_name]
+        names = ('price', 'volume', 'open', 'high', 'low')
+
+        def run():
+            signals = 0
+            # Inputs are built chunk by chunk so 10M bars never sit in memory as dicts
+            for chunk in synthetic_chunks(n_bars, seed):
+                for ts, *values in zip(chunk['timestamp'].tolist(), *(chunk[n].tolist() for n in names)):
+                    market = dict(zip(names, values), symbol='BENCH', timestamp=ts // 10**9)
+                    unified = evaluator._get_unified_data('BENCH', market)
+                    signals += agent.generate_signal(evaluator._agent_input(unified)) is not None
+            return signals
+        return run, {'agent': type(agent).__name__}
+    return setup
+
+
+def default_targets(strategies=DEFAULT_STRATEGIES) -> Dict[str, Setup]:
+    """Every benchmarked target: both run_backtest paths, compute_metrics and each agent"""
+    targets: Dict[str, Setup] = {}
+    for strategy in strategies:
+        targets[f'run_backtest:{strategy}'] = _setup_run_backtest(strategy)
+        targets[f'run_backtest_vectorized:{strategy}'] = _setup_run_vectorized(strategy)
+    targets['compute_metrics'] = _setup_compute_metrics
+    for agent_name in StrategyEvaluator(use_mock=False, feed=StubFeed()).agents:
+        targets[f'generate_signal:{agent_name}'] = _setup_generate_signal(agent_name)
+    return targets
+
+
+def measure(target: str, n_bars: int, seed: int = 7, trace_max_bars: int = 100_000,
+            strategies=DEFAULT_STRATEGIES) -> BenchmarkResult:
+    """Time one target in this process (see run_suite for isolated runs)"""
+    root = logging.getLogger()
+    level = root.level
+    root.setLevel(logging.WARNING)  # Per-bar INFO logging would dominate
+    try:
+        return _measure(default_targets(strategies)[target], target, n_bars, seed, trace_max_bars)
+    finally:
+        root.setLevel(level)
+
+
+def _measure(setup: Setup, target: str, n_bars: int, seed: int, trace_max_bars: int) -> BenchmarkResult:
+    fn, extra = setup(n_bars, seed)
+    gc.collect()
+    collections = sum(stat['collections'] for stat in gc.get_stats())
+    start = time.perf_counter()
+    fn()
+    seconds = time.perf_counter() - start
+    collections = sum(stat['collections'] for stat in gc.get_stats()) - collections
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+
+    alloc_peak = retained = None
+    if n_bars <= trace_max_bars:
+        fn, _ = setup(n_bars, seed)
+        gc.collect()
+        tracemalloc.start()
+        try:
+            kept = fn()
+            alloc_peak = tracemalloc.get_traced_memory()[1]
+            retained = sum(stat.count for stat in tracemalloc.take_snapshot().statistics('filename'))
+            del kept
+        finally:
+            tracemalloc.stop()
+
+    return BenchmarkResult(
+        target=target,
+        n_bars=n_bars,
+        seconds=round(seconds, 6),
+        bars_per_sec=round(n_bars / seconds, 1) if seconds > 0 else float('inf'),
+        peak_rss_mb=round(peak_rss_mb, 1),
+        gc_collections=collections,
+        alloc_peak_bytes=alloc_peak,
+        alloc_retained_blocks=retained,
+        extra=extra
+    )
+
+
+def _measure_in_child(conn, *args):
+    try:
+        conn.send(measure(*args))
+    except Exception as e:
+        conn.send(e)
+    finally:
+        conn.close()
+
+
+def run_suite(
+    sizes=DEFAULT_SIZES,
+    targets: Optional[List[str]] = None,
+    seed: int = 7,
+    trace_max_bars: int = 100_000,
+    strategies=DEFAULT_STRATEGIES,
+    isolate: bool = True
+) -> Dict[str, Any]:
+    """
+    Measure every target at every size.
+
+    Args:
+        sizes: Bar counts to generate
+        targets: Target names to run (defaults to all of default_targets)
+        seed: Synthetic data seed
+        trace_max_bars: Largest size that also gets a tracemalloc run
+        strategies: Strategies for the run_backtest targets
+        isolate: One spawned process per case (False measures in-process;
+                 peak RSS is then the process-wide peak so far)
+
+    Returns:
+        {'meta': {...}, 'results': [BenchmarkResult as dict, ...]}; failed
+        cases carry 'error' instead of measurements
+    """
+    names = targets or list(default_targets(strategies))
+    context = multiprocessing.get_context('spawn')
+    results = []
+    for n_bars in sizes:
+        for target in names:
+            args = (target, n_bars, seed, trace_max_bars, tuple(strategies))
+            if isolate:
+                receiver, sender = context.Pipe(duplex=False)
+                process = context.Process(target=_measure_in_child, args=(sender, *args))
+                process.start()
+                sender.close()
+                try:
+                    outcome = receiver.recv()
+                except EOFError:
+                    outcome = RuntimeError(f"worker exited with code {process.exitcode}")
+                process.join()
+            else:
+                try:
+                    outcome = measure(*args)
+                except Exception as e:
+                    outcome = e
+
+            if isinstance(outcome, Exception):
+                logger.error(f"Benchmark {target} at {n_bars:,} bars failed: {outcome}")
+                results.append({'target': target, 'n_bars': n_bars, 'error': str(outcome)})
+            else:
+                logger.info(f"{target} at {n_bars:,} bars: {outcome.bars_per_sec:,.0f} bars/s, "
+                            f"{outcome.peak_rss_mb:,.0f} MB peak RSS")
+                results.append(asdict(outcome))
+
+    return {'meta': _meta(seed), 'results': results}
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any],
+                    tolerance: float = 0.10) -> List[Dict[str, Any]]:
+    """
+    Throughput change per (target, n_bars) present in both runs.
+
+    Args:
+        baseline, current: run_suite outputs
+        tolerance: Relative change in bars/sec treated as noise
+
+    Returns:
+        [{'target', 'n_bars', 'baseline', 'current', 'ratio', 'verdict'}] with
+        verdict 'faster', 'slower' or 'same'; slowest first
+    """
+    def index(run):
+        return {(r['target'], r['n_bars']): r for r in run['results'] if 'error' not in r}
+
+    before, after = index(baseline), index(current)
+    rows = []
+    for key in before.keys() & after.keys():
+        ratio = after[key]['bars_per_sec'] / before[key]['bars_per_sec']
+        verdict = 'faster' if ratio > 1 + tolerance else 'slower' if ratio < 1 - tolerance else 'same'
+        rows.append({
+            'target': key[0],
+            'n_bars': key[1],
+            'baseline': before[key]['bars_per_sec'],
+            'current': after[key]['bars_per_sec'],
+            'ratio': round(ratio, 3),
+            'verdict': verdict
+        })
+    return sorted(rows, key=lambda row: row['ratio'])
+
+
+def _meta(seed: int) -> Dict[str, Any]:
+    return {
+        'created': datetime.utcnow().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'numpy': np.__version__ if np is not None else None,
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': multiprocessing.cpu_count(),
+        'seed': seed
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the backtest path on synthetic data')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES))
+    parser.add_argument('--targets', nargs='+', help='Target names (default: all)')
+    parser.add_argument('--strategies', nargs='+', default=list(DEFAULT_STRATEGIES))
+    parser.add_argument('--trace-max-bars', type=int, default=100_000)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--out', default='backtest_benchmark.json', help='Where to write results')
+    parser.add_argument('--baseline', help='Earlier results file to compare against')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    run = run_suite(args.sizes, args.targets, args.seed, args.trace_max_bars, args.strategies)
+    with open(args.out, 'w') as f:
+        json.dump(run, f, indent=2)
+    print(f"Wrote {len(run['results'])} results to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        for row in compare_results(baseline, run):
+            print(f"{row['verdict']:>6}  {row['ratio']:>6.2f}x  {row['target']} @ {row['n_bars']:,} bars")
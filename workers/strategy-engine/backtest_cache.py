@@ -0,0 +1,170 @@
+"""
+Content-addressed cache of backtest results.
+
+A result is keyed by a hash of everything that determines it: strategy,
+symbol, date range, engine settings, every agent's parameters, a
+fingerprint of the price series and the feed's data version. Results are
+stored zlib-compressed in a local SQLite file and evicted least recently
+used once the cache grows past its byte budget.
+"""
+import hashlib
+import json
+import logging
+import pickle
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # Price fingerprints fall back to hashing the bar dicts
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Bump when BacktestResult or the simulation rules change, so old entries stop matching
+CACHE_SCHEMA_VERSION = 1
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def fingerprint_price_data(price_data: List[Dict]) -> str:
+    """Content hash of a price series (timestamps and OHLCV)"""
+    digest = hashlib.blake2b(digest_size=16)
+    if np is not None:
+        from backtest_vectorized import load_price_arrays
+        columns = load_price_arrays(price_data)
+        for name in sorted(columns):
+            digest.update(name.encode())
+            digest.update(np.ascontiguousarray(columns[name]).tobytes())
+    else:
+        digest.update(json.dumps(price_data, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def feed_version(feed) -> str:
+    """
+    Data version of a unified feed.
+
+    Feeds that can identify their data (ReplayDataFeed) expose data_version.
+    Live feeds only contribute their type, so cached live-feed results do
+    not notice upstream changes; pass refresh=True to recompute them.
+    """
+    version = getattr(feed, 'data_version', None)
+    return str(version) if version is not None else type(feed).__name__
+
+
+def cache_key(**inputs) -> str:
+    """Stable hash of JSON-serialisable backtest inputs"""
+    payload = json.dumps(
+        {'schema': CACHE_SCHEMA_VERSION, **inputs},
+        sort_keys=True, separators=(',', ':'), default=str
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class BacktestCache:
+    """
+    Size-bounded LRU store of BacktestResults on disk.
+
+    Safe to share between threads and between worker processes pointing at
+    the same file.
+
+    Example:
+        engine = BacktestEngine(cache=BacktestCache('backtests.db'))
+        engine.run_backtest('graham', 'SPY', '2024-01-01', '2024-12-31')  # miss
+        engine.run_backtest('graham', 'SPY', '2024-01-01', '2024-12-31')  # hit
+        engine.cache.stats()
+    """
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES, compression_level: int = 6):
+        """
+        Args:
+            path: SQLite file path (':memory:' for a per-process cache)
+            max_bytes: Total compressed payload size kept before evicting
+            compression_level: zlib level for stored results
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.compression_level = compression_level
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                payload BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS results_lru ON results (last_access)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Cached result for key, or None; counts a hit or miss"""
+        with self._lock:
+            row = self._conn.execute("SELECT payload FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE results SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            self.hits += 1
+        return pickle.loads(zlib.decompress(row[0]))
+
+    def put(self, key: str, result: Any):
+        """Store a result, then evict least recently used entries over budget"""
+        payload = zlib.compress(pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL), self.compression_level)
+        if len(payload) > self.max_bytes:
+            logger.warning(f"Backtest result of {len(payload)} bytes exceeds the cache budget; not cached")
+            return
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, payload, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, payload, len(payload), time.time())
+            )
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+            if total > self.max_bytes:
+                for old_key, size in self._conn.execute(
+                    "SELECT key, size FROM results WHERE key != ? ORDER BY last_access", (key,)
+                ).fetchall():
+                    self._conn.execute("DELETE FROM results WHERE key = ?", (old_key,))
+                    self.evictions += 1
+                    total -= size
+                    if total <= self.max_bytes:
+                        break
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM results")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process plus the cache's current size"""
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'evictions': self.evictions,
+            'entries': entries,
+            'bytes': size,
+            'max_bytes': self.max_bytes
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
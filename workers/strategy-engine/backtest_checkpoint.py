@@ -0,0 +1,168 @@
+"""
+Checkpoint and resume for long per-bar backtests.
+
+Every `every_bars` bars the run_backtest loop saves its state. The
+ledger scalars (capital, position, open trade), the running metrics
+behind progress reports and each agent's internal state go into one
+zlib-compressed pickle that is rewritten on every save. The equity curve
+and settled trades only grow, so each save appends just the rows since
+the previous one to a side log (<path>.log); a save costs the bars since
+the last save, not the whole run so far. Running the same backtest again
+with the same checkpoint file continues after the last saved bar and
+produces the same result as an uninterrupted run.
+"""
+import logging
+import os
+import pickle
+import struct
+import zlib
+from array import array
+from typing import Any, Dict, Optional, Tuple
+
+from backtest_columns import EquityCurve, TradeLog
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_FORMAT = 3
+
+# Side-log block header: equity rows, trade rows
+_BLOCK = struct.Struct('<qq')
+
+
+class BacktestCheckpoint:
+    """
+    One checkpoint file for one backtest.
+
+    Example:
+        checkpoint = BacktestCheckpoint('/data/ckpt/spy-graham.ckpt', every_bars=5000)
+        engine.run_backtest('graham', 'SPY', start, end, price_data=bars, checkpoint=checkpoint)
+        # after a crash, the identical call resumes from the last checkpoint
+    """
+
+    def __init__(self, path: str, every_bars: int = 1000, compression_level: int = 6):
+        """
+        Args:
+            path: Checkpoint file (written atomically via a temporary sibling)
+            every_bars: Bars between saves
+            compression_level: zlib level for the saved state
+        """
+        if every_bars <= 0:
+            raise ValueError("every_bars must be positive")
+        self.path = path
+        self.log_path = f"{path}.log"
+        self.every_bars = every_bars
+        self.compression_level = compression_level
+        # (run_key, equity rows, trade rows, bytes) already in the side log
+        self._logged: Optional[Tuple[str, int, int, int]] = None
+
+    def due(self, bars_done: int) -> bool:
+        return bars_done % self.every_bars == 0
+
+    def save(
+        self,
+        run_key: str,
+        state: Dict[str, Any],
+        equity_curve: Optional[EquityCurve] = None,
+        trades: Optional[TradeLog] = None,
+        settled_trades: Optional[int] = None
+    ):
+        """
+        Write the state for run_key, replacing any earlier checkpoint.
+
+        Args:
+            run_key: Identity of the run (see BacktestEngine._cache_key)
+            state: Small picklable state, rewritten whole
+            equity_curve: Append-only curve; new rows go to the side log
+            trades: Trade log; its first settled_trades rows go to the side
+                    log, later ones (an open position's BUY, whose pnl is set
+                    on exit) are pickled with the state
+        """
+        equity_curve = equity_curve if equity_curve is not None else EquityCurve()
+        trades = trades if trades is not None else TradeLog()
+        settled = len(trades) if settled_trades is None else settled_trades
+
+        if self._logged is None or self._logged[0] != run_key:
+            self._logged = (run_key, 0, 0, 0)
+            mode = 'wb'  # A new run; anything in the log belongs to another
+        else:
+            mode = 'r+b'
+        _, equity_rows, trade_rows, log_bytes = self._logged
+
+        with open(self.log_path, mode) as f:
+            f.truncate(log_bytes)  # Drop rows a crash left behind after the last state
+            f.seek(log_bytes)
+            f.write(_BLOCK.pack(len(equity_curve) - equity_rows, settled - trade_rows))
+            for column in equity_curve.column_slices(equity_rows) + trades.column_slices(trade_rows, settled):
+                f.write(column.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+            log_bytes = f.tell()
+
+        payload = zlib.compress(
+            pickle.dumps({
+                'format': CHECKPOINT_FORMAT,
+                'run_key': run_key,
+                'state': state,
+                'log': {'bytes': log_bytes, 'equity_rows': len(equity_curve), 'trade_rows': settled},
+                'open_trades': trades.column_slices(settled)
+            }, protocol=pickle.HIGHEST_PROTOCOL),
+            self.compression_level
+        )
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._logged = (run_key, len(equity_curve), settled, log_bytes)
+        logger.debug(f"Checkpoint at bar {state.get('next_bar')} ({len(payload)} bytes, log {log_bytes} bytes)")
+
+    def load(self, run_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Saved state for run_key, or None when there is no checkpoint.
+
+        The state comes back with 'equity_curve' and 'trades' rebuilt from
+        the side log.
+
+        Raises:
+            ValueError: The checkpoint was written by a different run
+                        (other strategy, parameters or data)
+        """
+        try:
+            with open(self.path, 'rb') as f:
+                payload = pickle.loads(zlib.decompress(f.read()))
+        except FileNotFoundError:
+            return None
+
+        if payload.get('format') != CHECKPOINT_FORMAT or payload.get('run_key') != run_key:
+            raise ValueError(f"Checkpoint {self.path} belongs to a different backtest; delete it to start over")
+
+        log = payload['log']
+        equity_columns = EquityCurve().column_slices()
+        trade_columns = TradeLog().column_slices()
+        with open(self.log_path, 'rb') as f:
+            while f.tell() < log['bytes']:
+                equity_rows, trade_rows = _BLOCK.unpack(f.read(_BLOCK.size))
+                for column in equity_columns:
+                    _read_rows(f, column, equity_rows)
+                for column in trade_columns:
+                    _read_rows(f, column, trade_rows)
+        for column, open_rows in zip(trade_columns, payload['open_trades']):
+            column.extend(open_rows)
+
+        self._logged = (run_key, log['equity_rows'], log['trade_rows'], log['bytes'])
+        return dict(payload['state'], equity_curve=EquityCurve(*equity_columns), trades=TradeLog(*trade_columns))
+
+    def clear(self):
+        """Remove the checkpoint once the run has finished"""
+        self._logged = None
+        for path in (self.path, f"{self.path}.tmp", self.log_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def _read_rows(f, column: array, rows: int):
+    """Extend a stdlib column with the next rows values in the file"""
+    column.frombytes(f.read(rows * column.itemsize))
@@ -2,28 +2,28 @@
 Backtesting engine for SignalOps strategies.
 Replays historical data and calculates performance metrics.
 """
+import copy
+import itertools
 import logging
-from typing import Dict, List, Optional, Tuple
+import os
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 # import numpy as np # Removed for deployment compatibility
 
 from strategy_evaluator import StrategyEvaluator, Decision
+from backtest_columns import TradeLog, EquityCurve, MetricAccumulator, compute_metrics, to_epoch_ns, from_epoch_ns
+from backtest_vectorized import iter_price_bars, load_price_arrays, price_bars, simulate_fills
+from backtest_cache import BacktestCache, cache_key, feed_version, fingerprint_price_data
+from backtest_checkpoint import BacktestCheckpoint
+from market_data.snapshot_store import to_epoch_seconds
+from market_data.history_store import HistoryStore
+from market_data.fundamental_adapter import YahooFinanceAdapter
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-@dataclass
-class Trade:
-    """Represents a single trade"""
-    timestamp: datetime
-    action: str  # BUY, SELL
-    price: float
-    quantity: float
-    pnl: float = 0.0
-    
-
 @dataclass
 class BacktestResult:
     """Complete backtest results"""
@@ -40,8 +40,107 @@ class BacktestResult:
     losing_trades: int
     avg_win: float
     avg_loss: float
-    trades: List[Trade] = field(default_factory=list)
-    equity_curve: List[Tuple[datetime, float]] = field(default_factory=list)
+    sortino_ratio: float = 0.0
+    exposure: float = 0.0  # Fraction of bars with a position open
+    max_drawdown_duration: int = 0  # Longest run of bars below the equity peak
+    trades: TradeLog = field(default_factory=TradeLog)
+    equity_curve: EquityCurve = field(default_factory=EquityCurve)
+    
+    def summary(self) -> Dict:
+        """Scalar fields only (no trades or equity curve), e.g. for result tables"""
+        return {
+            name: value for name, value in self.__dict__.items()
+            if name not in ('trades', 'equity_curve')
+        }
+
+
+def is_stream(price_data) -> bool:
+    """True for an iterator/generator of bar chunks rather than a materialized series"""
+    return price_data is not None and not isinstance(price_data, (list, tuple, dict))
+
+
+def iter_stream_bars(chunks: Iterable[Union[List[Dict], Dict]]):
+    """Bar dicts from a stream of chunks (bar-dict lists or column dicts), one chunk in memory at a time"""
+    for chunk in chunks:
+        yield from (iter_price_bars(chunk) if isinstance(chunk, dict) else chunk)
+
+
+class _Ledger:
+    """Cash, open position and trade/equity record of one per-bar replay"""
+    
+    def __init__(self, initial_capital: float, keep_equity: bool = True, accumulate: bool = False):
+        """
+        Args:
+            initial_capital: Starting capital in USD
+            keep_equity: Record the equity curve; otherwise only accumulate
+                         its metrics, so memory does not grow with the bars
+            accumulate: Also keep running metrics for progress reports
+        """
+        self.initial_capital = initial_capital
+        self.capital = initial_capital
+        self.position = 0.0  # Current position size
+        self.entry_price = 0.0
+        self.trades = TradeLog()
+        self.equity_curve = EquityCurve()
+        self.keep_equity = keep_equity
+        self.accumulator = MetricAccumulator(initial_capital) if accumulate or not keep_equity else None
+    
+    def apply(self, evaluation, timestamp: datetime, price: float):
+        """Execute the bar's decision and record its equity"""
+        held = self.position > 0
+        if evaluation.decision == Decision.BUY and self.position == 0 and evaluation.final_action == 'APPROVED':
+            # Enter long position
+            quantity = (self.capital * 0.95) / price  # Use 95% of capital
+            self.position = quantity
+            self.capital -= quantity * price
+            self.entry_price = price
+            self.trades.append(timestamp, 'BUY', price, quantity)
+            logger.debug(f"BUY {quantity:.4f} @ ${price:.2f}")
+            
+        elif evaluation.decision == Decision.SELL and self.position > 0:
+            # Exit long position
+            self.capital += self.position * price
+            pnl = (price - self.entry_price) * self.position
+            self.trades.set_pnl(-1, pnl)
+            self.trades.append(timestamp, 'SELL', price, self.position, pnl)
+            logger.debug(f"SELL {self.position:.4f} @ ${price:.2f}, PnL: ${pnl:.2f}")
+            self.position = 0.0
+        
+        # Track equity
+        equity = self.capital + (self.position * price if self.position > 0 else 0)
+        if self.keep_equity:
+            self.equity_curve.append(timestamp, equity)
+        if self.accumulator is not None:
+            self.accumulator.add(equity, held)
+    
+    def close(self, timestamp: datetime, price: float):
+        """Close any open position at the end of the replay"""
+        if self.position > 0:
+            self.capital += self.position * price
+            pnl = (price - self.entry_price) * self.position
+            self.trades.set_pnl(-1, pnl)
+            self.trades.append(timestamp, 'SELL', price, self.position, pnl)
+    
+    def progress(self, bars_processed: int) -> Dict:
+        """Progress frame: bars done, open position, completed trades and running metrics"""
+        return {
+            'bars_processed': bars_processed,
+            'position': self.position,
+            'trades': len(self.trades) // 2,
+            **self.accumulator.running()
+        }
+    
+    def result(self, strategy_name: str, symbol: str, start_date: str, end_date: str) -> BacktestResult:
+        return BacktestResult(
+            strategy=strategy_name,
+            symbol=symbol,
+            start_date=start_date,
+            end_date=end_date,
+            **(compute_metrics(self.trades, self.equity_curve, self.initial_capital)
+               if self.keep_equity else self.accumulator.metrics(self.trades)),
+            trades=self.trades,
+            equity_curve=self.equity_curve
+        )
 
 
 class BacktestEngine:
@@ -50,51 +149,115 @@ class BacktestEngine:
     Replays historical data and tracks performance.
     """
     
-    def __init__(self, initial_capital: float = 100000.0):
+    def __init__(
+        self,
+        initial_capital: float = 100000.0,
+        feed=None,
+        cache: Optional[BacktestCache] = None,
+        history: Optional[HistoryStore] = None
+    ):
         """
         Initialize backtest engine.
         
         Args:
             initial_capital: Starting capital in USD
+            feed: Optional unified data feed, e.g. SnapshotRecorder to record a
+                  run or ReplayDataFeed to replay one offline
+            cache: Optional BacktestCache; identical runs are served from it
+            history: Optional HistoryStore; price history is read from it
+                     and topped up from Yahoo Finance when it falls behind
         """
         self.initial_capital = initial_capital
-        self.evaluator = StrategyEvaluator(use_mock=False)  # Strict Real Data
+        self.cache = cache
+        self.history = history
+        self._yahoo: Optional[YahooFinanceAdapter] = None
+        self.evaluator = StrategyEvaluator(use_mock=False, feed=feed)  # Strict Real Data
         logger.info(f"Backtest engine initialized with ${initial_capital:,.2f}")
     
+    def fork(self) -> 'BacktestEngine':
+        """
+        Engine sharing this one's feed, cache and history store but with its
+        own agents (StrategyEvaluator.fork), so runs can go concurrently.
+        """
+        clone = copy.copy(self)
+        clone.evaluator = self.evaluator.fork()
+        return clone
+    
     def _fetch_real_historical_data(
         self,
         symbol: str,
         start_date: str,
         end_date: str
     ) -> List[Dict]:
-        """Fetch real historical data from Yahoo Finance"""
+        """Fetch real historical data from Yahoo Finance as bar dicts"""
+        return price_bars(self.load_history(symbol, start_date, end_date))
+    
+    def load_history(self, symbol: str, start_date: str, end_date: str) -> Dict:
+        """
+        Daily OHLCV columns for [start_date, end_date).
+        
+        With a history store the columns are zero-copy views of its mapped
+        files. Parts of the range the store never fetched, older or newer
+        than what it holds, are fetched and stored first.
+        
+        Raises:
+            ValueError: No real data available for the range
+        """
         try:
-            # Use the evaluator's feed -> fundamentals -> yahoo adapter
-            # Or direct yfinance for bulk history
-            
-            logger.info(f"Fetching real history for {symbol}")
-            ticker = yf.Ticker(symbol)
-            df = ticker.history(start=start_date, end=end_date, interval="1d")
+            if self.history is None:
+                logger.info(f"Fetching real history for {symbol}")
+                columns = self._yahoo_adapter().get_ohlcv(symbol, start_date, end_date)
+            else:
+                self._fill_history(symbol, start_date, end_date)
+                columns = self.history.load(symbol, start_date, end_date)
             
-            if df.empty:
+            if not columns or not len(columns['timestamp']):
                 raise ValueError(f"No real data found for {symbol}")
-            
-            data = []
-            for index, row in df.iterrows():
-                # Yahoo Finance uses Close/Volume
-                data.append({
-                    'timestamp': index.to_pydatetime(),
-                    'price': float(row['Close']),
-                    'volume': float(row['Volume']),
-                    'open': float(row['Open']),
-                    'high': float(row['High']),
-                    'low': float(row['Low'])
-                })
-            return data
+            return columns
             
         except Exception as e:
             logger.error(f"Failed to fetch real backtest data: {e}")
             raise ValueError("Strict Real Data Only: Failed to fetch history.") from e
+    
+    def _fill_history(self, symbol: str, start_date: str, end_date: str):
+        """
+        Fetch whatever of [start_date, end_date) the history store has not
+        asked Yahoo for yet, keeping its covered range contiguous.
+        
+        Coverage stops at today's midnight (UTC), so the still-forming bar
+        is asked for again next time but a weekend or holiday end_date is not.
+        """
+        start = to_epoch_ns(datetime.fromisoformat(start_date))
+        end = to_epoch_ns(datetime.fromisoformat(end_date))
+        today = to_epoch_ns(datetime.now(timezone.utc).replace(tzinfo=None, hour=0, minute=0, second=0, microsecond=0))
+        
+        covered = self.history.coverage(symbol)
+        if covered is None:
+            gaps = [(start, end)]
+        else:
+            gaps = []
+            if start < covered[0]:
+                gaps.append((start, covered[0]))
+            if end > covered[1]:
+                gaps.append((covered[1], end))
+        
+        for lo, hi in gaps:
+            logger.info(f"Fetching stored history for {symbol} from {from_epoch_ns(lo)} to {from_epoch_ns(hi)}")
+            fresh = self._yahoo_adapter().get_ohlcv(symbol, from_epoch_ns(lo), from_epoch_ns(hi))
+            if fresh is None:
+                continue  # Upstream failure; nothing is marked, so the next run retries
+            if len(fresh['timestamp']):
+                if covered is not None and lo < covered[0]:
+                    self.history.prepend(symbol, fresh)
+                else:
+                    self.history.append(symbol, fresh)
+            if lo < today:
+                self.history.mark_covered(symbol, lo, min(hi, today))
+    
+    def _yahoo_adapter(self) -> YahooFinanceAdapter:
+        if self._yahoo is None:
+            self._yahoo = YahooFinanceAdapter()
+        return self._yahoo
 
     def run_backtest(
         self,
@@ -102,7 +265,13 @@ class BacktestEngine:
         symbol: str,
         start_date: str,
         end_date: str,
-        price_data: Optional[List[Dict]] = None
+        price_data: Optional[Union[List[Dict], Dict, Iterable]] = None,
+        vectorized: bool = False,
+        use_cache: bool = True,
+        refresh: bool = False,
+        checkpoint: Optional[BacktestCheckpoint] = None,
+        on_progress: Optional[Callable[[Dict], None]] = None,
+        progress_every: int = 1000
     ) -> BacktestResult:
         """
         Run backtest for a strategy.
@@ -112,28 +281,150 @@ class BacktestEngine:
             symbol: Asset symbol
             start_date: Start date (YYYY-MM-DD)
             end_date: End date (YYYY-MM-DD)
-            price_data: Optional historical price data
+            price_data: Optional historical price data, as bar dicts or as
+                        columns (e.g. HistoryStore.load), or an iterator of
+                        such chunks (e.g. HistoryStore.iter_chunks) replayed
+                        in constant memory: the result then has no equity
+                        curve, only its metrics, and is never cached
+            vectorized: Replay the series as NumPy array operations instead of
+                        evaluating bar by bar (requires numpy and agents with
+                        a generate_signals path). The vectorized replay uses
+                        one unified snapshot for every bar, so with feeds
+                        that serve a snapshot per bar (ReplayDataFeed,
+                        AsOfDataFeed) the run falls back to the per-bar loop
+            use_cache: Consult and fill the engine's cache (False bypasses it)
+            refresh: Recompute even on a cache hit and overwrite the entry
+            checkpoint: Save the per-bar loop's state periodically; calling
+                        again with the same checkpoint resumes from it
+                        (ignored by the vectorized replay)
+            on_progress: Called from the per-bar loop every progress_every
+                         bars, and once on the final bar, with a progress frame
+                         (bars_processed, equity, drawdown, running Sharpe,
+                         ...); see backtest_stream
+            progress_every: Bars between progress frames
             
         Returns:
             BacktestResult with performance metrics
         """
         logger.info(f"Running backtest: {strategy_name} on {symbol} from {start_date} to {end_date}")
         
+        if is_stream(price_data):
+            if vectorized or checkpoint is not None:
+                raise ValueError("Streamed price_data supports neither vectorized runs nor checkpoints")
+            return self._run_loop(
+                strategy_name, symbol, start_date, end_date, iter_stream_bars(price_data),
+                keep_equity=False, on_progress=on_progress, progress_every=progress_every
+            )
+        
+        if vectorized and self.evaluator.per_bar_snapshots:
+            logger.warning(
+                f"{type(self.evaluator.feed).__name__} serves per-bar snapshots; "
+                "running the per-bar loop instead of the vectorized replay"
+            )
+            vectorized = False
+        
         # STRICT REAL DATA ONLY
         if price_data is None:
-            price_data = self._fetch_real_historical_data(symbol, start_date, end_date)
-            
-        # Initialize tracking variables
-        capital = self.initial_capital
-        position = 0.0  # Current position size
-        trades: List[Trade] = []
-        equity_curve: List[Tuple[datetime, float]] = []
+            price_data = self.load_history(symbol, start_date, end_date)
+        
+        key = None
+        if self.cache is not None and use_cache:
+            key = self._cache_key(strategy_name, symbol, start_date, end_date, price_data, vectorized)
+            if not refresh:
+                cached = self.cache.get(key)
+                if cached is not None:
+                    logger.info(f"Backtest cache hit for {strategy_name} on {symbol}")
+                    return cached
+        
+        if vectorized:
+            result = self._run_vectorized(strategy_name, symbol, start_date, end_date, price_data)
+        else:
+            result = self._run_loop(
+                strategy_name, symbol, start_date, end_date, price_data, checkpoint,
+                on_progress=on_progress, progress_every=progress_every
+            )
+        
+        if key is not None:
+            self.cache.put(key, result)
+        return result
+    
+    def _cache_key(
+        self,
+        strategy_name: str,
+        symbol: str,
+        start_date: str,
+        end_date: str,
+        price_data: List[Dict],
+        vectorized: bool
+    ) -> str:
+        """Content hash of every input that determines a run's result"""
+        return cache_key(
+            strategy=strategy_name,
+            symbol=symbol,
+            start_date=start_date,
+            end_date=end_date,
+            initial_capital=self.initial_capital,
+            vectorized=vectorized,
+            agent_params={name: agent.get_params() for name, agent in self.evaluator.agents.items()},
+            price_data=fingerprint_price_data(price_data),
+            feed=feed_version(self.evaluator.feed)
+        )
+    
+    def _run_loop(
+        self,
+        strategy_name: str,
+        symbol: str,
+        start_date: str,
+        end_date: str,
+        price_data: Union[Iterable[Dict], Dict[str, Any]],
+        checkpoint: Optional[BacktestCheckpoint] = None,
+        keep_equity: bool = True,
+        on_progress: Optional[Callable[[Dict], None]] = None,
+        progress_every: int = 1000
+    ) -> BacktestResult:
+        """
+        Per-bar replay through the evaluator.
+
+        price_data may be a one-shot iterator of bars, or columns (e.g.
+        attached shared memory) that are turned into bar dicts a chunk at a
+        time rather than all at once.
+        """
+        columnar = isinstance(price_data, dict)
+        start_bar = 0
+        last_bar = None
+        # Checkpoints carry the running metrics, so resumed progress reports cover every bar
+        ledger = _Ledger(
+            self.initial_capital, keep_equity,
+            accumulate=on_progress is not None or checkpoint is not None
+        )
+        
+        run_key = None
+        if checkpoint is not None:
+            run_key = self._cache_key(strategy_name, symbol, start_date, end_date, price_data, False)
+            state = checkpoint.load(run_key)
+            if state is not None:
+                start_bar = state['next_bar']
+                if not start_bar:
+                    last_bar = None
+                elif columnar:
+                    last_bar = next(iter_price_bars(price_data, start_bar - 1, chunk=1))
+                else:
+                    last_bar = price_data[start_bar - 1]
+                ledger.capital = state['capital']
+                ledger.position = state['position']
+                ledger.entry_price = state['entry_price']
+                ledger.trades = state['trades']
+                ledger.equity_curve = state['equity_curve']
+                # Running metrics (incl. exposure) cover the bars replayed before the checkpoint too
+                ledger.accumulator = state['accumulator']
+                for name, agent_state in state['agents'].items():
+                    self.evaluator.agents[name].set_state(agent_state)
+                logger.info(f"Resuming {strategy_name} on {symbol} from bar {start_bar}/{len(price_data['timestamp'] if columnar else price_data)}")
         
         # Replay historical data
-        for data_point in price_data:
-            timestamp = data_point['timestamp']
-            price = data_point['price']
-            
+        bars_done = start_bar
+        bars = iter_price_bars(price_data, start_bar) if columnar else itertools.islice(price_data, start_bar, None)
+        for bar, data_point in enumerate(bars, start_bar):
             # Evaluate strategy
             # For backtesting, we need to inject the timestamp into the unified data context
             # So the strategy knows it's "then", not "now". 
@@ -145,156 +436,173 @@ class BacktestEngine:
             evaluation = self.evaluator.evaluate_strategy(
                 strategy_name=strategy_name,
                 asset=symbol,
-                market_data={
-                    'price': price,
-                    'volume': data_point.get('volume', 0),
-                    'open': data_point.get('open', price),
-                    'high': data_point.get('high', price),
-                    'low': data_point.get('low', price)
-                }
+                market_data=self._market_data(symbol, data_point),
+                research=False
             )
+            ledger.apply(evaluation, data_point['timestamp'], data_point['price'])
+            last_bar = data_point
+            bars_done = bar + 1
             
-            # Execute trade based on decision
-            if evaluation.decision == Decision.BUY and position == 0 and evaluation.final_action == 'APPROVED':
-                # Enter long position
-                quantity = (capital * 0.95) / price  # Use 95% of capital
-                position = quantity
-                capital -= quantity * price
-                trades.append(Trade(
-                    timestamp=timestamp,
-                    action='BUY',
-                    price=price,
-                    quantity=quantity
-                ))
-                logger.debug(f"BUY {quantity:.4f} @ ${price:.2f}")
-                
-            elif evaluation.decision == Decision.SELL and position > 0:
-                # Exit long position
-                capital += position * price
-                pnl = (price - trades[-1].price) * position
-                trades[-1].pnl = pnl
-                trades.append(Trade(
-                    timestamp=timestamp,
-                    action='SELL',
-                    price=price,
-                    quantity=position,
-                    pnl=pnl
-                ))
-                logger.debug(f"SELL {position:.4f} @ ${price:.2f}, PnL: ${pnl:.2f}")
-                position = 0.0
+            if on_progress is not None and (bar + 1) % progress_every == 0:
+                on_progress(ledger.progress(bar + 1))
             
-            # Track equity
-            current_equity = capital + (position * price if position > 0 else 0)
-            equity_curve.append((timestamp, current_equity))
+            if checkpoint is not None and checkpoint.due(bar + 1):
+                checkpoint.save(
+                    run_key,
+                    {
+                        'next_bar': bar + 1,
+                        'capital': ledger.capital,
+                        'position': ledger.position,
+                        'entry_price': ledger.entry_price,
+                        'accumulator': ledger.accumulator,
+                        'agents': {name: agent.get_state() for name, agent in self.evaluator.agents.items()}
+                    },
+                    equity_curve=ledger.equity_curve,
+                    trades=ledger.trades,
+                    # An open position's BUY still gets its pnl on exit
+                    settled_trades=len(ledger.trades) - (ledger.position > 0)
+                )
         
-        # Close any open position at end
-        if position > 0 and price_data:
-            final_price = price_data[-1]['price']
-            capital += position * final_price
-            pnl = (final_price - trades[-1].price) * position
-            trades[-1].pnl = pnl
-            trades.append(Trade(
-                timestamp=price_data[-1]['timestamp'],
-                action='SELL',
-                price=final_price,
-                quantity=position,
-                pnl=pnl
-            ))
+        if on_progress is not None and bars_done > start_bar and bars_done % progress_every:
+            # Closing frame, so listeners see the final bar whatever progress_every is
+            on_progress(ledger.progress(bars_done))
         
-        # Calculate metrics
-        metrics = self._calculate_metrics(trades, equity_curve, self.initial_capital)
+        if last_bar is not None:
+            ledger.close(last_bar['timestamp'], last_bar['price'])
         
-        return BacktestResult(
-            strategy=strategy_name,
-            symbol=symbol,
-            start_date=start_date,
-            end_date=end_date,
-            **metrics,
-            trades=trades,
-            equity_curve=equity_curve
-        )
+        if checkpoint is not None:
+            checkpoint.clear()
+        
+        return ledger.result(strategy_name, symbol, start_date, end_date)
     
-    def _calculate_metrics(
+    def run_backtests(
         self,
-        trades: List[Trade],
-        equity_curve: List[Tuple[datetime, float]],
-        initial_capital: float
-    ) -> Dict:
-        """Calculate performance metrics"""
-        if not trades:
-            return {
-                'total_return': 0.0,
-                'max_drawdown': 0.0,
-                'sharpe_ratio': 0.0,
-                'win_rate': 0.0,
-                'total_trades': 0,
-                'winning_trades': 0,
-                'losing_trades': 0,
-                'avg_win': 0.0,
-                'avg_loss': 0.0
-            }
+        strategy_names: List[str],
+        symbol: str,
+        start_date: str,
+        end_date: str,
+        price_data: Optional[Union[List[Dict], Dict]] = None,
+        use_cache: bool = True,
+        refresh: bool = False
+    ) -> Dict[str, BacktestResult]:
+        """
+        Backtest several strategies in one replay of the history.
         
-        # Total return
-        final_equity = equity_curve[-1][1] if equity_curve else initial_capital
-        total_return = ((final_equity - initial_capital) / initial_capital) * 100
+        Each bar's unified data is fetched once and evaluated by every
+        strategy, so the data cost does not grow with the number of
+        strategies. Each strategy gets its own agents (see
+        StrategyEvaluator.fork) and its own ledger, and its result equals a
+        separate run_backtest call.
         
-        # Max drawdown
-        peak = initial_capital
-        max_dd = 0.0
-        for _, equity in equity_curve:
-            if equity > peak:
-                peak = equity
-            dd = ((peak - equity) / peak) * 100
-            if dd > max_dd:
-                max_dd = dd
+        Args:
+            strategy_names: Strategies to compare (e.g. ['graham', 'multi_agent'])
+            symbol, start_date, end_date, price_data: As for run_backtest
+            use_cache: Consult and fill the engine's cache per strategy
+            refresh: Recompute even on a cache hit and overwrite the entries
+            
+        Returns:
+            BacktestResult per strategy name, in the order given
+        """
+        logger.info(f"Running {len(strategy_names)} strategies on {symbol} in one pass")
         
-        # Win rate and average win/loss (Pure Python)
-        winning_trades = [t for t in trades if t.pnl > 0]
-        losing_trades = [t for t in trades if t.pnl < 0]
+        if price_data is None:
+            price_data = self.load_history(symbol, start_date, end_date)
         
-        win_rate = len(winning_trades) / len([t for t in trades if t.action == 'SELL']) if trades else 0.0
+        results: Dict[str, BacktestResult] = {}
+        keys: Dict[str, str] = {}
+        for name in dict.fromkeys(strategy_names):
+            if self.cache is not None and use_cache:
+                keys[name] = self._cache_key(name, symbol, start_date, end_date, price_data, False)
+                cached = None if refresh else self.cache.get(keys[name])
+                if cached is not None:
+                    logger.info(f"Backtest cache hit for {name} on {symbol}")
+                    results[name] = cached
+                    continue
+            results[name] = None
         
-        avg_win = sum(t.pnl for t in winning_trades) / len(winning_trades) if winning_trades else 0.0
-        avg_loss = sum(t.pnl for t in losing_trades) / len(losing_trades) if losing_trades else 0.0
+        pending = [name for name, result in results.items() if result is None]
+        evaluators = {name: self.evaluator.fork() for name in pending}
+        ledgers = {name: _Ledger(self.initial_capital) for name in pending}
         
-        # Sharpe ratio (simplified)
-        sharpe_ratio = 0.0
-        if len(equity_curve) > 1:
-            returns = [
-                (equity_curve[i][1] - equity_curve[i-1][1]) / equity_curve[i-1][1]
-                for i in range(1, len(equity_curve))
-            ]
-            
-            if returns:
-                 mean_ret = sum(returns) / len(returns)
-                 variance = sum((x - mean_ret) ** 2 for x in returns) / len(returns)
-                 std_dev = variance ** 0.5
-                 
-                 if std_dev > 0:
-                     sharpe_ratio = (mean_ret / std_dev) * (252 ** 0.5)  # Annualized
-        else:
-            sharpe_ratio = 0.0
+        last_bar = None
+        if pending:
+            bars = iter_price_bars(price_data) if isinstance(price_data, dict) else price_data
+            for data_point in bars:
+                unified_data = self.evaluator._get_unified_data(symbol, self._market_data(symbol, data_point))
+                for name in pending:
+                    evaluation = evaluators[name].evaluate_unified(name, symbol, unified_data, research=False)
+                    ledgers[name].apply(evaluation, data_point['timestamp'], data_point['price'])
+                last_bar = data_point
         
+        for name in pending:
+            if last_bar is not None:
+                ledgers[name].close(last_bar['timestamp'], last_bar['price'])
+            results[name] = ledgers[name].result(name, symbol, start_date, end_date)
+            if name in keys:
+                self.cache.put(keys[name], results[name])
+        return results
+    
+    def _market_data(self, symbol: str, data_point: Dict) -> Dict:
+        """Market context for one bar; timestamp keys recorded/replayed snapshots"""
+        price = data_point['price']
         return {
-            'total_return': round(total_return, 2),
-            'max_drawdown': round(max_dd, 2),
-            'sharpe_ratio': round(sharpe_ratio, 2),
-            'win_rate': round(win_rate, 2),
-            'total_trades': len([t for t in trades if t.action == 'SELL']),
-            'winning_trades': len(winning_trades),
-            'losing_trades': len(losing_trades),
-            'avg_win': round(avg_win, 2),
-            'avg_loss': round(avg_loss, 2)
+            'symbol': symbol,
+            'timestamp': to_epoch_seconds(data_point['timestamp']),
+            'price': price,
+            'volume': data_point.get('volume', 0),
+            'open': data_point.get('open', price),
+            'high': data_point.get('high', price),
+            'low': data_point.get('low', price)
         }
     
+    def _run_vectorized(
+        self,
+        strategy_name: str,
+        symbol: str,
+        start_date: str,
+        end_date: str,
+        price_data: Union[List[Dict], Dict]
+    ) -> BacktestResult:
+        """Array-based replay producing the same BacktestResult as the loop"""
+        bars = load_price_arrays(price_data)
+        first_bar = None
+        if len(bars['price']):
+            first_bar = {name: bars[name][0].item() for name in ('price', 'volume', 'open', 'high', 'low')}
+            first_bar['timestamp'] = from_epoch_ns(bars['timestamp'][0])
+        evaluation = self.evaluator.evaluate_strategy_vectorized(
+            strategy_name, symbol, bars,
+            market_data=self._market_data(symbol, first_bar) if first_bar else None
+        )
+        fills = simulate_fills(
+            bars['price'], evaluation.decision, evaluation.approved, self.initial_capital
+        )
+        
+        timestamps = bars['timestamp']
+        trades = TradeLog.from_round_trips(
+            timestamps[fills.entry_index], timestamps[fills.exit_index],
+            fills.entry_price, fills.exit_price, fills.quantity, fills.pnl
+        )
+        equity_curve = EquityCurve(timestamps, fills.equity)
+        
+        return BacktestResult(
+            strategy=strategy_name,
+            symbol=symbol,
+            start_date=start_date,
+            end_date=end_date,
+            **compute_metrics(trades, equity_curve, self.initial_capital),
+            trades=trades,
+            equity_curve=equity_curve
+        )
+    
 
 # Singleton instance
 _backtest_engine: Optional[BacktestEngine] = None
 
 
 def get_backtest_engine() -> BacktestEngine:
-    """Get or create singleton backtest engine"""
+    """Get or create singleton backtest engine (cached when BACKTEST_CACHE_PATH is set)"""
     global _backtest_engine
     if _backtest_engine is None:
-        _backtest_engine = BacktestEngine()
+        cache_path = os.getenv('BACKTEST_CACHE_PATH')
+        _backtest_engine = BacktestEngine(cache=BacktestCache(cache_path) if cache_path else None)
     return _backtest_engine
@@ -0,0 +1,229 @@
+"""
+Compact export of backtest results for the frontend.
+
+A multi-year intraday equity curve has hundreds of thousands of points,
+far more than a chart can show. The export downsamples the equity and
+drawdown series independently with LTTB (largest-triangle-three-buckets),
+which keeps the points that carry the visual shape (peaks, troughs,
+sharp moves) and yields a few kilobytes at the default target.
+
+Two payloads are written:
+- JSON in the shape the backtest page reads
+  (frontend/public/data/backtest_results.json: summary, equityCurve, trades)
+  plus a drawdownCurve
+- binary: a JSON header followed by packed float32/int64 columns
+"""
+import json
+import struct
+from datetime import datetime
+from typing import Any, Dict
+
+from backtest_columns import from_epoch_ns
+from backtest_engine import BacktestResult
+from backtest_vectorized import np, require_numpy
+
+DEFAULT_POINTS = 250
+
+# Binary payload: magic, format version, header length, then the JSON header
+BINARY_MAGIC = b'SOEQ'
+BINARY_VERSION = 1
+_PREFIX = struct.Struct('<4sHI')
+
+
+def lttb_indices(x, y, n_out: int):
+    """
+    Indices of the points LTTB keeps when reducing (x, y) to n_out points.
+
+    The first and last points are always kept. Every bucket in between
+    contributes the point forming the largest triangle with the previously
+    kept point and the average of the next bucket.
+
+    Args:
+        x: Increasing float array (e.g. epoch ns)
+        y: Values at x
+        n_out: Target point count (all points are kept if n_out >= len(x))
+    """
+    require_numpy()
+    n = len(x)
+    if n_out >= n or n <= 2:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1])[:max(n_out, 0)]
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    every = (n - 2) / (n_out - 2)
+    edges = (np.arange(n_out - 1) * every).astype(np.int64) + 1  # bucket b spans edges[b]:edges[b + 1]
+
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        if b + 2 < len(edges):
+            nlo, nhi = edges[b + 1], edges[b + 2]
+            cx, cy = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        else:
+            cx, cy = x[-1], y[-1]
+        # Twice the triangle area; the constant factor does not change the argmax
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(area.argmax())
+        kept[b + 1] = a
+    return kept
+
+
+def drawdown_series(equity, initial_capital: float):
+    """Percent below the running peak at each point (0 or negative, as the page shows it)"""
+    require_numpy()
+    peak = np.maximum.accumulate(np.maximum(equity, initial_capital))
+    return (equity - peak) / peak * 100
+
+
+def export_payload(
+    result: BacktestResult,
+    initial_capital: float = 100000.0,
+    points: int = DEFAULT_POINTS,
+    max_trades: int = 50
+) -> Dict[str, Any]:
+    """
+    Frontend payload for one result.
+
+    Args:
+        result: Backtest to export
+        initial_capital: Capital the run started with (drawdown reference)
+        points: Target points per downsampled series
+        max_trades: Most recent trades to include
+
+    Returns:
+        {'summary', 'equityCurve', 'drawdownCurve', 'trades'}
+    """
+    timestamps, equity, drawdown, equity_idx, drawdown_idx = _series(result, initial_capital, points)
+    daily = bool(len(timestamps)) and not (timestamps % (86400 * 10**9)).any()
+
+    def fmt(ns) -> str:
+        return _format_time(from_epoch_ns(int(ns)), daily)
+
+    trades = [
+        {
+            'date': _format_time(trade.timestamp, daily),
+            'pair': result.symbol,
+            'side': trade.action,
+            'price': round(trade.price, 2),
+            'pnl': round(trade.pnl, 2) if trade.action == 'SELL' else 0
+        }
+        for trade in reversed(list(result.trades)[-max_trades:])
+    ] if max_trades else []
+
+    return {
+        'summary': _summary(result, len(timestamps), len(equity_idx)),
+        'equityCurve': [{'time': fmt(timestamps[i]), 'value': round(float(equity[i]), 2)} for i in equity_idx],
+        'drawdownCurve': [{'time': fmt(timestamps[i]), 'value': round(float(drawdown[i]), 2)} for i in drawdown_idx],
+        'trades': trades
+    }
+
+
+def export_json(result: BacktestResult, path: str, **kwargs) -> int:
+    """
+    Write export_payload as compact JSON (e.g. to frontend/public/data/).
+
+    Returns:
+        Bytes written
+    """
+    payload = json.dumps(export_payload(result, **kwargs), separators=(',', ':')).encode()
+    with open(path, 'wb') as f:
+        f.write(payload)
+    return len(payload)
+
+
+def export_binary(
+    result: BacktestResult,
+    path: str,
+    initial_capital: float = 100000.0,
+    points: int = DEFAULT_POINTS
+) -> int:
+    """
+    Write the downsampled series as a binary payload.
+
+    Layout (little-endian): b'SOEQ', uint16 version, uint32 header length,
+    UTF-8 JSON header {'summary', 'equity_points', 'drawdown_points'}, then
+    for each series int64 epoch-ms timestamps followed by float32 values
+    (equity first, then drawdown).
+
+    Returns:
+        Bytes written
+    """
+    timestamps, equity, drawdown, equity_idx, drawdown_idx = _series(result, initial_capital, points)
+    header = json.dumps({
+        'summary': _summary(result, len(timestamps), len(equity_idx)),
+        'equity_points': len(equity_idx),
+        'drawdown_points': len(drawdown_idx)
+    }, separators=(',', ':')).encode()
+
+    parts = [_PREFIX.pack(BINARY_MAGIC, BINARY_VERSION, len(header)), header]
+    for values, idx in ((equity, equity_idx), (drawdown, drawdown_idx)):
+        parts.append((timestamps[idx] // 10**6).astype('<i8').tobytes())
+        parts.append(values[idx].astype('<f4').tobytes())
+    payload = b''.join(parts)
+    with open(path, 'wb') as f:
+        f.write(payload)
+    return len(payload)
+
+
+def read_binary(path: str) -> Dict[str, Any]:
+    """Inverse of export_binary: header plus (timestamps_ms, values) per series"""
+    require_numpy()
+    with open(path, 'rb') as f:
+        payload = f.read()
+    magic, version, header_len = _PREFIX.unpack_from(payload)
+    if magic != BINARY_MAGIC or version != BINARY_VERSION:
+        raise ValueError(f"{path} is not a version {BINARY_VERSION} equity export")
+    offset = _PREFIX.size
+    header = json.loads(payload[offset:offset + header_len])
+    offset += header_len
+
+    series = {}
+    for name in ('equity', 'drawdown'):
+        n = header[f'{name}_points']
+        ts = np.frombuffer(payload, dtype='<i8', count=n, offset=offset)
+        offset += 8 * n
+        values = np.frombuffer(payload, dtype='<f4', count=n, offset=offset)
+        offset += 4 * n
+        series[name] = (ts, values)
+    return {'header': header, **series}
+
+
+def _format_time(moment: datetime, daily: bool) -> str:
+    """Dates for daily bars (as the page's sample data), seconds otherwise"""
+    return moment.strftime('%Y-%m-%d') if daily else moment.isoformat(timespec='seconds')
+
+
+def _series(result: BacktestResult, initial_capital: float, points: int):
+    """Full-resolution series plus the LTTB picks for each"""
+    require_numpy()
+    timestamps = np.asarray(result.equity_curve.timestamps, dtype=np.int64)
+    equity = np.asarray(result.equity_curve.values, dtype=float)
+    drawdown = drawdown_series(equity, initial_capital)
+    x = timestamps.astype(float)
+    return (
+        timestamps, equity, drawdown,
+        lttb_indices(x, equity, points), lttb_indices(x, drawdown, points)
+    )
+
+
+def _summary(result: BacktestResult, source_points: int, points: int) -> Dict[str, Any]:
+    """Header in the page's camelCase; maxDrawdown is negative as the page shows it"""
+    return {
+        'strategy': result.strategy,
+        'symbol': result.symbol,
+        'startDate': result.start_date,
+        'endDate': result.end_date,
+        'totalReturn': result.total_return,
+        'sharpeRatio': result.sharpe_ratio,
+        'sortinoRatio': result.sortino_ratio,
+        'maxDrawdown': -result.max_drawdown,
+        'winRate': result.win_rate,
+        'totalTrades': result.total_trades,
+        'exposure': result.exposure,
+        'sourcePoints': source_points,
+        'points': points
+    }
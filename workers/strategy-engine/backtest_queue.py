@@ -0,0 +1,559 @@
+"""
+Distributed backtest job queue on Redis.
+
+A sweep over a full universe outgrows one host. Jobs (one backtest each)
+go into a Redis list; QueueWorker processes on any number of nodes pull
+them, run them on a fresh BacktestEngine and write the result summary
+back. Workers share nothing but Redis, so throughput grows with every
+worker process added.
+
+Delivery is at-least-once:
+- a claimed job moves atomically to a processing list and gets a lease
+- the worker's heartbeat keeps extending the lease while the backtest runs
+- jobs whose lease runs out (worker killed, node lost) are put back by
+  whichever worker or client next calls requeue_expired
+- jobs that raise are retried until max_attempts, then reported as errors
+
+Backtests are deterministic, so a job that runs twice writes the same result.
+
+Start workers on a node with:
+    python backtest_queue.py redis://queue-host:6379/0 --processes 8
+"""
+import argparse
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from multiprocessing import Process
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import redis
+except ImportError:  # Only the distributed queue needs it
+    redis = None
+
+from backtest_cache import BacktestCache
+from backtest_engine import BacktestEngine
+from backtest_sweep import _row, apply_params, expand_grid, rank_rows
+from market_data.history_store import HistoryStore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE = 'backtests'
+
+
+@dataclass
+class BacktestJob:
+    """One backtest as stored in the queue"""
+    strategy_name: str
+    symbol: str
+    start_date: str
+    end_date: str
+    params: Dict[str, Any] = field(default_factory=dict)
+    vectorized: bool = False
+    job_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    attempts: int = 0  # Failed or abandoned runs so far
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), separators=(',', ':'))
+
+    @classmethod
+    def from_json(cls, payload) -> 'BacktestJob':
+        return cls(**json.loads(payload))
+
+
+class BacktestQueue:
+    """
+    Jobs, leases, results and worker heartbeats under one Redis key prefix.
+
+    Keys:
+        <name>:pending     list of job ids waiting to run
+        <name>:processing  list of claimed job ids
+        <name>:leases      zset job id -> lease deadline (epoch seconds)
+        <name>:jobs        hash job id -> BacktestJob JSON
+        <name>:results     hash job id -> result JSON ({'ok': summary} or {'error': message})
+        <name>:workers     hash worker id -> last heartbeat JSON
+
+    Example:
+        queue = BacktestQueue('redis://queue-host:6379/0')
+        ids = queue.submit([BacktestJob('trend_follower', 'SPY', start, end, params) for params in grid])
+        rows = queue.wait(ids)
+    """
+
+    def __init__(
+        self,
+        url: str = 'redis://localhost:6379/0',
+        name: str = DEFAULT_QUEUE,
+        lease_seconds: float = 60.0,
+        max_attempts: int = 3,
+        client=None
+    ):
+        """
+        Args:
+            url: Redis (or Redis-compatible) server URL
+            name: Key prefix, so several queues can share a server
+            lease_seconds: How long a claimed job may go without a heartbeat
+            max_attempts: Runs per job before it is reported as failed
+            client: Existing redis client to use instead of connecting to url
+        """
+        if client is None:
+            if redis is None:
+                raise ImportError("The distributed backtest queue requires redis (pip install redis)")
+            client = redis.Redis.from_url(url)
+        self.url = url
+        self.name = name
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.client = client
+
+    def _key(self, part: str) -> str:
+        return f"{self.name}:{part}"
+
+    def submit(self, jobs: List[BacktestJob]) -> List[str]:
+        """Enqueue jobs in order; returns their ids"""
+        if not jobs:
+            return []
+        pipe = self.client.pipeline()
+        pipe.hset(self._key('jobs'), mapping={job.job_id: job.to_json() for job in jobs})
+        pipe.lpush(self._key('pending'), *[job.job_id for job in jobs])
+        pipe.execute()
+        return [job.job_id for job in jobs]
+
+    def claim(self, worker_id: str, timeout: float = 5.0) -> Optional[BacktestJob]:
+        """
+        Take the oldest pending job and lease it to worker_id.
+
+        Blocks up to timeout seconds; None when nothing arrived.
+        """
+        job_id = self.client.blmove(
+            self._key('pending'), self._key('processing'), timeout, 'RIGHT', 'LEFT'
+        )
+        if job_id is None:
+            return None
+        job_id = job_id.decode()
+        # A crash right here leaves the id in processing without a lease;
+        # requeue_expired leases such ids so they still expire
+        self.client.zadd(self._key('leases'), {job_id: time.time() + self.lease_seconds})
+        payload = self.client.hget(self._key('jobs'), job_id)
+        if payload is None:  # Purged while pending
+            self._release(job_id)
+            return None
+        logger.debug(f"{worker_id} claimed {job_id}")
+        return BacktestJob.from_json(payload)
+
+    def heartbeat(self, worker_id: str, job_id: Optional[str] = None, completed: int = 0):
+        """Record that worker_id is alive and extend its current job's lease"""
+        pipe = self.client.pipeline()
+        if job_id is not None:
+            pipe.zadd(self._key('leases'), {job_id: time.time() + self.lease_seconds}, xx=True)
+        pipe.hset(self._key('workers'), worker_id, json.dumps({
+            'host': socket.gethostname(),
+            'pid': os.getpid(),
+            'job': job_id,
+            'completed': completed,
+            'seen': time.time()
+        }))
+        pipe.execute()
+
+    def complete(self, job_id: str, summary: Dict[str, Any]):
+        """Store a finished job's BacktestResult.summary()"""
+        self._finish(job_id, {'ok': summary})
+
+    def fail(self, job_id: str, error: str):
+        """Record a failed run: retried at the back of the queue until max_attempts"""
+        job = self.job(job_id)
+        if job is None:
+            self._release(job_id)
+            return
+        job.attempts += 1
+        if job.attempts >= self.max_attempts:
+            logger.error(f"Backtest job {job_id} failed {job.attempts} times: {error}")
+            self._finish(job_id, {'error': error, 'attempts': job.attempts})
+            return
+
+        logger.warning(f"Backtest job {job_id} failed (attempt {job.attempts}), retrying: {error}")
+        pipe = self.client.pipeline()
+        pipe.hset(self._key('jobs'), job_id, job.to_json())
+        pipe.zrem(self._key('leases'), job_id)
+        pipe.lrem(self._key('processing'), 0, job_id)
+        pipe.lpush(self._key('pending'), job_id)
+        pipe.execute()
+
+    def requeue_expired(self) -> int:
+        """
+        Put jobs whose lease ran out back in the queue (or fail them for good).
+
+        Safe to call from any number of workers and clients at once: every
+        step is a WATCHed transaction, so a job that finishes meanwhile is
+        left alone, and a job that already has a result is never rerun.
+
+        Returns:
+            Jobs requeued or failed
+        """
+        leases = self._key('leases')
+        now = time.time()
+        self._lease_orphans(now)
+
+        recovered = 0
+        for raw in self.client.zrangebyscore(leases, 0, now):
+            if self._expire(raw.decode(), now):
+                recovered += 1
+        return recovered
+
+    def _lease_orphans(self, now: float, retries: int = 3):
+        """Lease ids claimed by a worker that died before leasing them"""
+        leases, processing = self._key('leases'), self._key('processing')
+        for _ in range(retries):
+            with self.client.pipeline() as pipe:
+                try:
+                    # A job finishing (or being claimed) between the read and the
+                    # write aborts the transaction instead of leasing a finished id
+                    pipe.watch(processing, leases)
+                    ids = [raw.decode() for raw in pipe.lrange(processing, 0, -1)]
+                    orphans = [job_id for job_id in ids if pipe.zscore(leases, job_id) is None]
+                    if not orphans:
+                        return
+                    pipe.multi()
+                    pipe.zadd(leases, {job_id: now + self.lease_seconds for job_id in orphans}, nx=True)
+                    pipe.execute()
+                    return
+                except redis.WatchError:
+                    continue  # Queue moved; look again
+
+    def _expire(self, job_id: str, now: float) -> bool:
+        """Requeue or fail one job whose lease ran out; False if it no longer needs it"""
+        leases, processing, results = self._key('leases'), self._key('processing'), self._key('results')
+        with self.client.pipeline() as pipe:
+            try:
+                pipe.watch(leases, results)
+                deadline = pipe.zscore(leases, job_id)
+                if deadline is None or deadline > now:
+                    return False  # Completed or heartbeated meanwhile
+                payload = None if pipe.hexists(results, job_id) else pipe.hget(self._key('jobs'), job_id)
+                if payload is None:
+                    # Finished (only a stray lease outlived it) or purged: clean up, never rerun
+                    pipe.multi()
+                    pipe.zrem(leases, job_id)
+                    pipe.lrem(processing, 0, job_id)
+                    pipe.execute()
+                    return False
+                job = BacktestJob.from_json(payload)
+                job.attempts += 1
+                pipe.multi()
+                pipe.zrem(leases, job_id)
+                pipe.lrem(processing, 0, job_id)
+                if job.attempts >= self.max_attempts:
+                    pipe.hset(results, job_id, json.dumps(
+                        {'error': 'lease expired', 'attempts': job.attempts}
+                    ))
+                else:
+                    pipe.hset(self._key('jobs'), job_id, job.to_json())
+                    pipe.lpush(self._key('pending'), job_id)
+                pipe.execute()
+            except redis.WatchError:
+                return False  # Another worker touched the job; next pass retries
+        logger.warning(f"Backtest job {job_id} lost its worker; attempt {job.attempts}")
+        return True
+
+    def job(self, job_id: str) -> Optional[BacktestJob]:
+        payload = self.client.hget(self._key('jobs'), job_id)
+        return BacktestJob.from_json(payload) if payload is not None else None
+
+    def results(self, job_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Finished jobs among job_ids: {job_id: {'ok': summary} or {'error': message}}"""
+        if not job_ids:
+            return {}
+        payloads = self.client.hmget(self._key('results'), job_ids)
+        return {
+            job_id: json.loads(payload)
+            for job_id, payload in zip(job_ids, payloads) if payload is not None
+        }
+
+    def wait(self, job_ids: List[str], timeout: Optional[float] = None, poll: float = 0.5) -> Dict[str, Dict]:
+        """
+        Block until every job has a result.
+
+        Also recovers jobs of dead workers while waiting, so a sweep finishes
+        as long as one worker is left.
+
+        Raises:
+            TimeoutError: If jobs are still unfinished after timeout seconds
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            results = self.results(job_ids)
+            if len(results) == len(job_ids):
+                return results
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"{len(job_ids) - len(results)} of {len(job_ids)} backtest jobs unfinished")
+            self.requeue_expired()
+            time.sleep(poll)
+
+    def workers(self, max_age: float = 30.0) -> Dict[str, Dict[str, Any]]:
+        """Workers that sent a heartbeat in the last max_age seconds"""
+        cutoff = time.time() - max_age
+        alive = {}
+        for worker_id, payload in self.client.hgetall(self._key('workers')).items():
+            beat = json.loads(payload)
+            if beat['seen'] >= cutoff:
+                alive[worker_id.decode()] = beat
+        return alive
+
+    def stats(self) -> Dict[str, int]:
+        pipe = self.client.pipeline()
+        pipe.llen(self._key('pending'))
+        pipe.llen(self._key('processing'))
+        pipe.hlen(self._key('results'))
+        pending, running, finished = pipe.execute()
+        return {'pending': pending, 'running': running, 'finished': finished, 'workers': len(self.workers())}
+
+    def purge(self):
+        """Delete every key of this queue"""
+        self.client.delete(*[self._key(part) for part in
+                             ('pending', 'processing', 'leases', 'jobs', 'results', 'workers')])
+
+    def _finish(self, job_id: str, outcome: Dict[str, Any]):
+        pipe = self.client.pipeline()
+        pipe.hset(self._key('results'), job_id, json.dumps(outcome, default=str))
+        pipe.zrem(self._key('leases'), job_id)
+        pipe.lrem(self._key('processing'), 0, job_id)
+        pipe.lrem(self._key('pending'), 0, job_id)  # Requeued after a late heartbeat
+        pipe.execute()
+
+    def _release(self, job_id: str):
+        pipe = self.client.pipeline()
+        pipe.zrem(self._key('leases'), job_id)
+        pipe.lrem(self._key('processing'), 0, job_id)
+        pipe.execute()
+
+
+class QueueWorker:
+    """
+    Pulls backtest jobs from a BacktestQueue until told to stop.
+
+    Every job runs on a fresh engine (agent state never leaks between jobs);
+    the feed, cache and loaded price series are reused across jobs.
+    """
+
+    def __init__(
+        self,
+        queue: BacktestQueue,
+        initial_capital: float = 100000.0,
+        feed_factory: Optional[Callable] = None,
+        price_loader: Optional[Callable] = None,
+        history_root: Optional[str] = None,
+        cache_path: Optional[str] = None,
+        heartbeat_seconds: Optional[float] = None
+    ):
+        """
+        Args:
+            queue: Queue to pull from
+            initial_capital: Starting capital for every run
+            feed_factory: Zero-arg callable building the worker's feed
+            price_loader: (symbol, start_date, end_date) -> price data; defaults
+                          to BacktestEngine.load_history
+            history_root: HistoryStore directory for the default price loader
+            cache_path: BacktestCache file (e.g. on the node's local disk)
+            heartbeat_seconds: Lease renewal interval (defaults to a third of the lease)
+        """
+        self.queue = queue
+        self.initial_capital = initial_capital
+        self.feed = feed_factory() if feed_factory else None
+        self.price_loader = price_loader
+        self.history = HistoryStore(history_root) if history_root else None
+        self.cache = BacktestCache(cache_path) if cache_path else None
+        self.heartbeat_seconds = heartbeat_seconds or queue.lease_seconds / 3
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.completed = 0
+        self._prices: Dict[tuple, Any] = {}
+        self._stop = threading.Event()
+
+    def stop(self):
+        self._stop.set()
+
+    def run(self, max_jobs: Optional[int] = None, idle_timeout: Optional[float] = None) -> int:
+        """
+        Process jobs until stopped, max_jobs are done or the queue stays empty.
+
+        Args:
+            max_jobs: Stop after this many jobs
+            idle_timeout: Stop after this many seconds without a job (None waits forever)
+
+        Returns:
+            Jobs processed
+        """
+        processed = 0
+        idle_since = time.monotonic()
+        logger.info(f"Backtest worker {self.worker_id} pulling from {self.queue.name}")
+        while not self._stop.is_set() and (max_jobs is None or processed < max_jobs):
+            self.queue.heartbeat(self.worker_id, completed=self.completed)
+            self.queue.requeue_expired()
+            job = self.queue.claim(self.worker_id, timeout=min(self.heartbeat_seconds, 5.0))
+            if job is None:
+                if idle_timeout is not None and time.monotonic() - idle_since > idle_timeout:
+                    break
+                continue
+            self._process(job)
+            processed += 1
+            idle_since = time.monotonic()
+        return processed
+
+    def _process(self, job: BacktestJob):
+        done = threading.Event()
+
+        def beat():
+            while not done.wait(self.heartbeat_seconds):
+                self.queue.heartbeat(self.worker_id, job.job_id, self.completed)
+
+        beater = threading.Thread(target=beat, daemon=True)
+        beater.start()
+        try:
+            summary = self.run_job(job)
+        except Exception as e:
+            self.queue.fail(job.job_id, str(e))
+        else:
+            self.queue.complete(job.job_id, summary)
+            self.completed += 1
+        finally:
+            done.set()
+            beater.join()
+
+    def run_job(self, job: BacktestJob) -> Dict[str, Any]:
+        """One backtest, as backtest_sweep._run_one runs it"""
+        engine = BacktestEngine(self.initial_capital, feed=self.feed, cache=self.cache, history=self.history)
+        apply_params(engine, job.strategy_name, job.params)
+        result = engine.run_backtest(
+            job.strategy_name, job.symbol, job.start_date, job.end_date,
+            price_data=self._price_data(engine, job),
+            vectorized=job.vectorized
+        )
+        return result.summary()
+
+    def _price_data(self, engine: BacktestEngine, job: BacktestJob):
+        """Each series is loaded once per worker; sweeps send many jobs for the same one"""
+        key = (job.symbol, job.start_date, job.end_date)
+        if key not in self._prices:
+            loader = self.price_loader or engine.load_history
+            self._prices = {key: loader(*key)}  # Keep one series; jobs arrive grouped
+        return self._prices[key]
+
+
+def _worker_main(url: str, name: str, lease_seconds: float, worker_kwargs: Dict[str, Any],
+                 idle_timeout: Optional[float], quiet: bool):
+    if quiet:
+        logging.getLogger().setLevel(logging.WARNING)
+    queue = BacktestQueue(url, name, lease_seconds)
+    QueueWorker(queue, **worker_kwargs).run(idle_timeout=idle_timeout)
+
+
+def start_workers(
+    queue: BacktestQueue,
+    processes: int,
+    idle_timeout: Optional[float] = None,
+    quiet: bool = True,
+    **worker_kwargs
+) -> List[Process]:
+    """
+    Start worker processes on this node, each with its own Redis connection.
+
+    Args:
+        queue: Queue to serve (its url, name and lease are passed on)
+        processes: Worker processes to start
+        idle_timeout: Workers exit after this long without a job
+        quiet: Drop per-bar INFO logging inside workers
+        **worker_kwargs: QueueWorker arguments (feed_factory, price_loader, ...)
+    """
+    workers = [
+        Process(
+            target=_worker_main,
+            args=(queue.url, queue.name, queue.lease_seconds, worker_kwargs, idle_timeout, quiet),
+            daemon=True
+        )
+        for _ in range(processes)
+    ]
+    for process in workers:
+        process.start()
+    return workers
+
+
+class DistributedSweep:
+    """
+    ParameterSweep whose runs go through a BacktestQueue.
+
+    Example:
+        sweep = DistributedSweep(BacktestQueue('redis://queue-host:6379/0'))
+        table = sweep.run('trend_follower', 'SPY', '2015-01-01', '2024-12-31',
+                          {'fast_period': range(2, 40), 'slow_period': range(20, 220, 8)})
+    """
+
+    def __init__(self, queue: BacktestQueue, vectorized: bool = False, timeout: Optional[float] = None):
+        """
+        Args:
+            queue: Queue served by QueueWorkers on any number of nodes
+            vectorized: Use the vectorized replay for every run
+            timeout: Seconds to wait for the whole sweep (None waits forever)
+        """
+        self.queue = queue
+        self.vectorized = vectorized
+        self.timeout = timeout
+
+    def run(
+        self,
+        strategy_name: str,
+        symbol: str,
+        start_date: str,
+        end_date: str,
+        param_grid: Dict[str, List[Any]],
+        rank_by: str = 'sharpe_ratio'
+    ) -> List[Dict[str, Any]]:
+        """Same table as ParameterSweep.run; workers load the price data themselves"""
+        return self.run_combinations(
+            strategy_name, symbol, start_date, end_date, expand_grid(param_grid), rank_by
+        )
+
+    def run_combinations(
+        self,
+        strategy_name: str,
+        symbol: str,
+        start_date: str,
+        end_date: str,
+        combinations: List[Dict[str, Any]],
+        rank_by: str = 'sharpe_ratio'
+    ) -> List[Dict[str, Any]]:
+        """Same as run, for an explicit list of parameter dicts"""
+        jobs = [
+            BacktestJob(strategy_name, symbol, start_date, end_date, params, self.vectorized)
+            for params in combinations
+        ]
+        job_ids = self.queue.submit(jobs)
+        logger.info(
+            f"Queued {len(jobs)} parameter sets for {strategy_name} on {symbol} "
+            f"({len(self.queue.workers())} workers alive)"
+        )
+        results = self.queue.wait(job_ids, timeout=self.timeout)
+
+        rows = []
+        for job in jobs:
+            outcome = results[job.job_id]
+            rows.append(_row(job.params, outcome['ok'] if 'ok' in outcome else Exception(outcome['error'])))
+        return rank_rows(rows, rank_by)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run backtest queue workers on this node')
+    parser.add_argument('url', help='Redis URL, e.g. redis://queue-host:6379/0')
+    parser.add_argument('--queue', default=DEFAULT_QUEUE, help='Queue name (key prefix)')
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--lease', type=float, default=60.0, help='Lease seconds per job')
+    parser.add_argument('--history', help='HistoryStore directory for price data')
+    parser.add_argument('--cache', help='BacktestCache file on this node')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    queue = BacktestQueue(args.url, args.queue, args.lease)
+    for process in start_workers(queue, args.processes, history_root=args.history, cache_path=args.cache):
+        process.join()
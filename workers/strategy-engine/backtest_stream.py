@@ -0,0 +1,178 @@
+"""
+Async progress streaming for long backtests.
+
+stream_backtest runs BacktestEngine.run_backtest on a worker thread and
+yields BacktestProgress frames as the per-bar loop advances (bars done,
+equity, drawdown and running Sharpe from the ledger's online
+accumulators), then a final frame carrying the BacktestResult. The event
+loop stays free while the replay runs, so a server can stream many
+backtests to the frontend at once.
+"""
+import asyncio
+import functools
+import logging
+import threading
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Optional
+
+from backtest_engine import BacktestEngine, BacktestResult, is_stream
+
+logger = logging.getLogger(__name__)
+
+# Progress frames per run when the bar count is known up front
+DEFAULT_FRAMES = 100
+
+
+class BacktestCancelled(Exception):
+    """Raised inside the replay thread once the consumer stops listening"""
+
+
+@dataclass
+class BacktestProgress:
+    """One progress frame of a streamed backtest"""
+    bars_processed: int
+    total_bars: Optional[int]  # None for streamed price_data
+    equity: float
+    total_return: float
+    drawdown: float  # Current distance below the equity peak, in percent
+    max_drawdown: float
+    sharpe_ratio: float
+    trades: int  # Completed round trips
+    done: bool = False
+    result: Optional[BacktestResult] = None  # Set on the final frame
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-ready frame; the final one includes the result summary"""
+        frame = {name: value for name, value in self.__dict__.items() if name != 'result'}
+        if self.result is not None:
+            frame['result'] = self.result.summary()
+        return frame
+
+
+async def stream_backtest(
+    engine: BacktestEngine,
+    strategy_name: str,
+    symbol: str,
+    start_date: str,
+    end_date: str,
+    price_data=None,
+    progress_every: Optional[int] = None,
+    executor: Optional[Executor] = None,
+    **kwargs
+) -> AsyncIterator[BacktestProgress]:
+    """
+    Run a backtest off the event loop and yield its progress.
+
+    The run uses engine.fork(), so concurrent streams on one engine (e.g.
+    the get_backtest_engine singleton) never share agent state. Closing the
+    generator early cancels the replay at its next progress frame.
+
+    Example:
+        async for frame in stream_backtest(engine, 'trend_follower', 'SPY', start, end):
+            await websocket.send_json(frame.to_dict())
+
+    Args:
+        engine: Engine to fork for this run
+        strategy_name, symbol, start_date, end_date, price_data: As for run_backtest
+        progress_every: Bars between frames (defaults to ~100 frames per run)
+        executor: Thread pool to run on (defaults to the loop's executor)
+        **kwargs: Passed through to run_backtest (vectorized, use_cache, ...)
+
+    Yields:
+        BacktestProgress frames, the last one with done=True and the result
+
+    Raises:
+        Whatever run_backtest raises, once the frames before it are yielded
+    """
+    loop = asyncio.get_running_loop()
+    frames: asyncio.Queue = asyncio.Queue()
+    cancelled = threading.Event()
+
+    total_bars = None
+    if isinstance(price_data, dict):
+        total_bars = len(price_data['timestamp'])
+    elif price_data is not None and not is_stream(price_data):
+        total_bars = len(price_data)
+    if progress_every is None:
+        progress_every = max(1, total_bars // DEFAULT_FRAMES) if total_bars else 1000
+
+    def on_progress(frame: Dict):
+        # Runs on the replay thread
+        if cancelled.is_set():
+            raise BacktestCancelled()
+        loop.call_soon_threadsafe(frames.put_nowait, frame)
+
+    run = loop.run_in_executor(executor, functools.partial(
+        engine.fork().run_backtest, strategy_name, symbol, start_date, end_date,
+        price_data=price_data, on_progress=on_progress, progress_every=progress_every, **kwargs
+    ))
+
+    last: Optional[BacktestProgress] = None
+    try:
+        while True:
+            next_frame = asyncio.ensure_future(frames.get())
+            await asyncio.wait({next_frame, run}, return_when=asyncio.FIRST_COMPLETED)
+            if not next_frame.done():
+                next_frame.cancel()
+                break
+            last = _progress(next_frame.result(), total_bars)
+            yield last
+
+        # Frames queued before the run finished are delivered before its end
+        while not frames.empty():
+            last = _progress(frames.get_nowait(), total_bars)
+            yield last
+
+        yield _final(run.result(), last, total_bars, engine.initial_capital)
+    finally:
+        if not run.done():
+            cancelled.set()
+            # The replay ends with BacktestCancelled, which nobody awaits
+            run.add_done_callback(lambda future: future.cancelled() or future.exception())
+            logger.info(f"Stream of {strategy_name} on {symbol} closed; cancelling the replay")
+
+
+def _progress(frame: Dict, total_bars: Optional[int]) -> BacktestProgress:
+    return BacktestProgress(
+        bars_processed=frame['bars_processed'],
+        total_bars=total_bars,
+        equity=frame['equity'],
+        total_return=frame['total_return'],
+        drawdown=frame['drawdown'],
+        max_drawdown=frame['max_drawdown'],
+        sharpe_ratio=frame['sharpe_ratio'],
+        trades=frame['trades']
+    )
+
+
+def _final(
+    result: BacktestResult,
+    last: Optional[BacktestProgress],
+    total_bars: Optional[int],
+    initial_capital: float
+) -> BacktestProgress:
+    """Closing frame from the finished result (cache hits and vectorized runs only produce this one)"""
+    curve = result.equity_curve
+    if len(curve):
+        values = curve._values  # stdlib array; avoids a datetime per bar
+        bars, equity = len(values), values[-1]
+        peak = max(initial_capital, max(values))
+        drawdown = round((peak - equity) / peak * 100, 2)
+    else:
+        # Streamed input keeps no curve; the replay's last frame is taken on its final bar
+        bars = last.bars_processed if last else 0
+        equity = initial_capital * (1 + result.total_return / 100)
+        drawdown = last.drawdown if last else 0.0
+    return BacktestProgress(
+        bars_processed=total_bars if total_bars is not None else bars,
+        total_bars=total_bars,
+        equity=round(equity, 2),
+        total_return=result.total_return,
+        drawdown=drawdown,
+        max_drawdown=result.max_drawdown,
+        sharpe_ratio=result.sharpe_ratio,
+        trades=result.total_trades,
+        done=True,
+        result=result
+    )
@@ -0,0 +1,256 @@
+"""
+Parameter sweeps over BacktestEngine.
+
+Expands a grid of agent parameters, fans the backtests out over a process
+pool sized to the machine, and returns a table ranked by a result metric.
+Price data is fetched once in the parent and placed in shared memory;
+workers attach to that one copy instead of each unpickling their own.
+"""
+import itertools
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from agents.mean_reversion import MeanReversion
+from backtest_cache import BacktestCache
+from backtest_engine import BacktestEngine
+from shared_dataset import attach_price_data, shared_price_data
+
+logger = logging.getLogger(__name__)
+
+# Agents a sweep can run or tune that the live evaluator does not register
+SWEEP_AGENTS: Dict[str, Callable[[], Any]] = {
+    'mean_reversion': MeanReversion,
+}
+
+# Per-process state installed by _init_worker
+_worker_state: Dict[str, Any] = {}
+
+
+def expand_grid(param_grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """
+    Cartesian product of a parameter grid.
+
+    Example:
+        expand_grid({'fast_period': [5, 10], 'slow_period': [20, 50]})
+        -> [{'fast_period': 5, 'slow_period': 20}, ...]  (4 combinations)
+    """
+    names = list(param_grid)
+    return [dict(zip(names, values)) for values in itertools.product(*param_grid.values())]
+
+
+def apply_params(engine: BacktestEngine, strategy_name: str, params: Dict[str, Any]):
+    """
+    Push sweep parameters onto the engine's agents.
+
+    Plain keys target the strategy's own agent ('pb_threshold' for 'graham').
+    Dotted keys target a named agent, which is how multi_agent is tuned
+    ('trend_follower.fast_period'). SWEEP_AGENTS are registered on the
+    engine first when the strategy or a key names one.
+    """
+    by_agent: Dict[str, Dict[str, Any]] = {}
+    for key, value in params.items():
+        agent_name, _, param = key.rpartition('.')
+        by_agent.setdefault(agent_name or strategy_name, {})[param] = value
+
+    for agent_name in (strategy_name, *by_agent):
+        if agent_name in SWEEP_AGENTS and agent_name not in engine.evaluator.agents:
+            engine.evaluator.register_agent(agent_name, SWEEP_AGENTS[agent_name]())
+
+    for agent_name, agent_params in by_agent.items():
+        engine.evaluator.configure_agent(agent_name, **agent_params)
+
+
+def _init_worker(price_data, initial_capital: float, feed_factory: Optional[Callable], quiet: bool,
+                 cache_path: Optional[str] = None):
+    """Runs once per worker process: attach the price data, build one shared feed and cache"""
+    if quiet:
+        logging.getLogger().setLevel(logging.WARNING)
+    _worker_state['price_data'] = attach_price_data(price_data)
+    _worker_state['initial_capital'] = initial_capital
+    _worker_state['feed'] = feed_factory() if feed_factory else None
+    _worker_state['cache'] = BacktestCache(cache_path) if cache_path else None
+
+
+def _run_one(strategy_name: str, symbol: str, start_date: str, end_date: str,
+             params: Dict[str, Any], vectorized: bool,
+             bar_range: Optional[Tuple[int, int]] = None) -> Dict[str, Any]:
+    """
+    One backtest on a fresh engine so agent state never leaks between runs.
+
+    bar_range=(start, stop) restricts the run to a slice of the worker's bars.
+    """
+    price_data = _worker_state['price_data']
+    if bar_range is not None:
+        price_data = slice_bars(price_data, *bar_range)
+
+    engine = BacktestEngine(
+        _worker_state['initial_capital'], feed=_worker_state['feed'], cache=_worker_state['cache']
+    )
+    apply_params(engine, strategy_name, params)
+    result = engine.run_backtest(
+        strategy_name, symbol, start_date, end_date,
+        price_data=price_data,
+        vectorized=vectorized
+    )
+    return result.summary()
+
+
+class ParameterSweep:
+    """
+    Grid search over agent parameters, one backtest per combination.
+
+    Example:
+        sweep = ParameterSweep(feed_factory=partial(ReplayDataFeed.from_path, 'spy.db'))
+        table = sweep.run('trend_follower', 'SPY', '2015-01-01', '2024-12-31',
+                          {'fast_period': [5, 10, 20], 'slow_period': [50, 100, 200]})
+        best = table[0]
+    """
+
+    def __init__(
+        self,
+        initial_capital: float = 100000.0,
+        max_workers: Optional[int] = None,
+        feed_factory: Optional[Callable] = None,
+        vectorized: bool = False,
+        quiet: bool = True,
+        cache_path: Optional[str] = None
+    ):
+        """
+        Args:
+            initial_capital: Starting capital for every run
+            max_workers: Worker processes (defaults to the CPU count); 1 runs in-process
+            feed_factory: Picklable zero-arg callable building each worker's feed
+                          (defaults to a live MultiSourceDataFeed per worker)
+            vectorized: Use the vectorized replay for every run
+            quiet: Drop per-bar INFO logging inside workers
+            cache_path: BacktestCache file shared by the workers; repeated
+                        combinations are then served from the cache
+        """
+        self.initial_capital = initial_capital
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.feed_factory = feed_factory
+        self.vectorized = vectorized
+        self.quiet = quiet
+        self.cache_path = cache_path
+
+    def run(
+        self,
+        strategy_name: str,
+        symbol: str,
+        start_date: str,
+        end_date: str,
+        param_grid: Dict[str, List[Any]],
+        price_data: Optional[List[Dict]] = None,
+        rank_by: str = 'sharpe_ratio'
+    ) -> List[Dict[str, Any]]:
+        """
+        Run every combination in the grid and rank the results.
+
+        Args:
+            strategy_name: Strategy to test (e.g., 'graham', 'trend_follower')
+            symbol: Asset symbol
+            start_date: Start date (YYYY-MM-DD)
+            end_date: End date (YYYY-MM-DD)
+            param_grid: {param: [values]}; see apply_params for key format
+            price_data: Optional historical price data (fetched once if omitted)
+            rank_by: BacktestResult metric to sort on, highest first
+
+        Returns:
+            One row per combination: {'rank', 'params', <BacktestResult metrics>}.
+            Failed runs come last with an 'error' entry instead of metrics.
+        """
+        combinations = expand_grid(param_grid)
+        return self.run_combinations(
+            strategy_name, symbol, start_date, end_date, combinations, price_data, rank_by
+        )
+
+    def run_combinations(
+        self,
+        strategy_name: str,
+        symbol: str,
+        start_date: str,
+        end_date: str,
+        combinations: List[Dict[str, Any]],
+        price_data: Optional[List[Dict]] = None,
+        rank_by: str = 'sharpe_ratio'
+    ) -> List[Dict[str, Any]]:
+        """Same as run, for an explicit list of parameter dicts"""
+        if price_data is None:
+            price_data = BacktestEngine(self.initial_capital)._fetch_real_historical_data(
+                symbol, start_date, end_date
+            )
+
+        logger.info(
+            f"Sweeping {len(combinations)} parameter sets for {strategy_name} on {symbol} "
+            f"across {min(self.max_workers, len(combinations))} workers"
+        )
+
+        initargs = (price_data, self.initial_capital, self.feed_factory, self.quiet, self.cache_path)
+        task_args = [
+            (strategy_name, symbol, start_date, end_date, params, self.vectorized)
+            for params in combinations
+        ]
+        rows = [
+            _row(args[4], outcome)
+            for args, outcome in run_in_pool(_run_one, task_args, initargs, self.max_workers)
+        ]
+        return rank_rows(rows, rank_by)
+
+
+def run_in_pool(fn: Callable, task_args: List[tuple], initargs: tuple, max_workers: int) -> List[tuple]:
+    """
+    Run fn(*args) for every args tuple on worker processes set up by _init_worker.
+
+    With max_workers=1 (or a single task) everything runs in this process.
+
+    Returns:
+        [(args, result_or_exception)] in completion order
+    """
+    outcomes = []
+    if max_workers == 1 or len(task_args) == 1:
+        # Same setup as the workers, but never touch this process's log level
+        _init_worker(*initargs[:3], False, *initargs[4:])
+        for args in task_args:
+            try:
+                outcomes.append((args, fn(*args)))
+            except Exception as e:
+                outcomes.append((args, e))
+        return outcomes
+
+    workers = min(max_workers, len(task_args))
+    with shared_price_data(initargs[0]) as shared:
+        initargs = (shared, *initargs[1:])
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as pool:
+            futures = {pool.submit(fn, *args): args for args in task_args}
+            for future in as_completed(futures):
+                try:
+                    outcomes.append((futures[future], future.result()))
+                except Exception as e:
+                    outcomes.append((futures[future], e))
+    return outcomes
+
+
+def slice_bars(price_data, start: int, stop: int):
+    """Bars [start, stop) of a bar-dict list or of columns (views, not copies)"""
+    if isinstance(price_data, dict):
+        return {name: column[start:stop] for name, column in price_data.items()}
+    return price_data[start:stop]
+
+
+def _row(params: Dict[str, Any], outcome) -> Dict[str, Any]:
+    """Turn one finished run into a table row, keeping failures visible"""
+    if isinstance(outcome, Exception):
+        logger.error(f"Sweep run {params} failed: {outcome}")
+        return {'params': params, 'error': str(outcome)}
+    return {'params': params, **outcome}
+
+
+def rank_rows(rows: List[Dict[str, Any]], rank_by: str = 'sharpe_ratio') -> List[Dict[str, Any]]:
+    """Sort rows best-first on a metric and number them; failed rows go last"""
+    ok = sorted((r for r in rows if 'error' not in r), key=lambda r: r[rank_by], reverse=True)
+    failed = [r for r in rows if 'error' in r]
+    for rank, row in enumerate(ok + failed, start=1):
+        row['rank'] = rank
+    return ok + failed
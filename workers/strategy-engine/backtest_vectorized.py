@@ -0,0 +1,179 @@
+"""
+Vectorized replay for the backtest engine.
+
+Loads a price series into contiguous NumPy arrays and derives fills,
+positions, equity and metrics with array operations instead of the
+per-bar loop in BacktestEngine.run_backtest.
+"""
+import itertools
+from typing import Any, Dict, Iterator, List, Union
+from dataclasses import dataclass
+
+try:
+    import numpy as np
+except ImportError:  # Deployment targets without NumPy only get the per-bar loop
+    np = None
+
+from backtest_columns import epoch_ns_array, from_epoch_ns
+
+# Fraction of capital committed on each entry (matches run_backtest)
+POSITION_ALLOCATION = 0.95
+
+
+def require_numpy():
+    """Raise a clear error when the vectorized path is requested without NumPy"""
+    if np is None:
+        raise ImportError("Vectorized backtests require numpy (pip install numpy)")
+
+
+def load_price_arrays(price_data: Union[List[Dict], Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Convert run_backtest's list of bar dicts into contiguous columns.
+
+    Timestamps become int64 epoch nanoseconds. Missing open/high/low default
+    to the bar price and missing volume to 0, the same defaults run_backtest
+    passes to the evaluator.
+
+    Columns that are already arrays (HistoryStore.load, get_ohlcv, with
+    'close' or 'price') are passed through without copying.
+    """
+    require_numpy()
+    if isinstance(price_data, dict):
+        price = np.asarray(price_data['price'] if 'price' in price_data else price_data['close'], dtype=float)
+        return {
+            'timestamp': np.asarray(price_data['timestamp'], dtype=np.int64),
+            'price': price,
+            'volume': np.asarray(price_data['volume'], dtype=float) if 'volume' in price_data else np.zeros(len(price)),
+            'open': np.asarray(price_data.get('open', price), dtype=float),
+            'high': np.asarray(price_data.get('high', price), dtype=float),
+            'low': np.asarray(price_data.get('low', price), dtype=float),
+        }
+
+    price = np.array([bar['price'] for bar in price_data], dtype=float)
+    timestamps = epoch_ns_array(bar['timestamp'] for bar in price_data)
+
+    # One pass over the dicts for the remaining columns
+    rest = np.array([
+        (bar.get('volume', 0), bar.get('open', p), bar.get('high', p), bar.get('low', p))
+        for bar, p in zip(price_data, price.tolist())
+    ], dtype=float).reshape(-1, 4)
+
+    columns = {'timestamp': timestamps, 'price': price}
+    for i, name in enumerate(('volume', 'open', 'high', 'low')):
+        columns[name] = np.ascontiguousarray(rest[:, i])
+    return columns
+
+
+def price_bars(columns: Dict[str, Any]) -> List[Dict]:
+    """
+    Inverse of load_price_arrays: bar dicts for the per-bar loop.
+
+    Timestamps come back as naive UTC datetimes. Without NumPy the columns
+    are the plain lists get_ohlcv returns, and the per-bar loop still works.
+    """
+    return list(iter_price_bars(columns))
+
+
+def iter_price_bars(columns: Dict[str, Any], start: int = 0, chunk: int = 4096) -> Iterator[Dict]:
+    """
+    price_bars one chunk at a time, from bar `start` on.
+
+    Only `chunk` bar dicts exist at once, so a per-bar replay over shared
+    or memory-mapped columns never holds the whole series as dicts.
+    """
+    names = ('price', 'volume', 'open', 'high', 'low')
+    if np is None:
+        price = list(columns['price'] if 'price' in columns else columns['close'])
+        rows = zip(
+            columns['timestamp'], price,
+            columns.get('volume') or [0.0] * len(price),
+            columns.get('open') or price, columns.get('high') or price, columns.get('low') or price
+        )
+        for ts, *values in itertools.islice(rows, start, None):
+            yield {'timestamp': from_epoch_ns(ts), **dict(zip(names, values))}
+        return
+
+    arrays = load_price_arrays(columns)
+    for lo in range(start, len(arrays['price']), chunk):
+        hi = lo + chunk
+        rows = zip(arrays['timestamp'][lo:hi].tolist(), *(arrays[name][lo:hi].tolist() for name in names))
+        for ts, *values in rows:
+            yield {'timestamp': from_epoch_ns(ts), **dict(zip(names, values))}
+
+
+@dataclass
+class FillResult:
+    """Round trips and per-bar equity produced by simulate_fills"""
+    entry_index: Any  # int array, bar of each BUY
+    exit_index: Any  # int array, bar of each SELL (last bar if closed at the end)
+    entry_price: Any
+    exit_price: Any
+    quantity: Any
+    pnl: Any
+    equity: Any  # float array, one value per bar
+
+
+def simulate_fills(
+    prices,
+    decision,
+    approved,
+    initial_capital: float,
+    allocation: float = POSITION_ALLOCATION
+) -> FillResult:
+    """
+    Long-only, all-in fills for a decision series.
+
+    Same rules as the run_backtest loop: enter on an approved BUY while flat,
+    exit on any SELL while long, close an open position at the last price.
+
+    Args:
+        prices: float array of bar prices
+        decision: int array, 1 BUY, -1 SELL, 0 HOLD
+        approved: bool array, final_action == 'APPROVED'
+        initial_capital: Starting capital in USD
+        allocation: Fraction of capital used per entry
+
+    Returns:
+        FillResult
+    """
+    n = len(prices)
+    marks = np.where((decision == 1) & approved, 1, np.where(decision == -1, -1, 0))
+
+    # After each bar we are long iff the most recent entry/exit mark was an entry
+    last_mark = np.maximum.accumulate(np.where(marks != 0, np.arange(n), -1))
+    is_long = (last_mark >= 0) & (marks[np.maximum(last_mark, 0)] == 1)
+    was_long = np.concatenate(([False], is_long[:-1]))
+
+    entry_index = np.flatnonzero(is_long & ~was_long)
+    exit_index = np.flatnonzero(~is_long & was_long)
+    if len(exit_index) < len(entry_index):
+        exit_index = np.append(exit_index, n - 1)
+
+    entry_price = prices[entry_index]
+    exit_price = prices[exit_index]
+
+    # Capital compounds per round trip: the unused slice stays in cash
+    growth = (1 - allocation) + allocation * exit_price / entry_price
+    capital = initial_capital * np.concatenate(([1.0], np.cumprod(growth)))
+    quantity = capital[:-1] * allocation / entry_price
+    cash_while_long = capital[:-1] - quantity * entry_price
+    pnl = (exit_price - entry_price) * quantity
+
+    # Round trips opened so far at each bar picks the ledger row for that bar
+    trips = np.cumsum(is_long & ~was_long)
+    open_trip = np.maximum(trips - 1, 0)
+    if len(entry_index):
+        long_equity = cash_while_long[open_trip] + quantity[open_trip] * prices
+    else:
+        long_equity = np.zeros(n)
+    equity = np.where(is_long, long_equity, capital[trips])
+
+    return FillResult(
+        entry_index=entry_index,
+        exit_index=exit_index,
+        entry_price=entry_price,
+        exit_price=exit_price,
+        quantity=quantity,
+        pnl=pnl,
+        equity=equity
+    )
@@ -0,0 +1,225 @@
+"""
+Content-addressed cache of LLM responses (Kimi research, battle explanations).
+
+Most research prompts repeat: the fundamentals, Polymarket odds and
+on-chain health behind them change far less often than they are asked
+about. Entries are keyed by a fingerprint of the prompt inputs, not the
+prompt text. Floats are rounded to a few significant digits and
+bookkeeping fields such as fetch timestamps are dropped, so a re-fetch
+of unchanged data maps to the same key. The model and temperature are
+part of the key too.
+
+Entries live in an in-memory LRU with a TTL. An optional SQLite file
+keeps them across restarts and lets worker processes share them.
+"""
+import hashlib
+import json
+import math
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Bump when prompts change meaning, so old answers stop matching
+LLM_CACHE_SCHEMA_VERSION = 1
+
+# Fetch bookkeeping that changes on every call without changing the data
+VOLATILE_KEYS = frozenset({'timestamp', 'updated_at', 'fetched_at'})
+
+DEFAULT_DIGITS = 4
+DEFAULT_TTL_SECONDS = 3600.0
+
+
+def canonicalize(value: Any, digits: int = DEFAULT_DIGITS) -> Any:
+    """
+    JSON-ready copy of value with floats rounded to `digits` significant
+    digits, dict keys stringified and VOLATILE_KEYS removed.
+    """
+    if isinstance(value, dict):
+        return {
+            str(k): canonicalize(v, digits) for k, v in value.items()
+            if str(k) not in VOLATILE_KEYS
+        }
+    if isinstance(value, (list, tuple)):
+        return [canonicalize(v, digits) for v in value]
+    if isinstance(value, bool) or value is None or isinstance(value, (int, str)):
+        return value
+    if isinstance(value, float):
+        if not math.isfinite(value):
+            return str(value)
+        return float(f"{value:.{digits}g}")
+    if hasattr(value, 'item'):  # NumPy scalars
+        return canonicalize(value.item(), digits)
+    return str(value)
+
+
+def prompt_fingerprint(model: str, temperature: float, digits: int = DEFAULT_DIGITS, **inputs) -> str:
+    """Stable hash of an LLM call's model, temperature and prompt inputs"""
+    payload = json.dumps(
+        {
+            'schema': LLM_CACHE_SCHEMA_VERSION,
+            'model': model,
+            'temperature': temperature,
+            'inputs': canonicalize(inputs, digits)
+        },
+        sort_keys=True, separators=(',', ':')
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class LLMCache:
+    """
+    TTL + LRU cache of LLM responses, in memory with an optional disk tier.
+
+    Only successful responses belong here; callers skip put() for fallbacks
+    so an outage is not replayed for the next hour.
+
+    Example:
+        cache = LLMCache(path='llm_cache.db')
+        key = prompt_fingerprint('moonshot-v1-8k', 0.3, asset='BTC', fundamentals=fund)
+        summary = cache.get(key)
+        if summary is None:
+            summary = call_llm(...)
+            cache.put(key, summary)
+        cache.stats()['hit_rate']
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        path: Optional[str] = None,
+        max_disk_entries: int = 100_000
+    ):
+        """
+        Args:
+            max_entries: Responses kept in memory before the least recently used is dropped
+            ttl_seconds: Age after which a response is treated as missing
+            path: SQLite file for the disk tier (None keeps the cache in memory only)
+            max_disk_entries: Rows kept on disk before the least recently used are dropped
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.path = path
+        self.max_disk_entries = max_disk_entries
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._memory: 'OrderedDict[str, Tuple[float, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        if path is not None:
+            self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_access)")
+            self._conn.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Cached response for key, or None if missing or expired; counts a hit or miss"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._memory[key]
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT payload, expires_at FROM responses WHERE key = ? AND expires_at > ?", (key, now)
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+                    self._conn.commit()
+                    value = json.loads(row[0])
+                    self._remember(key, row[1], value)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return value
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: Any, ttl_seconds: Optional[float] = None):
+        """Store a JSON-serialisable response for ttl_seconds (default: the cache's TTL)"""
+        now = time.time()
+        expires_at = now + (self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+        with self._lock:
+            self._remember(key, expires_at, value)
+            if self._conn is None:
+                return
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, payload, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), expires_at, now)
+            )
+            self._conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+            excess = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_disk_entries
+            if excess > 0:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses WHERE key != ? ORDER BY last_access LIMIT ?)",
+                    (key, excess)
+                )
+                self.evictions += excess
+            self._conn.commit()
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        """Cached response, or compute() stored under key"""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM responses")
+                self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process plus the cache's current size"""
+        with self._lock:
+            disk_entries = None
+            if self._conn is not None:
+                disk_entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            entries = len(self._memory)
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'evictions': self.evictions,
+            'entries': entries,
+            'disk_entries': disk_entries,
+            'max_entries': self.max_entries
+        }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _remember(self, key: str, expires_at: float, value: Any):
+        """Insert into the memory tier, dropping least recently used entries (lock held)"""
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
@@ -0,0 +1,217 @@
+"""
+As-of join of multi-rate sources onto a bar clock.
+
+Prices arrive daily, Polymarket odds whenever they move, DeFiLlama TVL
+daily and fundamentals quarterly. For a backtest each bar may only see
+the latest observation of every source published at or before it. This
+module finds that observation for all bars at once with a sorted-array
+search (np.searchsorted), so millions of rows join in milliseconds.
+
+The joined table has one column per source metric ('fundamentals.price_to_book',
+'events.recession', ...). It feeds rule_backtest directly, and AsOfDataFeed
+turns a table into per-bar unified snapshots for BacktestEngine and
+FundamentalAgent, the same shape MultiSourceDataFeed returns.
+"""
+
+import hashlib
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Union
+
+from backtest_columns import from_epoch_ns, observation_ns_array, to_epoch_ns
+from backtest_vectorized import load_price_arrays, np, require_numpy
+from market_data.multi_source_feed import MultiSourceDataFeed
+
+# Unified-snapshot sections whose metrics are event odds ({name: {'yes_probability': p}})
+EVENT_SECTIONS = ('events',)
+
+Duration = Union[int, float, None]  # seconds
+
+
+@dataclass
+class AsOfSource:
+    """
+    One irregular time series to join, e.g. quarterly fundamentals.
+
+    Example:
+        AsOfSource('fundamentals', report_dates, {'price_to_book': pb, 'price_to_earnings': pe},
+                   lag=45 * 86400)  # filings become public ~45 days after quarter end
+    """
+    name: str  # Column prefix and unified-snapshot section ('fundamentals', 'events', 'onchain', 'technical')
+    timestamp: Any  # Observation times: datetimes, datetime64, or numbers in `unit`
+    columns: Dict[str, Any]  # metric -> values, one per timestamp
+    lag: Duration = 0  # Seconds between an observation's timestamp and when it was knowable
+    max_age: Duration = None  # Seconds after which an observation is too stale to use
+    unit: Optional[str] = None  # Unit of numeric timestamps ('s', 'ms', 'us', 'ns'); required for them
+
+
+def asof_indices(clock, timestamps, lag: Duration = 0, max_age: Duration = None):
+    """
+    For every clock time, the index of the latest timestamp known by then.
+
+    An observation at t is known from t + lag onwards. Ties resolve to the
+    last observation at that time. -1 marks clock times with no usable
+    observation (none yet, or the latest is older than max_age).
+
+    Args:
+        clock: Sorted int64 epoch ns
+        timestamps: Sorted int64 epoch ns
+        lag: Publication delay in seconds
+        max_age: Staleness limit in seconds (measured from when it became known)
+    """
+    known_at = timestamps + int(round((lag or 0) * 1e9))
+    idx = np.searchsorted(known_at, clock, side='right') - 1
+    if max_age is not None and len(known_at):
+        stale = (idx >= 0) & (clock - known_at[np.maximum(idx, 0)] > int(round(max_age * 1e9)))
+        idx[stale] = -1
+    return idx
+
+
+def asof_join(clock, source: AsOfSource) -> Dict[str, Any]:
+    """
+    A source's columns sampled at every clock time, without lookahead.
+
+    Numeric columns come back as float64 with NaN where nothing is known;
+    other columns as object arrays with None.
+    """
+    require_numpy()
+    timestamps = observation_ns_array(source.timestamp, source.unit)
+    columns = {name: np.asarray(values) for name, values in source.columns.items()}
+
+    order = np.argsort(timestamps, kind='stable')
+    if (order != np.arange(len(timestamps))).any():
+        timestamps = timestamps[order]
+        columns = {name: values[order] for name, values in columns.items()}
+
+    idx = asof_indices(clock, timestamps, source.lag, source.max_age)
+    missing = idx < 0
+    take = np.maximum(idx, 0)
+
+    joined = {}
+    for name, values in columns.items():
+        if values.dtype.kind in 'biuf':
+            out = values.astype(float)[take] if len(values) else np.full(len(clock), np.nan)
+            out[missing] = np.nan
+        else:
+            out = values.astype(object)[take] if len(values) else np.full(len(clock), None, dtype=object)
+            out[missing] = None
+        joined[f'{source.name}.{name}'] = out
+    return joined
+
+
+def align_sources(price_data, sources: List[AsOfSource]) -> Dict[str, Any]:
+    """
+    Price bars plus every source joined onto their timestamps.
+
+    Args:
+        price_data: Bar dicts or columns, as run_backtest accepts
+        sources: Series to join; their names prefix the output columns
+
+    Returns:
+        {'timestamp', 'price', 'volume', 'open', 'high', 'low',
+         '<source>.<metric>', ...}, one row per bar
+    """
+    table = dict(load_price_arrays(price_data))
+    for source in sources:
+        table.update(asof_join(table['timestamp'], source))
+    return table
+
+
+def unified_sections(table: Dict[str, Any], row: int) -> Dict[str, Dict]:
+    """
+    One row of a joined table nested by source, in unified-snapshot shape.
+
+    NaN/None cells are left out. Event sections wrap each value as
+    {'yes_probability': value}, as PredictionMarketFeed reports odds.
+    """
+    sections: Dict[str, Dict] = {}
+    for column, values in table.items():
+        section, dot, metric = column.partition('.')
+        if not dot:
+            continue
+        value = values[row]
+        if value is None or (isinstance(value, float) and value != value):
+            continue
+        value = value.item() if hasattr(value, 'item') else value
+        sections.setdefault(section, {})[metric] = (
+            {'yes_probability': value} if section in EVENT_SECTIONS else value
+        )
+    return sections
+
+
+class AsOfDataFeed:
+    """
+    Unified data for backtests from as-of joined tables, offline.
+
+    Drop-in for MultiSourceDataFeed in BacktestEngine(feed=...). Each bar
+    gets the table row at or before its timestamp; conflicts and consensus
+    are computed exactly as the live feed does.
+
+    Example:
+        table = align_sources(bars, [fundamentals, odds, tvl])
+        engine = BacktestEngine(feed=AsOfDataFeed({'AAPL': table}))
+        engine.run_backtest('graham', 'AAPL', start, end, price_data=bars)
+    """
+
+    # Each bar may get a different row (see StrategyEvaluator.per_bar_snapshots)
+    snapshot_per_bar = True
+
+    def __init__(self, tables: Dict[str, Dict[str, Any]]):
+        """
+        Args:
+            tables: symbol -> align_sources output
+        """
+        self.tables = tables
+
+    @property
+    def data_version(self) -> str:
+        """Content hash of the joined tables, e.g. for backtest result cache keys"""
+        digest = hashlib.blake2b(digest_size=16)
+        for symbol in sorted(self.tables):
+            digest.update(symbol.encode())
+            for name in sorted(self.tables[symbol]):
+                values = np.asarray(self.tables[symbol][name])
+                digest.update(name.encode())
+                digest.update(values.tobytes() if values.dtype != object else repr(values.tolist()).encode())
+        return f"asof:{digest.hexdigest()}"
+
+    def get_unified_data(self,
+                         symbol: str,
+                         market_data: Dict,
+                         event_config: Optional[Dict] = None) -> Dict:
+        """
+        Return the joined sources as of this bar.
+
+        Raises:
+            KeyError: If the symbol has no table or the bar precedes it
+        """
+        table = self.tables[symbol]
+        timestamp = market_data.get('timestamp')
+        if timestamp is None:
+            raise KeyError(f"As-of feed needs market_data['timestamp'] for {symbol}")
+
+        # Bars carry epoch seconds (BacktestEngine._market_data)
+        row = int(np.searchsorted(table['timestamp'], to_epoch_ns(timestamp), side='right')) - 1
+        if row < 0:
+            raise KeyError(f"No joined data for {symbol} at or before {timestamp}")
+
+        sections = unified_sections(table, row)
+        events = sections.get('events', {})
+        onchain = sections.get('onchain', {})
+        fundamentals = sections.get('fundamentals', {'source': 'unavailable'})
+        technical = sections.get('technical', {})
+        return {
+            **sections,
+            'timestamp': from_epoch_ns(table['timestamp'][row]).isoformat(),
+            'symbol': symbol,
+            'events': events,
+            'onchain': onchain,
+            'fundamentals': fundamentals,
+            'technical': technical,
+            'market': market_data,
+            'conflicts': MultiSourceDataFeed._detect_conflicts(
+                events, onchain, fundamentals, technical, market_data
+            ),
+            'consensus': MultiSourceDataFeed._calculate_consensus(
+                events, onchain, fundamentals, technical
+            )
+        }
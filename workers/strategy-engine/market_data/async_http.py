@@ -0,0 +1,42 @@
+"""
+httpx.AsyncClient per event loop for the adapters' async fetches.
+
+The sync adapters keep their requests sessions; the *_async methods
+await an httpx.AsyncClient instead, so async servers (worker.py) wait on
+the network without a thread per request. An AsyncClient's connection
+pool belongs to the loop it first ran on, so each adapter keeps one client
+per running loop and lets it go with the loop.
+"""
+import asyncio
+import weakref
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+class LoopClients:
+    """
+    One httpx.AsyncClient per event loop, built from the same options.
+
+    Example:
+        http = LoopClients(headers={'User-Agent': '...'})
+        resp = await http.get().get(url, params=params, timeout=10)
+    """
+
+    def __init__(self, **options):
+        # httpx.AsyncClient keyword arguments (headers, transport, ...)
+        self.options = options
+        self._clients: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]' = \
+            weakref.WeakKeyDictionary()
+
+    def get(self) -> 'httpx.AsyncClient':
+        """The running loop's client"""
+        if httpx is None:
+            raise ImportError("httpx is required for async market data fetches")
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = self._clients[loop] = httpx.AsyncClient(**self.options)
+        return client
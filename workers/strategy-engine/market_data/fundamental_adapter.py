@@ -15,10 +15,17 @@ try:
     import requests
 except ImportError:
     requests = None
-from typing import Dict, Optional, List
-from datetime import datetime
+try:
+    import numpy as np
+except ImportError:  # get_ohlcv returns plain lists without NumPy
+    np = None
+from typing import Dict, Optional, List, Union
+from datetime import datetime, timezone
+import asyncio
 import json
 
+from market_data.async_http import LoopClients
+
 
 class YahooFinanceAdapter:
     """
@@ -28,12 +35,17 @@ class YahooFinanceAdapter:
     No API key required for basic quotes and statistics.
     """
 
+    HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
+    # quoteSummary modules behind get_fundamentals
+    SUMMARY_PARAMS = {
+        'modules': 'defaultKeyStatistics,financialData,balanceSheetHistory,incomeStatementHistory'
+    }
+
     def __init__(self):
         self.base_url = "https://query2.finance.yahoo.com"
         self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        self.session.headers.update(self.HEADERS)
+        self.http = LoopClients(headers=self.HEADERS)
         self.cache = {}
         self.cache_ttl = 3600  # 1 hour (fundamentals don't change frequently)
 
@@ -54,99 +66,118 @@ class YahooFinanceAdapter:
         try:
             # Get quote summary with key statistics
             url = f"{self.base_url}/v10/finance/quoteSummary/{symbol}"
-            params = {
-                'modules': 'defaultKeyStatistics,financialData,balanceSheetHistory,incomeStatementHistory'
-            }
-
-            resp = self.session.get(url, params=params, timeout=10)
+            resp = self.session.get(url, params=self.SUMMARY_PARAMS, timeout=10)
 
             if not resp.ok:
                 print(f"Yahoo Finance error {resp.status_code} for {symbol}")
                 return None
 
-            data = resp.json()
-            result = data.get('quoteSummary', {}).get('result', [])
+            return self._fundamentals(cache_key, symbol, resp.json())
 
-            if not result:
+        except Exception as e:
+            print(f"Failed to fetch fundamentals for {symbol}: {e}")
+            return None
+
+    async def get_fundamentals_async(self, symbol: str) -> Optional[Dict]:
+        """Awaitable get_fundamentals on an httpx.AsyncClient"""
+        cache_key = f"fundamentals_{symbol}"
+        if self._check_cache(cache_key):
+            return self.cache[cache_key]
+
+        try:
+            url = f"{self.base_url}/v10/finance/quoteSummary/{symbol}"
+            resp = await self.http.get().get(url, params=self.SUMMARY_PARAMS, timeout=10)
+
+            if not resp.is_success:
+                print(f"Yahoo Finance error {resp.status_code} for {symbol}")
                 return None
 
-            stats = result[0]
-
-            # Extract key metrics
-            key_stats = stats.get('defaultKeyStatistics', {})
-            financial_data = stats.get('financialData', {})
-            balance_sheet = stats.get('balanceSheetHistory', {}).get('balanceSheetStatements', [{}])[0]
-
-            # Get current price from financial data
-            current_price = self._extract_value(financial_data.get('currentPrice'))
-
-            # Calculate NCAV (Net Current Asset Value)
-            ncav_data = self._calculate_ncav(balance_sheet, key_stats)
-
-            fundamentals = {
-                'source': 'yahoo_finance',
-                'symbol': symbol,
-                'timestamp': datetime.now().isoformat(),
-
-                # Valuation ratios
-                'price': current_price,
-                'market_cap': self._extract_value(key_stats.get('marketCap')),
-                'enterprise_value': self._extract_value(key_stats.get('enterpriseValue')),
-
-                # Graham metrics
-                'price_to_book': self._extract_value(key_stats.get('priceToBook')),
-                'price_to_earnings': self._extract_value(key_stats.get('trailingPE')),
-                'forward_pe': self._extract_value(key_stats.get('forwardPE')),
-
-                # NCAV (Graham's Net-Net strategy)
-                'ncav_per_share': ncav_data.get('ncav_per_share'),
-                'ncav_ratio': ncav_data.get('ncav_ratio'),  # Price / NCAV
-
-                # Profitability
-                'profit_margin': self._extract_value(financial_data.get('profitMargins')),
-                'operating_margin': self._extract_value(financial_data.get('operatingMargins')),
-                'return_on_equity': self._extract_value(financial_data.get('returnOnEquity')),
-
-                # Financial health
-                'debt_to_equity': self._extract_value(financial_data.get('debtToEquity')),
-                'current_ratio': self._extract_value(financial_data.get('currentRatio')),
-                'quick_ratio': self._extract_value(financial_data.get('quickRatio')),
-
-                # Cash flow
-                'free_cash_flow': self._extract_value(financial_data.get('freeCashflow')),
-                'operating_cash_flow': self._extract_value(financial_data.get('operatingCashflow')),
-
-                # Growth
-                'revenue_growth': self._extract_value(financial_data.get('revenueGrowth')),
-                'earnings_growth': self._extract_value(financial_data.get('earningsGrowth')),
-
-                # Dividend
-                'dividend_yield': self._extract_value(key_stats.get('dividendYield')),
-
-                # Graham value score (custom calculation)
-                'graham_score': self._calculate_graham_score(
-                    self._extract_value(key_stats.get('priceToBook')),
-                    self._extract_value(key_stats.get('trailingPE')),
-                    ncav_data.get('ncav_ratio'),
-                    self._extract_value(financial_data.get('debtToEquity'))
-                ),
-
-                # Intrinsic Value (Graham Formula)
-                'intrinsic_value': self._calculate_intrinsic_value(
-                    self._extract_value(key_stats.get('trailingPE')), # Using EPS proxy via PE? No, need EPS relative
-                    self._extract_value(financial_data.get('revenueGrowth')), # Growth proxy
-                    4.4, # Bond Yield
-                    self._extract_value(key_stats.get('trailingEps'))
-                )
-            }
-
-            self.cache[cache_key] = fundamentals
-            return fundamentals
+            return self._fundamentals(cache_key, symbol, resp.json())
 
         except Exception as e:
-            print(f"Failed to fetch fundamentals for {symbol}: {e}")
+            print(f"Failed to fetch fundamentals for {symbol}: {e!r}")
+            return None
+
+    def _fundamentals(self, cache_key: str, symbol: str, data: Dict) -> Optional[Dict]:
+        """Cached Graham metrics from a quoteSummary response"""
+        result = data.get('quoteSummary', {}).get('result', [])
+
+        if not result:
             return None
 
+        stats = result[0]
+
+        # Extract key metrics
+        key_stats = stats.get('defaultKeyStatistics', {})
+        financial_data = stats.get('financialData', {})
+        balance_sheet = stats.get('balanceSheetHistory', {}).get('balanceSheetStatements', [{}])[0]
+
+        # Get current price from financial data
+        current_price = self._extract_value(financial_data.get('currentPrice'))
+
+        # Calculate NCAV (Net Current Asset Value)
+        ncav_data = self._calculate_ncav(balance_sheet, key_stats)
+
+        fundamentals = {
+            'source': 'yahoo_finance',
+            'symbol': symbol,
+            'timestamp': datetime.now().isoformat(),
+
+            # Valuation ratios
+            'price': current_price,
+            'market_cap': self._extract_value(key_stats.get('marketCap')),
+            'enterprise_value': self._extract_value(key_stats.get('enterpriseValue')),
+
+            # Graham metrics
+            'price_to_book': self._extract_value(key_stats.get('priceToBook')),
+            'price_to_earnings': self._extract_value(key_stats.get('trailingPE')),
+            'forward_pe': self._extract_value(key_stats.get('forwardPE')),
+
+            # NCAV (Graham's Net-Net strategy)
+            'ncav_per_share': ncav_data.get('ncav_per_share'),
+            'ncav_ratio': ncav_data.get('ncav_ratio'),  # Price / NCAV
+
+            # Profitability
+            'profit_margin': self._extract_value(financial_data.get('profitMargins')),
+            'operating_margin': self._extract_value(financial_data.get('operatingMargins')),
+            'return_on_equity': self._extract_value(financial_data.get('returnOnEquity')),
+
+            # Financial health
+            'debt_to_equity': self._extract_value(financial_data.get('debtToEquity')),
+            'current_ratio': self._extract_value(financial_data.get('currentRatio')),
+            'quick_ratio': self._extract_value(financial_data.get('quickRatio')),
+
+            # Cash flow
+            'free_cash_flow': self._extract_value(financial_data.get('freeCashflow')),
+            'operating_cash_flow': self._extract_value(financial_data.get('operatingCashflow')),
+
+            # Growth
+            'revenue_growth': self._extract_value(financial_data.get('revenueGrowth')),
+            'earnings_growth': self._extract_value(financial_data.get('earningsGrowth')),
+
+            # Dividend
+            'dividend_yield': self._extract_value(key_stats.get('dividendYield')),
+
+            # Graham value score (custom calculation)
+            'graham_score': self._calculate_graham_score(
+                self._extract_value(key_stats.get('priceToBook')),
+                self._extract_value(key_stats.get('trailingPE')),
+                ncav_data.get('ncav_ratio'),
+                self._extract_value(financial_data.get('debtToEquity'))
+            ),
+
+            # Intrinsic Value (Graham Formula)
+            'intrinsic_value': self._calculate_intrinsic_value(
+                self._extract_value(key_stats.get('trailingPE')), # Using EPS proxy via PE? No, need EPS relative
+                self._extract_value(financial_data.get('revenueGrowth')), # Growth proxy
+                4.4, # Bond Yield
+                self._extract_value(key_stats.get('trailingEps'))
+            )
+        }
+
+        self.cache[cache_key] = fundamentals
+        return fundamentals
+
     def get_history(self, symbol: str, interval: str = '1d', range: str = '1mo') -> List[float]:
         """
         Get historical closing prices for TA.
@@ -158,19 +189,94 @@ class YahooFinanceAdapter:
             
             if not resp.ok: return []
             
-            data = resp.json()
-            result = data.get('chart', {}).get('result', [])
-            if not result: return []
+            return self._closes(resp.json())
+        except Exception as e:
+            print(f"Failed to fetch history for {symbol}: {e}")
+            return []
+
+    async def get_history_async(self, symbol: str, interval: str = '1d', range: str = '1mo') -> List[float]:
+        """Awaitable get_history on an httpx.AsyncClient"""
+        try:
+            url = f"{self.base_url}/v8/finance/chart/{symbol}"
+            params = {'interval': interval, 'range': range}
+            resp = await self.http.get().get(url, params=params, timeout=10)
             
-            quote = result[0].get('indicators', {}).get('quote', [{}])[0]
-            closes = quote.get('close', [])
+            if not resp.is_success: return []
             
-            # Filter out Nones
-            return [float(c) for c in closes if c is not None]
+            return self._closes(resp.json())
         except Exception as e:
-            print(f"Failed to fetch history for {symbol}: {e}")
+            print(f"Failed to fetch history for {symbol}: {e!r}")
             return []
 
+    @staticmethod
+    def _closes(data: Dict) -> List[float]:
+        """Closing prices from a v8 chart response"""
+        result = data.get('chart', {}).get('result', [])
+        if not result: return []
+        
+        quote = result[0].get('indicators', {}).get('quote', [{}])[0]
+        closes = quote.get('close', [])
+        
+        # Filter out Nones
+        return [float(c) for c in closes if c is not None]
+
+    def get_ohlcv(self, symbol: str, start: Union[str, datetime], end: Union[str, datetime],
+                  interval: str = '1d') -> Optional[Dict]:
+        """
+        OHLCV bars in [start, end) as columns.
+
+        Args:
+            symbol: Ticker
+            start: First date/time (ISO string or datetime; naive means UTC)
+            end: Date/time to stop before
+            interval: Yahoo bar size ('1m', '1h', '1d', ...)
+
+        Returns:
+            {'timestamp' (epoch ns), 'open', 'high', 'low', 'close', 'volume'}
+            as NumPy arrays (lists without NumPy), or None if unavailable.
+            Bars without a close are dropped; a range with no bars (a weekend,
+            a holiday) gives empty columns rather than None.
+        """
+        def epoch_seconds(value):
+            if isinstance(value, str):
+                value = datetime.fromisoformat(value)
+            if value.tzinfo is None:
+                value = value.replace(tzinfo=timezone.utc)
+            return int(value.timestamp())
+
+        try:
+            url = f"{self.base_url}/v8/finance/chart/{symbol}"
+            params = {'interval': interval, 'period1': epoch_seconds(start), 'period2': epoch_seconds(end)}
+            resp = self.session.get(url, params=params, timeout=30)
+            
+            if not resp.ok: return None
+            
+            result = resp.json().get('chart', {}).get('result') or []
+            if not result: return None
+            
+            quote = (result[0].get('indicators', {}).get('quote') or [{}])[0]
+            rows = [
+                i for i, close in enumerate(quote.get('close') or []) if close is not None
+            ]
+            timestamps = result[0].get('timestamp') or []
+            columns = {'timestamp': [timestamps[i] * 1_000_000_000 for i in rows]}
+            for name in ('open', 'high', 'low', 'close', 'volume'):
+                values = quote.get(name) or [None] * len(timestamps)
+                fallback = quote['close'] if name != 'volume' else [0] * len(timestamps)
+                columns[name] = [
+                    float(values[i] if values[i] is not None else fallback[i]) for i in rows
+                ]
+            
+            if np is not None:
+                columns = {
+                    name: np.asarray(values, dtype=np.int64 if name == 'timestamp' else np.float64)
+                    for name, values in columns.items()
+                }
+            return columns
+        except Exception as e:
+            print(f"Failed to fetch OHLCV for {symbol}: {e}")
+            return None
+
     def _calculate_ncav(self, balance_sheet: Dict, key_stats: Dict) -> Dict:
         """
         Calculate Net Current Asset Value (Graham's Net-Net).
@@ -320,6 +426,7 @@ class FundamentalDataFeed:
         # Helper for DeFiLlama
         self.llama_url = "https://api.llama.fi"
         self.llama_cache = {}
+        self.http = LoopClients()
 
     def get_value_metrics(self, symbol: str) -> Dict:
         """
@@ -333,8 +440,17 @@ class FundamentalDataFeed:
             # Return Real-Time Graham metrics for Crypto using DeFiLlama
             return self._get_crypto_proxy_metrics(symbol)
 
-        fundamentals = self.yahoo.get_fundamentals(symbol)
+        return self._or_unavailable(symbol, self.yahoo.get_fundamentals(symbol))
 
+    async def get_value_metrics_async(self, symbol: str) -> Dict:
+        """Awaitable get_value_metrics"""
+        if self._is_crypto(symbol):
+            return await self._get_crypto_proxy_metrics_async(symbol)
+
+        return self._or_unavailable(symbol, await self.yahoo.get_fundamentals_async(symbol))
+
+    @staticmethod
+    def _or_unavailable(symbol: str, fundamentals: Optional[Dict]) -> Dict:
         if not fundamentals:
             print(f"No fundamental data available for {symbol}, using fallback")
             return {'source': 'unavailable', 'symbol': symbol}
@@ -351,14 +467,29 @@ class FundamentalDataFeed:
              url = f"{self.llama_url}/v2/historicalChainTvl/{chain}"
              resp = requests.get(url, timeout=5)
              if resp.ok:
-                 data = resp.json()
-                 if data and len(data) > 0:
-                     last = data[-1]
-                     return {'tvl': last['tvl'], 'timestamp': last['date']}
+                 return self._latest_tvl(resp.json())
         except Exception as e:
             print(f"DeFiLlama error for {chain}: {e}")
         return {'tvl': 0}
 
+    async def _fetch_defi_llama_stats_async(self, chain: str) -> Dict:
+        """Awaitable _fetch_defi_llama_stats"""
+        try:
+            url = f"{self.llama_url}/v2/historicalChainTvl/{chain}"
+            resp = await self.http.get().get(url, timeout=5)
+            if resp.is_success:
+                return self._latest_tvl(resp.json())
+        except Exception as e:
+            print(f"DeFiLlama error for {chain}: {e!r}")
+        return {'tvl': 0}
+
+    @staticmethod
+    def _latest_tvl(data: List[Dict]) -> Dict:
+        if data and len(data) > 0:
+            last = data[-1]
+            return {'tvl': last['tvl'], 'timestamp': last['date']}
+        return {'tvl': 0}
+
     def _get_crypto_proxy_metrics(self, symbol: str) -> Dict:
         """
         Generate fundamental ratios for Crypto using Real DeFiLlama Data.
@@ -368,6 +499,36 @@ class FundamentalDataFeed:
         - Earnings = Fees/Revenue (Approx 10% of TVL * yield heuristic if api unavailable, 
           or simpler: TVL is 'Equity', MarketCap is 'Price')
         """
+        chain, yahoo_symbol = self._crypto_sources(symbol)
+        
+        # 1. Fetch Real TVL (Book Value Proxy)
+        stats = self._fetch_defi_llama_stats(chain)
+        
+        # 2. Fetch Real Price/Market Cap
+        fund = self.yahoo.get_fundamentals(yahoo_symbol) # Yahoo has crypto market cap!
+        price_hist = None
+        if self._market_cap(fund) == 0:
+            # Fallback: Estimate from price if MC missing
+            price_hist = self.yahoo.get_history(yahoo_symbol, range='1d', interval='1d')
+        
+        return self._crypto_proxy_metrics(symbol, stats, fund, price_hist)
+
+    async def _get_crypto_proxy_metrics_async(self, symbol: str) -> Dict:
+        """Awaitable _get_crypto_proxy_metrics; TVL and market cap are fetched together"""
+        chain, yahoo_symbol = self._crypto_sources(symbol)
+        stats, fund = await asyncio.gather(
+            self._fetch_defi_llama_stats_async(chain),
+            self.yahoo.get_fundamentals_async(yahoo_symbol)
+        )
+        price_hist = None
+        if self._market_cap(fund) == 0:
+            price_hist = await self.yahoo.get_history_async(yahoo_symbol, range='1d', interval='1d')
+        
+        return self._crypto_proxy_metrics(symbol, stats, fund, price_hist)
+
+    @staticmethod
+    def _crypto_sources(symbol: str):
+        """(DeFiLlama chain slug, Yahoo USD pair) for a crypto symbol"""
         # Map symbol to DeFiLlama chain slug
         chain_map = {
             'ETH': 'Ethereum',
@@ -377,25 +538,22 @@ class FundamentalDataFeed:
         }
         
         clean_sym = symbol.replace('-USD', '')
-        chain = chain_map.get(clean_sym, 'Ethereum')
-        
-        # 1. Fetch Real TVL (Book Value Proxy)
-        stats = self._fetch_defi_llama_stats(chain)
+        return chain_map.get(clean_sym, 'Ethereum'), f"{clean_sym}-USD"
+
+    @staticmethod
+    def _market_cap(fund: Optional[Dict]):
+        return fund.get('market_cap', 0) if fund else 0
+
+    def _crypto_proxy_metrics(self, symbol: str, stats: Dict, fund: Optional[Dict],
+                              price_hist: Optional[List[float]]) -> Dict:
+        """Graham ratios from TVL and Yahoo's market cap (price_hist: fallback closes when it is missing)"""
         tvl = stats.get('tvl', 1) # Avoid div by zero
         
-        # 2. Fetch Real Price/Market Cap
-        yahoo_symbol = f"{clean_sym}-USD"
-        fund = self.yahoo.get_fundamentals(yahoo_symbol) # Yahoo has crypto market cap!
-        
-        market_cap = 0
-        price = 0
-        if fund:
-            market_cap = fund.get('market_cap', 0)
-            price = fund.get('price', 0)
+        market_cap = self._market_cap(fund)
+        price = fund.get('price', 0) if fund else 0
             
         if market_cap == 0:
              # Fallback: Estimate from price if MC missing
-             price_hist = self.yahoo.get_history(yahoo_symbol, range='1d', interval='1d')
              price = price_hist[-1] if price_hist else 0
              # Rough circ supply if needed, or just use Price/TVL-per-token logic?
              # Easier: P/B = Market Cap / TVL
@@ -0,0 +1,339 @@
+"""
+Memory-mapped columnar OHLCV history.
+
+Each symbol is a directory of raw little-endian column files, one value
+per bar:
+
+    <root>/<SYMBOL>/timestamp.i8   epoch nanoseconds, strictly increasing
+    <root>/<SYMBOL>/open.f8 ... volume.f8
+
+Reads map the files read-only, so a date-range slice is a view into the
+OS page cache rather than a copy, and every process reading the same
+symbol shares one cached copy. Appends only ever add newer bars at the end
+of the files; the rarer backfill of older bars rewrites them.
+
+    <root>/<SYMBOL>/coverage.json  [start, end) epoch ns already fetched
+
+records which range upstream was asked for, so weekends, holidays and
+dates before a listing are not re-requested on every run.
+"""
+
+import json
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, Optional, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:  # The store is NumPy-only; importing it without NumPy is harmless
+    np = None
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are only serialised within the process
+    fcntl = None
+
+from backtest_columns import to_epoch_ns
+
+COLUMNS = {
+    'timestamp': '<i8',
+    'open': '<f8',
+    'high': '<f8',
+    'low': '<f8',
+    'close': '<f8',
+    'volume': '<f8',
+}
+
+# Written before the timestamp column on append, so a reader never sees a bar whose prices are missing
+_VALUE_COLUMNS = [name for name in COLUMNS if name != 'timestamp']
+
+Timestamp = Union[str, datetime, int, float, None]
+
+
+def _bound_ns(value: Timestamp) -> Optional[int]:
+    """Range bound as epoch ns; strings are ISO dates ('2024-01-31')"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return to_epoch_ns(value)
+
+
+class HistoryStore:
+    """
+    Per-symbol OHLCV columns on disk.
+
+    Example:
+        store = HistoryStore('/data/history')
+        store.append('SPY', yahoo.get_ohlcv('SPY', '2004-01-01', '2024-01-01', interval='1m'))
+        bars = store.load('SPY', '2020-01-01', '2021-01-01')  # memmap views, no copy
+        engine.run_backtest('trend_follower', 'SPY', ..., price_data=bars, vectorized=True)
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._maps: Dict[str, Dict[str, 'np.memmap']] = {}
+        self._lock = threading.Lock()
+
+    def symbols(self):
+        """Symbols with stored history."""
+        return sorted(
+            name for name in os.listdir(self.root)
+            if os.path.exists(self._path(name, 'timestamp'))
+        )
+
+    def load(self, symbol: str, start: Timestamp = None, end: Timestamp = None) -> Dict[str, 'np.ndarray']:
+        """
+        Bars in [start, end) as read-only views over the mapped files.
+
+        Args:
+            symbol: Asset symbol
+            start: First bar time (inclusive); None for the beginning
+            end: Bar time to stop before (exclusive, like yfinance); None for the end
+
+        Returns:
+            {'timestamp': int64 epoch ns, 'open', 'high', 'low', 'close', 'volume'}
+            (empty arrays when nothing is stored)
+        """
+        maps = self._columns(symbol)
+        ts = maps['timestamp']
+        lo = 0 if start is None else int(np.searchsorted(ts, _bound_ns(start), side='left'))
+        hi = len(ts) if end is None else int(np.searchsorted(ts, _bound_ns(end), side='left'))
+        return {name: column[lo:hi] for name, column in maps.items()}
+
+    def iter_chunks(
+        self,
+        symbol: str,
+        start: Timestamp = None,
+        end: Timestamp = None,
+        chunk_bars: int = 100_000
+    ) -> Iterator[Dict[str, 'np.ndarray']]:
+        """
+        load() in consecutive slices of at most chunk_bars bars.
+
+        Each chunk is a view, so only the pages being replayed are resident;
+        pass the iterator to run_backtest to stream a range larger than RAM.
+        """
+        if chunk_bars <= 0:
+            raise ValueError("chunk_bars must be positive")
+        columns = self.load(symbol, start, end)
+        for lo in range(0, len(columns['timestamp']), chunk_bars):
+            yield {name: column[lo:lo + chunk_bars] for name, column in columns.items()}
+
+    def last_timestamp(self, symbol: str) -> Optional[int]:
+        """Epoch ns of the newest stored bar, or None."""
+        ts = self._columns(symbol)['timestamp']
+        return int(ts[-1]) if len(ts) else None
+
+    def first_timestamp(self, symbol: str) -> Optional[int]:
+        """Epoch ns of the oldest stored bar, or None."""
+        ts = self._columns(symbol)['timestamp']
+        return int(ts[0]) if len(ts) else None
+
+    def coverage(self, symbol: str) -> Optional[Tuple[int, int]]:
+        """
+        [start, end) in epoch ns that upstream was already asked for, or None.
+
+        Stores written before coverage was recorded report the span of
+        their bars.
+        """
+        try:
+            with open(self._coverage_path(symbol)) as f:
+                covered = json.load(f)
+            return covered['start'], covered['end']
+        except FileNotFoundError:
+            first, last = self.first_timestamp(symbol), self.last_timestamp(symbol)
+            return None if first is None else (first, last + 1)
+
+    def mark_covered(self, symbol: str, start: int, end: int):
+        """Record that [start, end) epoch ns was fetched; must touch or overlap the range already covered"""
+        covered = self.coverage(symbol)
+        if covered is not None:
+            start, end = min(start, covered[0]), max(end, covered[1])
+        os.makedirs(os.path.join(self.root, symbol), exist_ok=True)
+        tmp_path = f"{self._coverage_path(symbol)}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'start': start, 'end': end}, f)
+        os.replace(tmp_path, self._coverage_path(symbol))
+
+    def count(self, symbol: str) -> int:
+        return len(self._columns(symbol)['timestamp'])
+
+    def append(self, symbol: str, bars: Dict[str, 'np.ndarray']) -> int:
+        """
+        Add bars newer than the last stored one.
+
+        Args:
+            symbol: Asset symbol
+            bars: Columns as returned by load or YahooFinanceAdapter.get_ohlcv;
+                  'price' is accepted for 'close' and missing open/high/low
+                  default to the close, missing volume to 0
+
+        Returns:
+            Number of bars written (older or duplicate bars are skipped)
+        """
+        columns = self._sorted_columns(bars)
+        ts = columns['timestamp']
+
+        os.makedirs(os.path.join(self.root, symbol), exist_ok=True)
+        with self._exclusive(symbol):
+            self._discard_partial_append(symbol)
+            last = self._read_last_timestamp(symbol)
+            keep = np.ones(len(ts), dtype=bool)
+            if last is not None:
+                keep &= ts > last
+            keep[1:] &= ts[1:] != ts[:-1]
+            if not keep.any():
+                return 0
+
+            for name in _VALUE_COLUMNS + ['timestamp']:
+                with open(self._path(symbol, name), 'ab') as f:
+                    f.write(np.asarray(columns[name], dtype=COLUMNS[name])[keep].tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+
+        with self._lock:
+            self._maps.pop(symbol, None)
+        return int(keep.sum())
+
+    def prepend(self, symbol: str, bars: Dict[str, 'np.ndarray']) -> int:
+        """
+        Add bars older than the first stored one, e.g. to backfill a range.
+
+        Every column file is rewritten into a temporary sibling and swapped
+        in (timestamps last) while readers are kept from mapping, so views
+        handed out earlier stay valid and new ones see either state whole.
+
+        Returns:
+            Number of bars written (newer or duplicate bars are skipped)
+        """
+        columns = self._sorted_columns(bars)
+        ts = columns['timestamp']
+
+        os.makedirs(os.path.join(self.root, symbol), exist_ok=True)
+        with self._exclusive(symbol):
+            self._discard_partial_append(symbol)
+            stored = self._stored_bars(symbol)
+            first = self._read_first_timestamp(symbol)
+            keep = np.ones(len(ts), dtype=bool)
+            if first is not None:
+                keep &= ts < first
+            keep[1:] &= ts[1:] != ts[:-1]
+            if not keep.any():
+                return 0
+
+            for name in _VALUE_COLUMNS + ['timestamp']:
+                path = self._path(symbol, name)
+                with open(f"{path}.tmp", 'wb') as out:
+                    out.write(np.asarray(columns[name], dtype=COLUMNS[name])[keep].tobytes())
+                    if stored:
+                        with open(path, 'rb') as old:
+                            shutil.copyfileobj(old, out)
+                    out.flush()
+                    os.fsync(out.fileno())
+            for name in _VALUE_COLUMNS + ['timestamp']:
+                path = self._path(symbol, name)
+                os.replace(f"{path}.tmp", path)
+
+            self._maps.pop(symbol, None)
+        return int(keep.sum())
+
+    def _sorted_columns(self, bars: Dict[str, 'np.ndarray']) -> Dict[str, 'np.ndarray']:
+        """Every stored column for bars, in timestamp order, with append's defaults"""
+        ts = np.asarray(bars['timestamp'], dtype=np.int64)
+        close = np.asarray(bars['close'] if 'close' in bars else bars['price'], dtype=np.float64)
+        columns = {
+            'timestamp': ts,
+            'open': bars.get('open', close),
+            'high': bars.get('high', close),
+            'low': bars.get('low', close),
+            'close': close,
+            'volume': bars.get('volume', np.zeros(len(ts))),
+        }
+
+        order = np.argsort(ts, kind='stable')
+        if (order != np.arange(len(ts))).any():
+            columns = {name: np.asarray(col)[order] for name, col in columns.items()}
+        return columns
+
+    def _columns(self, symbol: str) -> Dict[str, 'np.ndarray']:
+        """Read-only maps of a symbol's files, trimmed to the bars all columns hold"""
+        maps = self._maps.get(symbol)
+        if maps is not None and len(maps['timestamp']) == self._stored_bars(symbol):
+            return maps
+
+        with self._lock, self._shared(symbol):
+            n = self._stored_bars(symbol)
+            maps = {}
+            for name, dtype in COLUMNS.items():
+                if n == 0:
+                    maps[name] = np.empty(0, dtype=dtype)
+                else:
+                    maps[name] = np.memmap(self._path(symbol, name), dtype=dtype, mode='r', shape=(n,))
+            self._maps[symbol] = maps
+        return maps
+
+    def _stored_bars(self, symbol: str) -> int:
+        # The timestamp column is written last, so it bounds what every column holds
+        try:
+            return os.path.getsize(self._path(symbol, 'timestamp')) // 8
+        except FileNotFoundError:
+            return 0
+
+    def _read_last_timestamp(self, symbol: str) -> Optional[int]:
+        n = self._stored_bars(symbol)
+        if n == 0:
+            return None
+        with open(self._path(symbol, 'timestamp'), 'rb') as f:
+            f.seek((n - 1) * 8)
+            return int(np.frombuffer(f.read(8), dtype=COLUMNS['timestamp'])[0])
+
+    def _read_first_timestamp(self, symbol: str) -> Optional[int]:
+        if self._stored_bars(symbol) == 0:
+            return None
+        with open(self._path(symbol, 'timestamp'), 'rb') as f:
+            return int(np.frombuffer(f.read(8), dtype=COLUMNS['timestamp'])[0])
+
+    def _discard_partial_append(self, symbol: str):
+        """Trim columns left longer than the complete timestamps by an interrupted append"""
+        size = self._stored_bars(symbol) * 8
+        for name in COLUMNS:
+            path = self._path(symbol, name)
+            if os.path.exists(path) and os.path.getsize(path) > size:
+                os.truncate(path, size)
+
+    @contextmanager
+    def _exclusive(self, symbol: str):
+        """Serialise appends to one symbol across threads and processes"""
+        with self._lock, open(os.path.join(self.root, symbol, '.lock'), 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @contextmanager
+    def _shared(self, symbol: str):
+        """Keep a prepend from swapping files while this process maps them"""
+        lock_path = os.path.join(self.root, symbol, '.lock')
+        if fcntl is None or not os.path.exists(lock_path):
+            yield
+            return
+        with open(lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _coverage_path(self, symbol: str) -> str:
+        return os.path.join(self.root, symbol, 'coverage.json')
+
+    def _path(self, symbol: str, column: str) -> str:
+        return os.path.join(self.root, symbol, f"{column}.{COLUMNS[column][1:]}")
@@ -19,7 +19,8 @@ The orchestrator:
 """
 
 import asyncio
-from typing import Dict, List, Optional
+import json
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor
 # import numpy as np # Removed for deployment compatibility
@@ -27,6 +28,13 @@ from concurrent.futures import ThreadPoolExecutor
 from market_data.prediction_market_adapter import PredictionMarketFeed
 from market_data.onchain_adapter import OnChainDataFeed
 from market_data.fundamental_adapter import FundamentalDataFeed
+from market_data.single_flight import SingleFlight
+
+# Seconds a source may run before its slot in the unified view is left empty
+SOURCE_TIMEOUT = 10
+
+# (single-flight key or None, blocking fetch, async fetch, args)
+SourceCall = Tuple[Optional[Hashable], Callable, Callable[..., Awaitable], tuple]
 
 
 class MultiSourceDataFeed:
@@ -48,7 +56,11 @@ class MultiSourceDataFeed:
         self.fundamentals = FundamentalDataFeed(use_mock=use_mock)
 
         self.use_mock = use_mock
-        self.executor = ThreadPoolExecutor(max_workers=5)
+        self.max_workers = 5
+        # Blocking fetches for the sync API; the async API awaits the adapters' httpx calls
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        # Concurrent identical fetches (same source and arguments) share one upstream request
+        self.flights = SingleFlight(self.executor)
 
     def get_unified_data(self,
                          symbol: str,
@@ -66,57 +78,147 @@ class MultiSourceDataFeed:
             Unified dict with all sources + conflict analysis
         """
         # Fetch from all sources in parallel (non-blocking)
-        futures = []
+        futures = [self._submit(call) for call in self._source_calls(symbol, market_data, event_config)]
+        return self._unify(symbol, market_data, *self._wait(futures))
 
-        # 1. Prediction markets (events)
-        if event_config:
-            futures.append(
-                self.executor.submit(
-                    self.prediction_markets.get_events,
-                    event_config
-                )
-            )
-        else:
-            futures.append(self.executor.submit(lambda: {}))
-
-        # 2. On-chain data (for crypto assets)
-        if self._is_crypto(symbol):
-            futures.append(
-                self.executor.submit(
-                    self.onchain.get_crypto_market_health,
-                    symbol
-                )
-            )
-        else:
-            futures.append(self.executor.submit(lambda: {}))
+    async def get_unified_data_async(self,
+                                     symbol: str,
+                                     market_data: Dict,
+                                     event_config: Optional[Dict] = None) -> Dict:
+        """
+        Awaitable get_unified_data for async servers (worker.py).
 
-        # 3. Fundamentals (for stocks/crypto with fundamentals)
-        futures.append(
-            self.executor.submit(
-                self.fundamentals.get_value_metrics,
-                symbol
-            )
-        )
+        The sources are awaited together on the running event loop through
+        the adapters' *_async methods (httpx.AsyncClient), so no thread is
+        held while a request waits on the network and concurrent
+        evaluations are not capped by the executor (see _gather).
+        """
+        results = await self._gather(self._source_calls(symbol, market_data, event_config))
+        return self._unify(symbol, market_data, *results)
 
-        # 4. Technical indicators (calculated from market_data)
-        futures.append(
-            self.executor.submit(
-                self._calculate_technical_indicators,
-                market_data
-            )
+    def get_unified_data_many(self,
+                              symbols: List[str],
+                              market_data: Optional[Dict[str, Dict]] = None,
+                              event_config: Optional[Dict] = None) -> Dict[str, Dict]:
+        """
+        get_unified_data for many symbols with one prediction-market fetch.
+
+        Events depend only on event_config, so every symbol shares one
+        fetch; on-chain, fundamentals and technicals are fetched per symbol,
+        concurrently on the executor.
+
+        Args:
+            symbols: Trading symbols
+            market_data: {symbol: current price/volume data} (missing -> {})
+            event_config: Polymarket event configuration
+
+        Returns:
+            {symbol: unified dict}
+        """
+        market_data = market_data or {}
+        symbols = list(dict.fromkeys(symbols))
+        events = self._submit(self._events_call(event_config))
+        per_symbol = {
+            symbol: [self._submit(call) for call in self._asset_calls(symbol, market_data.get(symbol, {}))]
+            for symbol in symbols
+        }
+
+        events, = self._wait([events])
+        return {
+            symbol: self._unify(symbol, market_data.get(symbol, {}), events, *self._wait(futures))
+            for symbol, futures in per_symbol.items()
+        }
+
+    async def get_unified_data_many_async(self,
+                                          symbols: List[str],
+                                          market_data: Optional[Dict[str, Dict]] = None,
+                                          event_config: Optional[Dict] = None) -> Dict[str, Dict]:
+        """Awaitable get_unified_data_many"""
+        market_data = market_data or {}
+        symbols = list(dict.fromkeys(symbols))
+        (events,), *per_symbol = await asyncio.gather(
+            self._gather([self._events_call(event_config)]),
+            *(self._gather(self._asset_calls(symbol, market_data.get(symbol, {}))) for symbol in symbols)
         )
+        return {
+            symbol: self._unify(symbol, market_data.get(symbol, {}), events, *results)
+            for symbol, results in zip(symbols, per_symbol)
+        }
 
-        # Wait for all sources to complete (with timeout)
-        try:
-            results = [f.result(timeout=10) for f in futures]
-            events, onchain_data, fundamental_data, technical_data = results
-        except Exception as e:
-            print(f"Error fetching multi-source data: {e}")
-            # Return partial data rather than failing completely
-            events, onchain_data, fundamental_data, technical_data = {}, {}, {}, {}
-
-        # Unify into single dict
-        unified = {
+    @staticmethod
+    def _wait(futures: List) -> List[Dict]:
+        """Results of executor futures; a source that fails or times out is left empty"""
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result(timeout=SOURCE_TIMEOUT))
+            except Exception as e:
+                print(f"Error fetching multi-source data: {e}")
+                # Return partial data rather than failing completely
+                results.append({})
+        return results
+
+    async def _gather(self, calls: List[SourceCall]) -> List[Dict]:
+        """_wait for the event loop: the async fetches run as tasks and are awaited together"""
+        async def fetch(call: SourceCall) -> Dict:
+            key, _, fetch_async, args = call
+            # An identical fetch in flight (from a task or the sync API's threads) is joined
+            future = self.flights.submit_async(key, fetch_async, *args) if key is not None \
+                else asyncio.ensure_future(fetch_async(*args))
+            try:
+                # Shielded: a timeout here must not cancel a fetch other callers share
+                return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout=SOURCE_TIMEOUT)
+            except Exception as e:
+                print(f"Error fetching multi-source data: {e!r}")
+                return {}
+
+        return list(await asyncio.gather(*(fetch(call) for call in calls)))
+
+    def _submit(self, call: SourceCall):
+        """Start a blocking source fetch on the executor, joining an identical one in flight"""
+        key, fetch, _, args = call
+        if key is None:
+            return self.executor.submit(fetch, *args)
+        return self.flights.submit(key, fetch, *args)
+
+    def _source_calls(self,
+                      symbol: str,
+                      market_data: Dict,
+                      event_config: Optional[Dict]) -> List[SourceCall]:
+        """(key, fetch, args) per source, in _unify's order; sources that do not apply return {}"""
+        return [self._events_call(event_config), *self._asset_calls(symbol, market_data)]
+
+    def _events_call(self, event_config: Optional[Dict]) -> SourceCall:
+        """The one source that does not depend on the symbol"""
+        # 1. Prediction markets (events)
+        if not event_config:
+            return _NO_SOURCE
+        return (('events', _params_key(event_config)),
+                self.prediction_markets.get_events, self.prediction_markets.get_events_async, (event_config,))
+
+    def _asset_calls(self, symbol: str, market_data: Dict) -> List[SourceCall]:
+        return [
+            # 2. On-chain data (for crypto assets)
+            (('onchain', symbol),
+             self.onchain.get_crypto_market_health, self.onchain.get_crypto_market_health_async, (symbol,))
+            if self._is_crypto(symbol) else _NO_SOURCE,
+            # 3. Fundamentals (for stocks/crypto with fundamentals)
+            (('fundamentals', symbol),
+             self.fundamentals.get_value_metrics, self.fundamentals.get_value_metrics_async, (symbol,)),
+            # 4. Technical indicators (calculated from market_data)
+            (('technical', _params_key(market_data)),
+             self._calculate_technical_indicators, self._calculate_technical_indicators_async, (market_data,)),
+        ]
+
+    def _unify(self,
+               symbol: str,
+               market_data: Dict,
+               events: Dict,
+               onchain_data: Dict,
+               fundamental_data: Dict,
+               technical_data: Dict) -> Dict:
+        """Unify source results into a single dict"""
+        return {
             'timestamp': datetime.now().isoformat(),
             'symbol': symbol,
 
@@ -146,10 +248,8 @@ class MultiSourceDataFeed:
             )
         }
 
-        return unified
-
-    def _detect_conflicts(self,
-                          events: Dict,
+    @staticmethod
+    def _detect_conflicts(events: Dict,
                           onchain: Dict,
                           fundamentals: Dict,
                           technicals: Dict,
@@ -217,8 +317,8 @@ class MultiSourceDataFeed:
 
         return conflicts
 
-    def _calculate_consensus(self,
-                             events: Dict,
+    @staticmethod
+    def _calculate_consensus(events: Dict,
                              onchain: Dict,
                              fundamentals: Dict,
                              technicals: Dict) -> Dict:
@@ -278,10 +378,12 @@ class MultiSourceDataFeed:
 
         if buy_votes >= 2:
             action = 'BUY'
-            confidence = np.mean([c for s, c in zip(signals, confidences) if s == 'BUY'])
+            agreeing = [c for s, c in zip(signals, confidences) if s == 'BUY']
+            confidence = sum(agreeing) / len(agreeing)
         elif sell_votes >= 2:
             action = 'SELL'
-            confidence = np.mean([c for s, c in zip(signals, confidences) if s == 'SELL'])
+            agreeing = [c for s, c in zip(signals, confidences) if s == 'SELL']
+            confidence = sum(agreeing) / len(agreeing)
         else:
             action = 'HOLD'
             confidence = 0.5
@@ -308,6 +410,16 @@ class MultiSourceDataFeed:
         except Exception:
             pass
             
+        return self._technical_indicators(closes)
+
+    async def _calculate_technical_indicators_async(self, market_data: Dict) -> Dict:
+        """Awaitable _calculate_technical_indicators"""
+        symbol = market_data.get('symbol', 'SPY')
+        closes = await self.fundamentals.yahoo.get_history_async(symbol, interval='1d', range='1mo')
+        return self._technical_indicators(closes)
+
+    def _technical_indicators(self, closes: List[float]) -> Dict:
+        """RSI-14 signal from closing prices"""
         if not closes or len(closes) < 15:
             return {
                 'source': 'technical',
@@ -450,3 +562,16 @@ class MultiSourceDataFeed:
         if unified_data.get('technical'):
             count += 1
         return count
+
+
+async def _no_fetch() -> Dict:
+    return {}
+
+
+# Placeholder for a source that does not apply to the symbol
+_NO_SOURCE: SourceCall = (None, dict, _no_fetch, ())
+
+
+def _params_key(params: Dict) -> str:
+    """Canonical form of a fetch's parameters for single-flight keys"""
+    return json.dumps(params, sort_keys=True, default=str)
@@ -18,6 +18,8 @@ from typing import Dict, Optional, List
 from datetime import datetime, timedelta
 import time
 
+from market_data.async_http import LoopClients
+
 
 class DeFiLlamaAdapter:
     """
@@ -31,6 +33,7 @@ class DeFiLlamaAdapter:
         self.base_url = "https://api.llama.fi"
         self.coins_url = "https://coins.llama.fi"
         self.session = requests.Session()
+        self.http = LoopClients()
         self.cache = {}
         self.cache_ttl = 300  # 5 minutes
 
@@ -89,27 +92,49 @@ class DeFiLlamaAdapter:
             if not resp.ok:
                 return None
 
-            data = resp.json()
-            if not data:
-                return None
+            return self._chain_tvl(cache_key, chain, resp.json())
 
-            current = data[-1] if data else {}
+        except Exception as e:
+            print(f"Failed to fetch chain TVL for {chain}: {e}")
+            return None
 
-            result = {
-                'source': 'defillama',
-                'chain': chain,
-                'current_tvl': float(current.get('tvl', 0)),
-                'change_1d': self._calculate_tvl_change(data, days=1),
-                'updated_at': datetime.now().isoformat()
-            }
+    async def get_chain_tvl_async(self, chain: str = 'Ethereum') -> Optional[Dict]:
+        """Awaitable get_chain_tvl on an httpx.AsyncClient"""
+        cache_key = f"chain_tvl_{chain}"
+        if self._check_cache(cache_key):
+            return self.cache[cache_key]
 
-            self.cache[cache_key] = result
-            return result
+        try:
+            url = f"{self.base_url}/v2/historicalChainTvl/{chain}"
+            resp = await self.http.get().get(url, timeout=10)
+
+            if not resp.is_success:
+                return None
+
+            return self._chain_tvl(cache_key, chain, resp.json())
 
         except Exception as e:
-            print(f"Failed to fetch chain TVL for {chain}: {e}")
+            print(f"Failed to fetch chain TVL for {chain}: {e!r}")
+            return None
+
+    def _chain_tvl(self, cache_key: str, chain: str, data: List[Dict]) -> Optional[Dict]:
+        """Cached chain TVL summary from a historicalChainTvl response"""
+        if not data:
             return None
 
+        current = data[-1] if data else {}
+
+        result = {
+            'source': 'defillama',
+            'chain': chain,
+            'current_tvl': float(current.get('tvl', 0)),
+            'change_1d': self._calculate_tvl_change(data, days=1),
+            'updated_at': datetime.now().isoformat()
+        }
+
+        self.cache[cache_key] = result
+        return result
+
     def _calculate_change(self, tvl_history: List[Dict], days: int) -> float:
         """Calculate TVL percentage change."""
         if not tvl_history or len(tvl_history) < 2:
@@ -176,14 +201,27 @@ class OnChainDataFeed:
         - Chain health metrics
         """
         if self.use_mock:
-            return {
-                'source': 'mock_onchain',
-                'tvl_change_1d': -2.3,
-                'sentiment': 'NEUTRAL'
-            }
+            return self._mock_health()
 
-        chain_tvl = self.defillama.get_chain_tvl('Ethereum')
+        return self._health(symbol, self.defillama.get_chain_tvl('Ethereum'))
+
+    async def get_crypto_market_health_async(self, symbol: str = 'BTC') -> Dict:
+        """Awaitable get_crypto_market_health"""
+        if self.use_mock:
+            return self._mock_health()
+
+        return self._health(symbol, await self.defillama.get_chain_tvl_async('Ethereum'))
+
+    @staticmethod
+    def _mock_health() -> Dict:
+        return {
+            'source': 'mock_onchain',
+            'tvl_change_1d': -2.3,
+            'sentiment': 'NEUTRAL'
+        }
 
+    def _health(self, symbol: str, chain_tvl: Optional[Dict]) -> Dict:
+        """Health indicators from the chain's TVL"""
         return {
             'source': 'onchain',
             'symbol': symbol,
@@ -5,6 +5,7 @@ Polymarket is crypto-native with broad event coverage: macro, politics,
 crypto, culture. Public API requires no authentication for market data.
 """
 
+import asyncio
 try:
     import requests
 except ImportError:
@@ -12,6 +13,8 @@ except ImportError:
 from typing import Dict, Optional, List
 from datetime import datetime
 
+from market_data.async_http import LoopClients
+
 
 class PolymarketAdapter:
     """
@@ -24,6 +27,7 @@ class PolymarketAdapter:
     def __init__(self):
         self.gamma_url = "https://gamma-api.polymarket.com"
         self.clob_url = "https://clob.polymarket.com"
+        self.http = LoopClients()
     
     def get_market_odds(self, condition_id):
         """
@@ -43,36 +47,55 @@ class PolymarketAdapter:
                 print(f"Polymarket error {resp.status_code} for {condition_id}")
                 return None
             
-            market = resp.json()
-            
-            # Extract token prices (these ARE the probabilities)
-            tokens = market.get('tokens', [])
+            return self._market_odds(condition_id, resp.json())
             
-            # Binary markets have YES and NO tokens
-            yes_token = next((t for t in tokens if 'yes' in t.get('outcome', '').lower()), None)
-            no_token = next((t for t in tokens if 'no' in t.get('outcome', '').lower()), None)
+        except Exception as e:
+            print(f"Failed to fetch Polymarket {condition_id}: {e}")
+            return None
+    
+    async def get_market_odds_async(self, condition_id):
+        """Awaitable get_market_odds on an httpx.AsyncClient"""
+        try:
+            url = f"{self.gamma_url}/markets/{condition_id}"
+            resp = await self.http.get().get(url, timeout=10)
             
-            yes_prob = float(yes_token.get('price', 0.5)) if yes_token else 0.5
-            no_prob = float(no_token.get('price', 0.5)) if no_token else 0.5
+            if not resp.is_success:
+                print(f"Polymarket error {resp.status_code} for {condition_id}")
+                return None
             
-            return {
-                'source': 'polymarket',
-                'market_id': condition_id,
-                'title': market.get('question', ''),
-                'description': market.get('description', ''),
-                'yes_probability': yes_prob,
-                'no_probability': no_prob,
-                'volume': float(market.get('volume', 0)),
-                'liquidity': float(market.get('liquidity', 0)),
-                'close_time': market.get('endDate'),
-                'updated_at': datetime.now().isoformat(),
-                'active': market.get('active', False)
-            }
+            return self._market_odds(condition_id, resp.json())
             
         except Exception as e:
-            print(f"Failed to fetch Polymarket {condition_id}: {e}")
+            print(f"Failed to fetch Polymarket {condition_id}: {e!r}")
             return None
     
+    @staticmethod
+    def _market_odds(condition_id, market):
+        """Odds dict from a gamma /markets response"""
+        # Extract token prices (these ARE the probabilities)
+        tokens = market.get('tokens', [])
+        
+        # Binary markets have YES and NO tokens
+        yes_token = next((t for t in tokens if 'yes' in t.get('outcome', '').lower()), None)
+        no_token = next((t for t in tokens if 'no' in t.get('outcome', '').lower()), None)
+        
+        yes_prob = float(yes_token.get('price', 0.5)) if yes_token else 0.5
+        no_prob = float(no_token.get('price', 0.5)) if no_token else 0.5
+        
+        return {
+            'source': 'polymarket',
+            'market_id': condition_id,
+            'title': market.get('question', ''),
+            'description': market.get('description', ''),
+            'yes_probability': yes_prob,
+            'no_probability': no_prob,
+            'volume': float(market.get('volume', 0)),
+            'liquidity': float(market.get('liquidity', 0)),
+            'close_time': market.get('endDate'),
+            'updated_at': datetime.now().isoformat(),
+            'active': market.get('active', False)
+        }
+    
     def search_markets(self, query=None, limit=20):
         """
         Search for active markets.
@@ -148,27 +171,41 @@ class PredictionMarketFeed:
         results = {}
         
         for event_name, market_slug in event_config.items():
-            # Check cache (5 min TTL)
-            cache_key = f"{event_name}_{market_slug}"
-            if cache_key in self.cache:
-                cached = self.cache[cache_key]
-                age = (datetime.now() - datetime.fromisoformat(cached['updated_at'])).seconds
-                if age < 300:
-                    results[event_name] = cached
-                    continue
-            
             # Fetch from Polymarket - REAL DATA ONLY
-            odds = self.polymarket.get_market_odds(market_slug)
-            
-            if odds:
-                results[event_name] = odds
-                self.cache[cache_key] = odds
-            else:
-                 print(f"Warning: Failed to fetch real data for {event_name}. No mock fallback used.")
-                 # Do not add to results
+            odds = self._cached(event_name, market_slug) or self.polymarket.get_market_odds(market_slug)
+            self._keep(results, event_name, market_slug, odds)
         
         return results
     
+    async def get_events_async(self, event_config):
+        """Awaitable get_events; markets missing from the cache are fetched together"""
+        async def odds(event_name, market_slug):
+            return self._cached(event_name, market_slug) or await self.polymarket.get_market_odds_async(market_slug)
+        
+        fetched = await asyncio.gather(*(odds(name, slug) for name, slug in event_config.items()))
+        results = {}
+        for (event_name, market_slug), market_odds in zip(event_config.items(), fetched):
+            self._keep(results, event_name, market_slug, market_odds)
+        return results
+    
+    def _cached(self, event_name, market_slug):
+        """Cached odds for an event (5 min TTL), or None"""
+        cached = self.cache.get(f"{event_name}_{market_slug}")
+        if cached:
+            age = (datetime.now() - datetime.fromisoformat(cached['updated_at'])).seconds
+            if age < 300:
+                return cached
+        return None
+    
+    def _keep(self, results, event_name, market_slug, odds):
+        """Add fetched odds to results and the cache"""
+        if odds:
+            results[event_name] = odds
+            self.cache[f"{event_name}_{market_slug}"] = odds
+        else:
+            print(f"Warning: Failed to fetch real data for {event_name}. No mock fallback used.")
+            # Do not add to results
+    
     def add_events_to_market_data(self, market_data, event_config):
         """
         Add event probabilities to standard market data.
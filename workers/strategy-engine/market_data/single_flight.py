@@ -0,0 +1,93 @@
+"""
+Single-flight coalescing of identical upstream fetches.
+
+When the dashboard, the research page and a scheduled job ask for the same
+symbol at once, each used to fan out its own Yahoo/DeFiLlama/Polymarket
+requests. SingleFlight keys every fetch (e.g. ('fundamentals', 'BTC')):
+while one is in flight, identical calls attach to its future instead of
+starting another, and all of them get its result or its exception. Nothing
+is cached once the fetch completes; the next call goes upstream again.
+Blocking fetches run on the executor (submit); coroutine fetches run as
+tasks on the caller's event loop (submit_async). Both share one table, so
+a thread and a coroutine asking for the same key still share one fetch.
+"""
+import asyncio
+import threading
+from concurrent.futures import Executor, Future
+from typing import Awaitable, Callable, Dict, Hashable, Set
+
+
+class SingleFlight:
+    """
+    Executor front that runs at most one fetch per key at a time.
+
+    Works for threads and event loops alike: submit and submit_async return
+    a concurrent.futures.Future (asyncio.wrap_future makes it awaitable).
+    Coalesced callers share one result object, so treat results as read-only.
+
+    Example:
+        flights = SingleFlight(ThreadPoolExecutor(max_workers=5))
+        future = flights.submit(('fundamentals', 'BTC'), feed.get_value_metrics, 'BTC')
+    """
+
+    def __init__(self, executor: Executor):
+        self.executor = executor
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        # Running submit_async tasks (the loop only keeps weak references)
+        self._tasks: Set[asyncio.Task] = set()
+        self.calls = 0
+        self.coalesced = 0
+
+    def submit(self, key: Hashable, fn: Callable, *args) -> Future:
+        """Future of fn(*args), shared with any identical call still running"""
+        with self._lock:
+            self.calls += 1
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future
+            future = self.executor.submit(fn, *args)
+            self._in_flight[key] = future
+        future.add_done_callback(lambda done: self._forget(key, done))
+        return future
+
+    def submit_async(self, key: Hashable, fn: Callable[..., Awaitable], *args) -> Future:
+        """
+        submit for a coroutine function: fn(*args) runs as a task on the
+        running event loop, with no executor thread. Must be called from
+        that loop.
+        """
+        with self._lock:
+            self.calls += 1
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future
+            future = Future()
+            self._in_flight[key] = future
+        future.add_done_callback(lambda done: self._forget(key, done))
+        task = asyncio.ensure_future(fn(*args))
+        self._tasks.add(task)
+        task.add_done_callback(lambda done: self._settle(done, future))
+        return future
+
+    def _settle(self, task: asyncio.Task, future: Future):
+        """Copy a finished task's outcome to the future its callers hold"""
+        self._tasks.discard(task)
+        if task.cancelled():
+            # Not CancelledError: threads waiting on the future only expect fetch errors
+            future.set_exception(RuntimeError('fetch cancelled with its event loop'))
+        elif task.exception() is not None:
+            future.set_exception(task.exception())
+        else:
+            future.set_result(task.result())
+
+    def _forget(self, key: Hashable, future: Future):
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'calls': self.calls, 'coalesced': self.coalesced, 'in_flight': len(self._in_flight)}
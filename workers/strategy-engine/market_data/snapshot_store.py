@@ -0,0 +1,242 @@
+"""
+Record-and-replay of unified multi-source snapshots.
+
+Backtests call MultiSourceDataFeed.get_unified_data once per bar, which
+hits Polymarket, DeFiLlama and Yahoo Finance live. The recorder saves
+each unified snapshot keyed by (symbol, bar timestamp) while a run goes
+through the real feed; the replay feed then serves those snapshots from
+memory so later runs are offline, fast and reproducible.
+
+Storage is a single SQLite file with one zlib-compressed JSON blob per
+snapshot.
+"""
+
+import bisect
+import json
+import sqlite3
+import threading
+import zlib
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+def to_epoch_seconds(timestamp) -> float:
+    """
+    Normalise a bar timestamp to epoch seconds.
+
+    Naive datetimes are treated as UTC so keys do not depend on the
+    machine's local timezone.
+    """
+    if isinstance(timestamp, datetime):
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        return timestamp.timestamp()
+    return float(timestamp)
+
+
+def snapshot_key(timestamp) -> int:
+    """Storage key for a bar timestamp: epoch microseconds"""
+    return int(round(to_epoch_seconds(timestamp) * 1_000_000))
+
+
+class SnapshotStore:
+    """
+    On-disk store of unified snapshots keyed by symbol and timestamp.
+    """
+
+    def __init__(self, path: str, compression_level: int = 6):
+        """
+        Open (or create) a snapshot store.
+
+        Args:
+            path: SQLite file path (':memory:' for a throwaway store)
+            compression_level: zlib level for snapshot payloads
+        """
+        self.path = path
+        self.compression_level = compression_level
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS snapshots (
+                symbol TEXT NOT NULL,
+                ts INTEGER NOT NULL,
+                payload BLOB NOT NULL,
+                PRIMARY KEY (symbol, ts)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.commit()
+
+    def put(self, symbol: str, timestamp, unified: Dict):
+        """Save one snapshot, replacing any previous one for the same bar."""
+        self.put_many(symbol, [(timestamp, unified)])
+
+    def put_many(self, symbol: str, snapshots: Iterable[Tuple[object, Dict]]):
+        """Save several (timestamp, unified) snapshots in one transaction."""
+        rows = [
+            (symbol, snapshot_key(ts), self._encode(unified))
+            for ts, unified in snapshots
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO snapshots (symbol, ts, payload) VALUES (?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+
+    def load(self, symbol: str) -> Tuple[List[int], List[Dict]]:
+        """
+        Load every snapshot for a symbol, sorted by timestamp.
+
+        Returns:
+            (keys, snapshots) where keys are epoch microseconds
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT ts, payload FROM snapshots WHERE symbol = ? ORDER BY ts",
+                (symbol,)
+            ).fetchall()
+        return [ts for ts, _ in rows], [self._decode(payload) for _, payload in rows]
+
+    def symbols(self) -> List[str]:
+        """Symbols with at least one recorded snapshot."""
+        with self._lock:
+            rows = self._conn.execute("SELECT DISTINCT symbol FROM snapshots ORDER BY symbol").fetchall()
+        return [row[0] for row in rows]
+
+    def count(self, symbol: Optional[str] = None) -> int:
+        """Number of stored snapshots, optionally for one symbol."""
+        with self._lock:
+            if symbol is None:
+                return self._conn.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM snapshots WHERE symbol = ?", (symbol,)
+            ).fetchone()[0]
+
+    def version(self) -> str:
+        """
+        Cheap identifier of the store's contents: changes whenever snapshots
+        are added or a newer bar is recorded.
+        """
+        with self._lock:
+            count, latest = self._conn.execute("SELECT COUNT(*), MAX(ts) FROM snapshots").fetchone()
+        return f"{count}:{latest}"
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _encode(self, unified: Dict) -> bytes:
+        payload = json.dumps(unified, separators=(',', ':'), default=str)
+        return zlib.compress(payload.encode('utf-8'), self.compression_level)
+
+    def _decode(self, payload: bytes) -> Dict:
+        return json.loads(zlib.decompress(payload).decode('utf-8'))
+
+
+class SnapshotRecorder:
+    """
+    Drop-in MultiSourceDataFeed wrapper that records every unified snapshot.
+
+    Example:
+        store = SnapshotStore('snapshots/btc.db')
+        engine = BacktestEngine(feed=SnapshotRecorder(store))
+        engine.run_backtest('graham', 'BTC', '2024-01-01', '2024-12-31')
+    """
+
+    def __init__(self, store: SnapshotStore, feed=None):
+        """
+        Args:
+            store: Where snapshots are written
+            feed: Live feed to record from (defaults to a real MultiSourceDataFeed)
+        """
+        if feed is None:
+            from market_data.multi_source_feed import MultiSourceDataFeed
+            feed = MultiSourceDataFeed(use_mock=False)
+        self.store = store
+        self.feed = feed
+
+    def get_unified_data(self,
+                         symbol: str,
+                         market_data: Dict,
+                         event_config: Optional[Dict] = None) -> Dict:
+        """Fetch through the live feed and save the snapshot under the bar timestamp."""
+        unified = self.feed.get_unified_data(symbol, market_data, event_config)
+        timestamp = market_data.get('timestamp')
+        if timestamp is None:
+            timestamp = datetime.fromisoformat(unified['timestamp'])
+        self.store.put(symbol, timestamp, unified)
+        return unified
+
+    def __getattr__(self, name):
+        # Everything else (get_audit_trail, adapters, ...) behaves like the live feed
+        return getattr(self.feed, name)
+
+
+class ReplayDataFeed:
+    """
+    Serves recorded snapshots in place of MultiSourceDataFeed.
+
+    Each symbol is loaded into memory on first use. A bar without an exact
+    snapshot gets the latest one recorded before it, never a later one.
+    """
+
+    # Each bar may get a different snapshot (see StrategyEvaluator.per_bar_snapshots)
+    snapshot_per_bar = True
+
+    def __init__(self, store: SnapshotStore):
+        self.store = store
+        self._series: Dict[str, Tuple[List[int], List[Dict]]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_path(cls, path: str) -> 'ReplayDataFeed':
+        """
+        Open a replay feed on a store file.
+
+        Handy as a picklable feed factory for worker processes:
+        functools.partial(ReplayDataFeed.from_path, 'snapshots.db')
+        """
+        return cls(SnapshotStore(path))
+
+    @property
+    def data_version(self) -> str:
+        """Identifies the recorded data, e.g. for backtest result cache keys"""
+        return f"replay:{self.store.version()}"
+
+    def get_unified_data(self,
+                         symbol: str,
+                         market_data: Dict,
+                         event_config: Optional[Dict] = None) -> Dict:
+        """
+        Return the recorded snapshot for this bar.
+
+        Raises:
+            KeyError: If nothing was recorded for the symbol at or before the bar
+        """
+        keys, snapshots = self._load(symbol)
+        timestamp = market_data.get('timestamp')
+        if timestamp is None:
+            raise KeyError(f"Replay needs market_data['timestamp'] for {symbol}")
+
+        idx = bisect.bisect_right(keys, snapshot_key(timestamp)) - 1
+        if idx < 0:
+            raise KeyError(f"No recorded snapshot for {symbol} at or before {timestamp}")
+
+        # The bar itself always comes from the replayed price series
+        return {**snapshots[idx], 'market': market_data}
+
+    def preload(self, symbols: Iterable[str]):
+        """Load several symbols up front (e.g. before forking workers)."""
+        for symbol in symbols:
+            self._load(symbol)
+
+    def _load(self, symbol: str) -> Tuple[List[int], List[Dict]]:
+        series = self._series.get(symbol)
+        if series is None:
+            with self._lock:
+                series = self._series.get(symbol)
+                if series is None:
+                    series = self._series[symbol] = self.store.load(symbol)
+        return series
@@ -0,0 +1,210 @@
+"""
+Monte Carlo resampling of backtest results.
+
+A BacktestResult is one path through history. Bootstrapping its round
+trips (or its per-bar returns) builds thousands of alternative paths with
+the same trade statistics, which turns the point estimates of
+total_return, max_drawdown and sharpe_ratio into distributions with
+confidence intervals.
+
+Resamples are generated in fixed-size chunks, each as one NumPy matrix
+(resamples x steps), and the chunks are spread over a process pool. Every
+chunk has its own seed derived from the run's seed, so results do not
+depend on the number of workers.
+"""
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+from backtest_columns import PERIODS_PER_YEAR
+from backtest_vectorized import np, require_numpy
+
+logger = logging.getLogger(__name__)
+
+METRICS = ('total_return', 'max_drawdown', 'sharpe_ratio')
+
+# Cap on one chunk's resample matrix, in float64 cells (~64 MB)
+CHUNK_CELLS = 8_000_000
+
+NS_PER_YEAR = 365.25 * 24 * 3600 * 1e9
+
+
+def trip_growth(result) -> Any:
+    """
+    Equity growth factor of each round trip in a BacktestResult.
+
+    Equity on a trade's entry bar equals the capital just before the entry,
+    and equity on its exit bar the capital just after, so their ratio is
+    the trip's return on the whole account.
+    """
+    equity = result.equity_curve.values
+    ts = result.equity_curve.timestamps
+    actions = result.trades.actions
+    entry = np.searchsorted(ts, result.trades.timestamps[actions == 1])
+    exit_ = np.searchsorted(ts, result.trades.timestamps[actions == -1])
+    return equity[exit_] / equity[entry]
+
+
+def bar_returns(result) -> Any:
+    """Per-bar returns of a BacktestResult's equity curve"""
+    equity = result.equity_curve.values
+    return np.diff(equity) / equity[:-1]
+
+
+def _path_metrics(growth, periods_per_year: float) -> Dict[str, Any]:
+    """Metrics for each row of a (resamples x steps) matrix of growth factors"""
+    paths = np.cumprod(growth, axis=1)
+    total_return = (paths[:, -1] - 1) * 100
+
+    # Drawdown against the running peak, which starts at the initial capital
+    peak = np.maximum.accumulate(np.maximum(paths, 1.0), axis=1)
+    max_drawdown = ((peak - paths) / peak).max(axis=1) * 100
+
+    returns = growth - 1
+    std = returns.std(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(std > 0, returns.mean(axis=1) / std, 0.0) * periods_per_year ** 0.5
+
+    return {'total_return': total_return, 'max_drawdown': max_drawdown, 'sharpe_ratio': sharpe}
+
+
+def _resample_chunk(samples, n_resamples: int, block_size: int, periods_per_year: float,
+                    seed) -> Dict[str, Any]:
+    """One chunk of bootstrap paths; runs in a worker process"""
+    rng = np.random.default_rng(seed)
+    n = len(samples)
+    if block_size <= 1:
+        idx = rng.integers(0, n, size=(n_resamples, n))
+    else:
+        # Circular block bootstrap keeps short-range autocorrelation intact
+        n_blocks = -(-n // block_size)
+        starts = rng.integers(0, n, size=(n_resamples, n_blocks, 1))
+        idx = ((starts + np.arange(block_size)) % n).reshape(n_resamples, -1)[:, :n]
+    return _path_metrics(1 + samples[idx], periods_per_year)
+
+
+@dataclass
+class MonteCarloResult:
+    """Bootstrap distributions of backtest metrics"""
+    method: str
+    n_resamples: int
+    observed: Dict[str, float]
+    samples: Dict[str, Any] = field(default_factory=dict)  # metric -> float array
+
+    def confidence_interval(self, metric: str, level: float = 0.95) -> Tuple[float, float]:
+        """Percentile interval holding `level` of the resampled values"""
+        tail = (1 - level) / 2 * 100
+        low, high = np.percentile(self.samples[metric], [tail, 100 - tail])
+        return round(float(low), 2), round(float(high), 2)
+
+    def probability(self, metric: str, threshold: float, above: bool = True) -> float:
+        """Share of resamples with the metric above (or below) a threshold"""
+        values = self.samples[metric]
+        return float(np.mean(values > threshold if above else values < threshold))
+
+    def summary(self, level: float = 0.95) -> Dict[str, Dict[str, float]]:
+        """Observed value, mean, spread, median and confidence interval per metric"""
+        table = {}
+        for metric in METRICS:
+            values = self.samples[metric]
+            low, high = self.confidence_interval(metric, level)
+            table[metric] = {
+                'observed': self.observed.get(metric, 0.0),
+                'mean': round(float(values.mean()), 2),
+                'std': round(float(values.std()), 2),
+                'median': round(float(np.median(values)), 2),
+                'ci_low': low,
+                'ci_high': high,
+            }
+        return table
+
+
+class MonteCarloSimulator:
+    """
+    Bootstrap confidence intervals for a backtest.
+
+    Example:
+        result = engine.run_backtest('trend_follower', 'SPY', '2015-01-01', '2024-12-31')
+        mc = MonteCarloSimulator(n_resamples=10_000, seed=42).run(result)
+        mc.confidence_interval('max_drawdown')   # (low, high) in percent
+        mc.probability('total_return', 0.0)      # chance of ending in profit
+    """
+
+    def __init__(
+        self,
+        n_resamples: int = 10_000,
+        method: str = 'trades',
+        block_size: int = 1,
+        seed: Optional[int] = None,
+        max_workers: Optional[int] = None
+    ):
+        """
+        Args:
+            n_resamples: Number of bootstrap paths
+            method: 'trades' resamples round-trip returns, 'returns' per-bar returns
+            block_size: Consecutive samples drawn together (1 = plain bootstrap)
+            seed: Makes the resamples reproducible
+            max_workers: Worker processes (defaults to the CPU count); 1 runs in-process
+        """
+        if method not in ('trades', 'returns'):
+            raise ValueError(f"Unknown method '{method}' (use 'trades' or 'returns')")
+        self.n_resamples = n_resamples
+        self.method = method
+        self.block_size = block_size
+        self.seed = seed
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+    def run(self, result) -> MonteCarloResult:
+        """
+        Resample a BacktestResult.
+
+        Raises:
+            ValueError: Fewer than two trades (or bars) to resample
+        """
+        require_numpy()
+        observed = {metric: getattr(result, metric) for metric in METRICS}
+
+        if self.method == 'trades':
+            samples = trip_growth(result) - 1
+            # Annualize per-trade Sharpe by how often the strategy actually traded
+            ts = result.equity_curve.timestamps
+            years = (ts[-1] - ts[0]) / NS_PER_YEAR if len(ts) > 1 else 0.0
+            periods_per_year = len(samples) / years if years > 0 else 0.0
+        else:
+            samples = bar_returns(result)
+            periods_per_year = PERIODS_PER_YEAR
+
+        if len(samples) < 2:
+            raise ValueError(f"Need at least two {self.method} to resample, got {len(samples)}")
+
+        return MonteCarloResult(
+            method=self.method,
+            n_resamples=self.n_resamples,
+            observed=observed,
+            samples=self.resample(samples, periods_per_year)
+        )
+
+    def resample(self, samples, periods_per_year: float = PERIODS_PER_YEAR) -> Dict[str, Any]:
+        """Bootstrap metric distributions from an array of per-step returns"""
+        samples = np.ascontiguousarray(samples, dtype=np.float64)
+        per_chunk = max(1, min(self.n_resamples, CHUNK_CELLS // len(samples)))
+        sizes = [per_chunk] * (self.n_resamples // per_chunk)
+        if self.n_resamples % per_chunk:
+            sizes.append(self.n_resamples % per_chunk)
+        seeds = np.random.SeedSequence(self.seed).spawn(len(sizes))
+
+        tasks = [(samples, size, self.block_size, periods_per_year, seed) for size, seed in zip(sizes, seeds)]
+        logger.info(
+            f"Monte Carlo: {self.n_resamples} resamples of {len(samples)} {self.method} "
+            f"in {len(tasks)} chunks"
+        )
+
+        if self.max_workers == 1 or len(tasks) == 1:
+            chunks = [_resample_chunk(*task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=min(self.max_workers, len(tasks))) as pool:
+                chunks = list(pool.map(_resample_chunk, *zip(*tasks)))
+
+        return {metric: np.concatenate([chunk[metric] for chunk in chunks]) for metric in METRICS}
@@ -11,6 +11,7 @@ from typing import List, Dict, Optional
 from agents.base_agent import BaseAgent, Signal
 from datetime import datetime
 from market_data.prediction_market_adapter import PredictionMarketFeed
+from llm_cache import LLMCache, prompt_fingerprint
 import os
 
 # Gemini for explanations (optional)
@@ -26,7 +27,7 @@ class BattleManager:
     Runs agent competitions with prediction market event integration.
     """
     
-    def __init__(self, agents, event_config=None, llm_enabled=False, gemini_api_key=None):
+    def __init__(self, agents, event_config=None, llm_enabled=False, gemini_api_key=None, explanation_cache=None):
         self.agents = agents
         self.current_epoch = 0
         self.epoch_wins = {agent.name: 0 for agent in agents}
@@ -46,6 +47,9 @@ class BattleManager:
             else:
                 self.gemini_client = genai.Client(api_key=api_key)
                 self.gemini_model = 'gemini-2.0-flash'
+        
+        # Identical rounds (same winner, market and odds) reuse the explanation
+        self.explanation_cache = explanation_cache or LLMCache(path=os.getenv('LLM_CACHE_PATH'))
     
     async def run_battle(self, market_data):
         """Run one competition round with current market and event data."""
@@ -130,16 +134,34 @@ class BattleManager:
         if not self.llm_enabled:
             return self._rule_based_explanation(winner, market_data, event_data)
         
+        key = self._explanation_key(winner, market_data, event_data)
+        cached = self.explanation_cache.get(key)
+        if cached is not None:
+            return cached
+        
         try:
             prompt = self._build_prompt(winner, all_signals, market_data, event_data)
             response = self.gemini_client.models.generate_content(
                 model=self.gemini_model,
                 contents=prompt
             )
-            return response.text.strip()
+            explanation = response.text.strip()
         except Exception as e:
             print(f"LLM failed: {e}")
             return self._rule_based_explanation(winner, market_data, event_data)
+        self.explanation_cache.put(key, explanation)
+        return explanation
+    
+    def _explanation_key(self, winner, market_data, event_data):
+        """Fingerprint of what _build_prompt shows the model, minus the round number"""
+        return prompt_fingerprint(
+            self.gemini_model, None,
+            winner=winner.agent_name,
+            reason=winner.reason,
+            symbol=market_data.get('symbol'),
+            price=market_data.get('price', 0),
+            events={k: v.get('yes_probability', 0) for k, v in (event_data or {}).items()}
+        )
     
     def _rule_based_explanation(self, winner, market_data, event_data):
         exp = f"{winner.agent_name} selected ({winner.confidence:.0%} confidence). {winner.reason}"
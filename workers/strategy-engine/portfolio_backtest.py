@@ -0,0 +1,377 @@
+"""
+Multi-asset portfolio backtest over the trading universe.
+
+Every symbol in universe.json is advanced on one shared clock (the union
+of all bar timestamps) against a single cash and position ledger. Signals
+do not depend on the ledger, so each asset's decision series is evaluated
+up front, one asset per worker process; the ledger then walks the clock
+once, handling all assets of a bar with array operations.
+"""
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from backtest_columns import EquityCurve, Trade, TradeLog, compute_metrics
+from backtest_engine import BacktestEngine
+from backtest_sweep import _worker_state, run_in_pool, slice_bars
+from backtest_vectorized import iter_price_bars, load_price_arrays, np, price_bars, require_numpy
+from strategy_evaluator import Decision
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_UNIVERSE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'universe.json')
+
+# Round-trip ledger columns holding bar/asset indices rather than amounts
+INDEX_KEYS = ('asset', 'entry', 'exit')
+
+
+def load_universe(path: str = DEFAULT_UNIVERSE_PATH) -> Dict[str, Any]:
+    """
+    Read the active symbols and position limit from universe.json.
+
+    Returns:
+        {'symbols': [...], 'asset_classes': {symbol: asset_class}, 'max_position_size': float}
+    """
+    with open(path) as f:
+        universe = json.load(f)
+    active = [entry for entry in universe.get('universe', []) if entry.get('active', True)]
+    return {
+        'symbols': [entry['symbol'] for entry in active],
+        'asset_classes': {entry['symbol']: entry.get('asset_class', 'equity') for entry in active},
+        'max_position_size': universe.get('strategy_defaults', {}).get('max_position_size', 0.05)
+    }
+
+
+def history_symbol(symbol: str, asset_class: Optional[str]) -> str:
+    """Yahoo ticker for a universe entry: crypto trades as '<symbol>-USD' ('BTC' alone is an ETF)"""
+    if asset_class == 'crypto' and not symbol.endswith('-USD'):
+        return f"{symbol}-USD"
+    return symbol
+
+
+def align_on_clock(price_data: Dict[str, List[Dict]], symbols: List[str]) -> Tuple[Any, Any, Dict[str, Any]]:
+    """
+    Put every symbol's bars on the union of all bar timestamps.
+
+    Returns:
+        (clock, prices, rows): clock is sorted epoch nanoseconds, prices is a
+        bars x symbols matrix forward-filled from each symbol's last bar
+        (NaN before its first one), rows maps a symbol to the clock row of
+        each of its own bars
+    """
+    columns = {symbol: load_price_arrays(price_data[symbol]) for symbol in symbols}
+    clock = (np.unique(np.concatenate([columns[s]['timestamp'] for s in symbols]))
+             if symbols else np.empty(0, dtype=np.int64))
+
+    prices = np.full((len(clock), len(symbols)), np.nan)
+    rows = {}
+    for j, symbol in enumerate(symbols):
+        rows[symbol] = np.searchsorted(clock, columns[symbol]['timestamp'])
+        prices[rows[symbol], j] = columns[symbol]['price']
+
+    # Forward fill: each cell takes the most recent row that had a bar
+    last_row = np.where(np.isnan(prices), 0, np.arange(len(clock))[:, None])
+    np.maximum.accumulate(last_row, axis=0, out=last_row)
+    prices = prices[last_row, np.arange(len(symbols))]
+    return clock, prices, rows
+
+
+def _symbol_signals(strategy_name: str, symbol: str, vectorized: bool) -> Tuple[List[int], List[bool]]:
+    """Decision (1/-1/0) and approval for each of one symbol's bars"""
+    bars = _worker_state['price_data'][symbol]
+    engine = BacktestEngine(_worker_state['initial_capital'], feed=_worker_state['feed'])
+
+    # Per-bar snapshots cannot be broadcast over the series (see run_backtest)
+    if vectorized and not engine.evaluator.per_bar_snapshots:
+        arrays = load_price_arrays(bars)
+        first_bar = price_bars(slice_bars(arrays, 0, 1)) if len(arrays['price']) else None
+        frame = engine.evaluator.evaluate_strategy_vectorized(
+            strategy_name, symbol, arrays,
+            market_data=engine._market_data(symbol, first_bar[0]) if first_bar else None
+        )
+        return frame.decision.tolist(), frame.approved.tolist()
+
+    if isinstance(bars, dict):
+        # Attached shared-memory columns, turned into bar dicts a chunk at a time
+        bars = iter_price_bars(bars)
+
+    codes = {Decision.BUY: 1, Decision.SELL: -1}
+    decision, approved = [], []
+    for data_point in bars:
+        evaluation = engine.evaluator.evaluate_strategy(
+            strategy_name=strategy_name,
+            asset=symbol,
+            market_data=engine._market_data(symbol, data_point),
+            research=False
+        )
+        decision.append(codes.get(evaluation.decision, 0))
+        approved.append(evaluation.final_action == 'APPROVED')
+    return decision, approved
+
+
+@dataclass
+class PortfolioTrade(Trade):
+    """A Trade tagged with the symbol it was made in"""
+    symbol: str = ''
+
+
+class PortfolioTradeLog(TradeLog):
+    """TradeLog with an asset column; rows come back as PortfolioTrade"""
+
+    __slots__ = ('symbols', 'assets')
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.symbols: List[str] = []
+        self.assets = np.empty(0, dtype=np.int64)  # index into symbols, one per row
+
+    def __getitem__(self, index: int) -> PortfolioTrade:
+        trade = super().__getitem__(index)
+        return PortfolioTrade(**trade.__dict__, symbol=self.symbols[self.assets[index]])
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, PortfolioTradeLog):
+            return (
+                super().__eq__(other)
+                and self.symbols == other.symbols
+                and np.array_equal(self.assets, other.assets)
+            )
+        return super().__eq__(other)
+
+    __hash__ = None
+
+
+@dataclass
+class PortfolioBacktestResult:
+    """Portfolio-level backtest results"""
+    strategy: str
+    symbols: List[str]
+    start_date: str
+    end_date: str
+    max_position_size: float
+    total_return: float
+    max_drawdown: float
+    sharpe_ratio: float
+    win_rate: float
+    total_trades: int
+    winning_trades: int
+    losing_trades: int
+    avg_win: float
+    avg_loss: float
+    sortino_ratio: float = 0.0
+    exposure: float = 0.0  # Fraction of bars with at least one position open
+    max_drawdown_duration: int = 0
+    per_symbol: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    trades: PortfolioTradeLog = field(default_factory=PortfolioTradeLog)
+    equity_curve: EquityCurve = field(default_factory=EquityCurve)
+
+    def summary(self) -> Dict:
+        """Scalar fields and per-symbol stats (no trades or equity curve)"""
+        return {
+            name: value for name, value in self.__dict__.items()
+            if name not in ('trades', 'equity_curve')
+        }
+
+
+class PortfolioBacktester:
+    """
+    Backtest one strategy across the universe with a shared ledger.
+
+    Example:
+        backtester = PortfolioBacktester(feed_factory=partial(ReplayDataFeed.from_path, 'universe.db'))
+        result = backtester.run('multi_agent', '2024-01-01', '2024-12-31')
+    """
+
+    def __init__(
+        self,
+        initial_capital: float = 100000.0,
+        universe_path: str = DEFAULT_UNIVERSE_PATH,
+        max_position_size: Optional[float] = None,
+        max_workers: Optional[int] = None,
+        feed_factory: Optional[Callable] = None,
+        vectorized: bool = False,
+        quiet: bool = True
+    ):
+        """
+        Args:
+            initial_capital: Starting capital in USD
+            universe_path: universe.json with the symbols and strategy_defaults
+            max_position_size: Fraction of portfolio equity per entry
+                               (defaults to strategy_defaults.max_position_size)
+            max_workers: Worker processes for signal evaluation; 1 runs in-process
+            feed_factory: Picklable zero-arg callable building each worker's feed
+            vectorized: Evaluate each symbol with the vectorized agent path
+            quiet: Drop per-bar INFO logging inside workers
+        """
+        universe = load_universe(universe_path)
+        self.symbols = universe['symbols']
+        self.asset_classes = universe['asset_classes']
+        self.max_position_size = max_position_size or universe['max_position_size']
+        self.initial_capital = initial_capital
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.feed_factory = feed_factory
+        self.vectorized = vectorized
+        self.quiet = quiet
+
+    def run(
+        self,
+        strategy_name: str,
+        start_date: str,
+        end_date: str,
+        price_data: Optional[Dict[str, List[Dict]]] = None,
+        symbols: Optional[List[str]] = None
+    ) -> PortfolioBacktestResult:
+        """
+        Run the portfolio backtest.
+
+        Args:
+            strategy_name: Strategy applied to every symbol
+            start_date: Start date (YYYY-MM-DD)
+            end_date: End date (YYYY-MM-DD)
+            price_data: Optional {symbol: bars}; missing symbols are fetched,
+                        crypto as '<symbol>-USD'. Symbols without history are
+                        skipped with a warning.
+            symbols: Subset of symbols to trade (defaults to the universe)
+
+        Returns:
+            PortfolioBacktestResult
+        """
+        require_numpy()
+        symbols = list(symbols or self.symbols)
+        price_data = dict(price_data or {})
+        engine = BacktestEngine(self.initial_capital)
+        for symbol in symbols:
+            if symbol not in price_data:
+                ticker = history_symbol(symbol, self.asset_classes.get(symbol))
+                try:
+                    price_data[symbol] = engine._fetch_real_historical_data(ticker, start_date, end_date)
+                except ValueError as e:
+                    logger.warning(f"Skipping {symbol}: no history for {ticker} ({e})")
+        symbols = [s for s in symbols if s in price_data]
+        if not symbols:
+            raise ValueError("Strict Real Data Only: no symbol in the portfolio has history.")
+
+        logger.info(
+            f"Portfolio backtest: {strategy_name} on {len(symbols)} symbols from {start_date} to {end_date}"
+        )
+
+        clock, prices, rows = align_on_clock(price_data, symbols)
+        decision = np.zeros(prices.shape, dtype=np.int8)
+        approved = np.zeros(prices.shape, dtype=bool)
+
+        initargs = ({s: price_data[s] for s in symbols}, self.initial_capital, self.feed_factory, self.quiet)
+        task_args = [(strategy_name, symbol, self.vectorized) for symbol in symbols]
+        for args, outcome in run_in_pool(_symbol_signals, task_args, initargs, self.max_workers):
+            if isinstance(outcome, Exception):
+                raise RuntimeError(f"Signal evaluation failed for {args[1]}: {outcome}") from outcome
+            j = symbols.index(args[1])
+            decision[rows[args[1]], j] = outcome[0]
+            approved[rows[args[1]], j] = outcome[1]
+
+        ledger = self._simulate_ledger(prices, decision, approved)
+        return self._build_result(strategy_name, symbols, start_date, end_date, clock, ledger)
+
+    def _simulate_ledger(self, prices, decision, approved) -> Dict[str, Any]:
+        """
+        One walk over the clock with every asset of a bar handled as a vector.
+
+        Exits are processed before entries so cash freed on a bar can fund
+        that bar's new positions. Each entry targets max_position_size of
+        current equity; when cash falls short all of the bar's entries are
+        scaled down by the same factor.
+        """
+        n_bars, n_assets = prices.shape
+        marks = np.nan_to_num(prices)
+        cash = self.initial_capital
+        quantity = np.zeros(n_assets)
+        entry_bar = np.zeros(n_assets, dtype=np.int64)
+        entry_price = np.zeros(n_assets)
+        equity = np.empty(n_bars)
+        trips = {'asset': [], 'entry': [], 'exit': [], 'entry_price': [], 'exit_price': [], 'quantity': []}
+
+        def close(assets, bar):
+            nonlocal cash
+            cash += float(quantity[assets] @ marks[bar, assets])
+            trips['asset'].append(assets)
+            trips['entry'].append(entry_bar[assets])
+            trips['exit'].append(np.full(len(assets), bar))
+            trips['entry_price'].append(entry_price[assets])
+            trips['exit_price'].append(marks[bar, assets])
+            trips['quantity'].append(quantity[assets])
+            quantity[assets] = 0.0
+
+        for t in range(n_bars):
+            held = quantity > 0
+
+            exits = np.flatnonzero((decision[t] == -1) & held)
+            if len(exits):
+                close(exits, t)
+
+            entries = np.flatnonzero((decision[t] == 1) & approved[t] & (quantity == 0))
+            if len(entries):
+                portfolio_value = cash + float(quantity @ marks[t])
+                notional = self.max_position_size * portfolio_value
+                scale = min(1.0, cash / (notional * len(entries))) if notional > 0 else 0.0
+                quantity[entries] = notional * scale / prices[t, entries]
+                entry_bar[entries] = t
+                entry_price[entries] = prices[t, entries]
+                cash -= notional * scale * len(entries)
+
+            equity[t] = cash + float(quantity @ marks[t])
+
+        still_open = np.flatnonzero(quantity > 0)
+        if len(still_open):
+            close(still_open, n_bars - 1)
+
+        trips = {
+            key: np.concatenate(parts) if parts else np.empty(0, dtype=np.int64 if key in INDEX_KEYS else float)
+            for key, parts in trips.items()
+        }
+        # Round trips in entry order, like a single-asset trade list
+        order = np.lexsort((trips['asset'], trips['entry']))
+        return {key: value[order] for key, value in trips.items()} | {'equity': equity}
+
+    @staticmethod
+    def _exposure(ledger: Dict[str, Any], n_bars: int) -> float:
+        """Fraction of bars with any position open (entry bar up to, not including, exit bar)"""
+        if not n_bars:
+            return 0.0
+        open_positions = np.zeros(n_bars + 1, dtype=np.int64)
+        np.add.at(open_positions, ledger['entry'], 1)
+        np.add.at(open_positions, ledger['exit'], -1)
+        return round(float(np.count_nonzero(np.cumsum(open_positions[:n_bars]) > 0)) / n_bars, 4)
+
+    def _build_result(self, strategy_name, symbols, start_date, end_date, clock, ledger):
+        pnl = (ledger['exit_price'] - ledger['entry_price']) * ledger['quantity']
+        trades = PortfolioTradeLog.from_round_trips(
+            clock[ledger['entry']], clock[ledger['exit']],
+            ledger['entry_price'], ledger['exit_price'], ledger['quantity'], pnl
+        )
+        trades.symbols = symbols
+        trades.assets = np.repeat(ledger['asset'], 2)
+        equity_curve = EquityCurve(clock, ledger['equity'])
+        metrics = compute_metrics(trades, equity_curve, self.initial_capital)
+        # compute_metrics sums bars held per round trip, which overlapping
+        # positions in several assets push past 1; count bars instead
+        metrics['exposure'] = self._exposure(ledger, len(clock))
+
+        trip_counts = np.bincount(ledger['asset'], minlength=len(symbols))
+        symbol_pnl = np.bincount(ledger['asset'], weights=pnl, minlength=len(symbols))
+        per_symbol = {
+            symbol: {'total_trades': int(trip_counts[j]), 'pnl': round(float(symbol_pnl[j]), 2)}
+            for j, symbol in enumerate(symbols)
+        }
+
+        return PortfolioBacktestResult(
+            strategy=strategy_name,
+            symbols=symbols,
+            start_date=start_date,
+            end_date=end_date,
+            max_position_size=self.max_position_size,
+            **metrics,
+            per_symbol=per_symbol,
+            trades=trades,
+            equity_curve=equity_curve
+        )
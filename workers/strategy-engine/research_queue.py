@@ -0,0 +1,178 @@
+"""
+Deferred Kimi research summaries.
+
+An LLM summary takes seconds; a trade decision should not. The evaluator
+hands research to a ResearchQueue and returns its decision at once with a
+ticket id. Background workers call Kimi; the summary is then fetched by
+ticket (get, wait, wait_async) or pushed to subscribers as it lands.
+
+Tickets live in this process's memory and the summaries are written on
+its threads, so the queue needs a long-lived server process (uvicorn, the
+orchestrator) that later ticket lookups reach. Isolate-per-request
+runtimes such as Cloudflare Python Workers neither keep the work alive
+after the response nor route a lookup back to the same isolate;
+StrategyEvaluator leaves research off there (see long_lived_process).
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PENDING = 'pending'
+READY = 'ready'
+FAILED = 'failed'
+
+
+def long_lived_process() -> bool:
+    """Whether background threads here outlive a request (not in Pyodide, which Python Workers run on)"""
+    return sys.platform != 'emscripten'
+
+
+@dataclass
+class ResearchTicket:
+    """One research request and, once done, its summary"""
+    ticket_id: str
+    asset: str
+    decision: str
+    status: str = PENDING
+    summary: Optional[str] = None
+    error: Optional[str] = None
+    created_at: float = 0.0
+    completed_at: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+
+class ResearchQueue:
+    """
+    Background research generation with ticket lookup and push delivery.
+
+    Example:
+        queue = ResearchQueue(evaluator._generate_kimi_research)
+        ticket_id = queue.submit('AAPL', 'BUY', unified_data)   # returns immediately
+        queue.subscribe(lambda ticket: websocket.send(ticket.to_dict()))
+        queue.wait(ticket_id, timeout=30).summary
+    """
+
+    def __init__(
+        self,
+        generate: Callable[[str, str, Dict], str],
+        max_workers: int = 4,
+        max_tickets: int = 10_000
+    ):
+        """
+        Args:
+            generate: (asset, decision, unified_data) -> summary, e.g.
+                      StrategyEvaluator._generate_kimi_research
+            max_workers: Concurrent LLM calls
+            max_tickets: Tickets remembered; the oldest finished ones are dropped first
+        """
+        self.generate = generate
+        self.max_tickets = max_tickets
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='research')
+        self._tickets: 'OrderedDict[str, ResearchTicket]' = OrderedDict()
+        self._futures: Dict[str, Future] = {}
+        self._subscribers: List[Callable[[ResearchTicket], None]] = []
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        asset: str,
+        decision: str,
+        data: Dict,
+        on_ready: Optional[Callable[[ResearchTicket], None]] = None
+    ) -> str:
+        """
+        Queue a summary and return its ticket id without waiting.
+
+        Args:
+            asset, decision, data: Passed to generate
+            on_ready: Called with the finished ticket (ready or failed)
+        """
+        ticket = ResearchTicket(uuid.uuid4().hex, asset, decision, created_at=time.time())
+        with self._lock:
+            self._tickets[ticket.ticket_id] = ticket
+            self._evict()
+            future = self.executor.submit(self._run, ticket, data)
+            self._futures[ticket.ticket_id] = future
+        if on_ready is not None:
+            future.add_done_callback(lambda _: on_ready(ticket))
+        return ticket.ticket_id
+
+    def get(self, ticket_id: str) -> Optional[ResearchTicket]:
+        """Ticket as it stands now (None for unknown or evicted ids)"""
+        with self._lock:
+            return self._tickets.get(ticket_id)
+
+    def wait(self, ticket_id: str, timeout: Optional[float] = None) -> Optional[ResearchTicket]:
+        """
+        Block until the ticket is finished.
+
+        Raises:
+            TimeoutError: If it is still pending after timeout seconds
+        """
+        with self._lock:
+            future = self._futures.get(ticket_id)
+        if future is not None:
+            future.result(timeout=timeout)
+        return self.get(ticket_id)
+
+    async def wait_async(self, ticket_id: str, timeout: Optional[float] = None) -> Optional[ResearchTicket]:
+        """wait for event loops (e.g. a long-polling endpoint)"""
+        with self._lock:
+            future = self._futures.get(ticket_id)
+        if future is not None:
+            await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+        return self.get(ticket_id)
+
+    def subscribe(self, callback: Callable[[ResearchTicket], None]):
+        """Push every finished ticket to callback (called on a research thread)"""
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[ResearchTicket], None]):
+        with self._lock:
+            self._subscribers.remove(callback)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            counts = {PENDING: 0, READY: 0, FAILED: 0}
+            for ticket in self._tickets.values():
+                counts[ticket.status] += 1
+        return counts
+
+    def _run(self, ticket: ResearchTicket, data: Dict):
+        try:
+            ticket.summary = self.generate(ticket.asset, ticket.decision, data)
+            ticket.status = READY
+        except Exception as e:
+            logger.error(f"Research for {ticket.asset} failed: {e}")
+            ticket.error = str(e)
+            ticket.status = FAILED
+        ticket.completed_at = time.time()
+
+        with self._lock:
+            self._futures.pop(ticket.ticket_id, None)
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(ticket)
+            except Exception as e:
+                logger.error(f"Research subscriber failed: {e}")
+
+    def _evict(self):
+        """Drop the oldest finished tickets beyond max_tickets (lock held)"""
+        excess = len(self._tickets) - self.max_tickets
+        if excess <= 0:
+            return
+        for ticket_id in [t for t, ticket in self._tickets.items() if ticket.status != PENDING][:excess]:
+            del self._tickets[ticket_id]
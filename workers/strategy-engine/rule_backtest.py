@@ -0,0 +1,140 @@
+"""
+Columnar backtests for YAML rule strategies.
+
+StrategyExecutor evaluates a parsed Strategy for one asset at one moment
+and writes a decision log. This module replays the same rules over a
+historical metric table instead: every Condition is one comparison over a
+column, every Rule an AND of its conditions, and require_confirmations a
+row-wise count of passed rules. Fills reuse the vectorized engine's
+simulate_fills with position_size as the allocation, so a multi-year
+daily table backtests in milliseconds and nothing is logged.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from backtest_columns import EquityCurve, TradeLog, compute_metrics, from_epoch_ns, observation_ns_array
+from backtest_engine import BacktestResult
+from backtest_vectorized import np, require_numpy, simulate_fills
+from strategy_parser import Condition, Rule, Strategy
+
+
+@dataclass
+class RuleSignalFrame:
+    """Row-wise rule evaluation over a metric table"""
+    rule_passed: Dict[str, Any]  # rule id -> bool array
+    passed_count: Any  # int array, rules passed per row
+    confidence: Any  # float array, passed_count / number of rules
+    signal: Any  # bool array, passed_count >= require_confirmations (StrategyExecutor's BUY)
+
+
+def metric_column(table: Dict[str, Any], rule: Rule, condition: Condition) -> Optional[Any]:
+    """
+    Column for a condition's metric as float64, or None when the table lacks it.
+
+    A source-qualified column ('polymarket.us_recession_2025_odds') wins over
+    the bare metric name, so tables mixing sources can disambiguate.
+    """
+    for name in (f'{rule.source.value}.{condition.metric}', condition.metric):
+        if name in table:
+            return np.asarray(table[name], dtype=float)
+    return None
+
+
+def evaluate_rules(strategy: Strategy, table: Dict[str, Any]) -> RuleSignalFrame:
+    """
+    Evaluate every rule of a strategy on every row of a metric table.
+
+    Missing columns and NaN cells fail their condition, as an unavailable
+    metric does in Rule.evaluate.
+
+    Args:
+        strategy: Parsed YAML strategy
+        table: {column: sequence}, one row per timestamp; see metric_column
+
+    Returns:
+        RuleSignalFrame
+    """
+    require_numpy()
+    n = len(table['timestamp'])
+    rule_passed = {}
+    for rule in strategy.rules:
+        passed = np.ones(n, dtype=bool)
+        for condition in rule.conditions:
+            values = metric_column(table, rule, condition)
+            if values is None:
+                passed[:] = False
+                break
+            passed &= condition.evaluate(values) & ~np.isnan(values)
+        rule_passed[rule.id] = passed
+
+    passed_count = np.zeros(n, dtype=np.int64)
+    for passed in rule_passed.values():
+        passed_count += passed
+
+    return RuleSignalFrame(
+        rule_passed=rule_passed,
+        passed_count=passed_count,
+        confidence=passed_count / len(strategy.rules) if strategy.rules else np.zeros(n),
+        signal=passed_count >= strategy.execution.require_confirmations
+    )
+
+
+def run_rule_backtest(
+    strategy: Strategy,
+    table: Dict[str, Any],
+    symbol: Optional[str] = None,
+    initial_capital: float = 100000.0,
+    unit: Optional[str] = None
+) -> BacktestResult:
+    """
+    Backtest a rule strategy over a historical metric table.
+
+    The strategy is long while its confirmations hold: it enters position_size
+    of capital when the signal turns on and exits when it turns off, with any
+    open position closed at the last price.
+
+    Args:
+        strategy: Parsed YAML strategy
+        table: Columns 'timestamp' (datetimes, datetime64 or numbers in
+               `unit`), 'price' (or 'close') and one column per rule metric
+        symbol: Asset the table describes (defaults to the strategy's first)
+        initial_capital: Starting capital in USD
+        unit: Unit of numeric timestamps ('s', 'ms', 'us', 'ns'); required for them
+
+    Returns:
+        BacktestResult, as BacktestEngine.run_backtest returns
+
+    Raises:
+        ValueError: Numeric timestamps without a unit
+    """
+    require_numpy()
+    timestamps = observation_ns_array(table['timestamp'], unit)
+    prices = np.asarray(table['price'] if 'price' in table else table['close'], dtype=float)
+
+    frame = evaluate_rules(strategy, table)
+    fills = simulate_fills(
+        prices,
+        np.where(frame.signal, 1, -1),
+        np.ones(len(prices), dtype=bool),
+        initial_capital,
+        allocation=strategy.execution.position_size
+    )
+
+    trades = TradeLog.from_round_trips(
+        timestamps[fills.entry_index], timestamps[fills.exit_index],
+        fills.entry_price, fills.exit_price, fills.quantity, fills.pnl
+    )
+    equity_curve = EquityCurve(timestamps, fills.equity)
+
+    def date(index: int) -> str:
+        return from_epoch_ns(timestamps[index]).strftime('%Y-%m-%d') if len(timestamps) else ''
+
+    return BacktestResult(
+        strategy=strategy.name,
+        symbol=symbol or (strategy.assets[0] if strategy.assets else ''),
+        start_date=date(0),
+        end_date=date(-1),
+        **compute_metrics(trades, equity_curve, initial_capital),
+        trades=trades,
+        equity_curve=equity_curve
+    )
@@ -0,0 +1,153 @@
+"""
+Shared-memory price datasets for multi-process backtests.
+
+Pool workers used to receive their own pickled copy of the price history,
+so a 32-worker sweep held 32 copies of it as Python dicts. SharedDataset
+instead copies a series' columns once into a multiprocessing.shared_memory
+block. Workers get a small picklable DatasetHandle and attach to the block
+as read-only NumPy views. Every process reads the same physical pages.
+"""
+import logging
+from contextlib import contextmanager
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Dict, Tuple
+
+from backtest_vectorized import load_price_arrays, np
+
+logger = logging.getLogger(__name__)
+
+# Blocks this process has attached to, kept open for as long as views may exist
+_attached: Dict[str, shared_memory.SharedMemory] = {}
+
+
+@dataclass(frozen=True)
+class DatasetHandle:
+    """Picklable reference to a SharedDataset: block name and column layout"""
+    name: str
+    n_bars: int
+    columns: Tuple[Tuple[str, str], ...]  # (column, dtype) in block order
+
+    def attach(self) -> Dict[str, Any]:
+        """Read-only column views over the shared block (attached once per process)"""
+        shm = _attached.get(self.name)
+        if shm is None:
+            shm = _open_block(self.name)
+            _attached[self.name] = shm
+        return _column_views(shm.buf, self.n_bars, self.columns)
+
+
+class SharedDataset:
+    """
+    One price series in a shared memory block, owned by the creating process.
+
+    Example:
+        with SharedDataset(bars) as dataset:
+            pool = ProcessPoolExecutor(initializer=init, initargs=(dataset.handle,))
+            ...  # workers call handle.attach() for zero-copy columns
+    """
+
+    def __init__(self, price_data):
+        """
+        Args:
+            price_data: Bar dicts or columns, as run_backtest accepts
+        """
+        source = load_price_arrays(price_data)
+        n_bars = len(source['timestamp'])
+        layout = tuple((name, np.asarray(column).dtype.str) for name, column in source.items())
+        size = sum(np.dtype(dtype).itemsize for _, dtype in layout) * n_bars
+
+        # A zero-byte block is not allowed; an empty series still gets a handle
+        self._shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        _write_columns(self._shm.buf, n_bars, layout, source)
+        self.handle = DatasetHandle(self._shm.name, n_bars, layout)
+        logger.debug(f"Shared {n_bars} bars ({size:,} bytes) as {self._shm.name}")
+
+    @property
+    def nbytes(self) -> int:
+        return self._shm.size
+
+    def close(self):
+        """Release and unlink the block; attached workers keep their mapping until they exit"""
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self) -> 'SharedDataset':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+@contextmanager
+def shared_price_data(price_data):
+    """
+    Put price data in shared memory for the duration of a worker pool.
+
+    Yields what to pass to the workers in its place: a DatasetHandle for one
+    series, {symbol: DatasetHandle} for a {symbol: series} mapping. Without
+    NumPy, or for data that is not a series, the data itself is yielded.
+    """
+    if np is None or not price_data:
+        yield price_data
+        return
+
+    if isinstance(price_data, list) or (isinstance(price_data, dict) and 'timestamp' in price_data):
+        with SharedDataset(price_data) as dataset:
+            yield dataset.handle
+        return
+
+    if isinstance(price_data, dict):
+        datasets = {}
+        try:
+            for symbol, series in price_data.items():
+                datasets[symbol] = SharedDataset(series)
+            yield {symbol: dataset.handle for symbol, dataset in datasets.items()}
+        finally:
+            for dataset in datasets.values():
+                dataset.close()
+        return
+
+    yield price_data
+
+
+def attach_price_data(price_data):
+    """Inverse of shared_price_data in a worker: handles become column views"""
+    if isinstance(price_data, DatasetHandle):
+        return price_data.attach()
+    if isinstance(price_data, dict) and any(isinstance(v, DatasetHandle) for v in price_data.values()):
+        return {
+            key: value.attach() if isinstance(value, DatasetHandle) else value
+            for key, value in price_data.items()
+        }
+    return price_data
+
+
+def _open_block(name: str) -> shared_memory.SharedMemory:
+    """Attach without letting this process's resource tracker unlink the owner's block"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13 always registers the block with the tracker
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, 'shared_memory')
+        return shm
+
+
+def _write_columns(buf, n_bars: int, layout, source: Dict[str, Any]):
+    # Views are dropped on return, or the block could not be closed later
+    for name, view in _column_views(buf, n_bars, layout, writeable=True).items():
+        view[:] = source[name]
+
+
+def _column_views(buf, n_bars: int, layout, writeable: bool = False) -> Dict[str, Any]:
+    """Consecutive columns of a block as NumPy arrays over its buffer"""
+    views = {}
+    offset = 0
+    for name, dtype in layout:
+        view = np.ndarray((n_bars,), dtype=dtype, buffer=buf, offset=offset)
+        view.flags.writeable = writeable
+        views[name] = view
+        offset += view.nbytes
+    return views
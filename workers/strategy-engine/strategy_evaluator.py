@@ -2,9 +2,12 @@
 Production-ready strategy evaluator for SignalOps.
 Integrates multiple agents and provides unified decision-making interface.
 """
+import asyncio
+import copy
+import functools
 import logging
 import os
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
 from enum import Enum
 try:
@@ -13,17 +16,33 @@ except ImportError:
     OpenAI = None
     logging.warning("OpenAI module not found. Kimi research features will be disabled.")
 
-from agents.base_agent import BaseAgent
+from agents.base_agent import BaseAgent, np
 from agents.FundamentalAgent import FundamentalAgent
 from agents.PredictionMarketAgent import PredictionMarketAgent
 from agents.OnChainAgent import OnChainAgent
 from agents.RiskPolicyAgent import RiskPolicyAgent
 from agents.trend_follower import TrendFollowerAgent
+from llm_cache import LLMCache, prompt_fingerprint
 from market_data.multi_source_feed import MultiSourceDataFeed
+from research_queue import ResearchQueue, long_lived_process
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Polymarket events checked on every evaluation
+DEFAULT_EVENT_CONFIG = {
+    'recession': 'will-the-us-enter-a-recession-in-2025',
+    'btc_100k': 'will-bitcoin-be-above-100000-on-january-1-2025'
+}
+
+KIMI_BASE_URL = "https://api.moonshot.cn/v1"
+
+# Signals above this confidence get a Kimi research summary
+RESEARCH_MIN_CONFIDENCE = 0.6
+
+# Agents that vote in multi_agent consensus; agents added with register_agent only run on their own
+MULTI_AGENT_VOTERS = ('graham', 'event_driven', 'trend_follower')
+
 
 class Decision(str, Enum):
     BUY = "BUY"
@@ -52,6 +71,15 @@ class StrategyEvaluation:
     final_action: str  # APPROVED, BLOCKED, PENDING
     timestamp: int
     research_summary: Optional[str] = None # Added for Kimi output
+    research_ticket: Optional[str] = None  # ResearchQueue id; the summary lands there later
+
+
+@dataclass
+class StrategyEvaluationFrame:
+    """Column-wise strategy evaluation over a price series (one row per bar)"""
+    decision: Any  # int8 array: 1 BUY, -1 SELL, 0 HOLD
+    confidence: Any  # float64 array
+    approved: Any  # bool array: final_action == 'APPROVED'
 
 
 class StrategyEvaluator:
@@ -60,20 +88,40 @@ class StrategyEvaluator:
     Coordinates multiple agents and applies Kimi K2.5 research layer.
     """
     
-    def __init__(self, use_mock: bool = False, api_key: Optional[str] = None):
-        """Initialize evaluator with data feed and Research LLM"""
-        self.feed = MultiSourceDataFeed(use_mock=use_mock)
+    def __init__(
+        self,
+        use_mock: bool = False,
+        api_key: Optional[str] = None,
+        feed=None,
+        research_cache: Optional[LLMCache] = None
+    ):
+        """
+        Initialize evaluator with data feed and Research LLM.
+        
+        Args:
+            use_mock: Passed to the default MultiSourceDataFeed
+            api_key: Moonshot API key (defaults to MOONSHOT_API_KEY)
+            feed: Anything with get_unified_data(symbol, market_data, event_config),
+                  e.g. a ReplayDataFeed for offline backtests
+            research_cache: Where Kimi summaries are reused across identical
+                            inputs (defaults to memory, plus LLM_CACHE_PATH on disk if set)
+        """
+        self.feed = feed if feed is not None else MultiSourceDataFeed(use_mock=use_mock)
+        self.research_cache = research_cache or LLMCache(path=os.getenv("LLM_CACHE_PATH"))
         
         # Initialize Kimi Client (Moonshot AI)
         self.kimi_client = None
+        self.research: Optional[ResearchQueue] = None  # Summaries are generated off the decision path
         key = api_key or os.getenv("MOONSHOT_API_KEY")
         if key:
             try:
-                self.kimi_client = OpenAI(
-                    api_key=key,
-                    base_url="https://api.moonshot.cn/v1"
-                )
-                logger.info("Kimi K2.5 Research Core initialized.")
+                self.kimi_client = OpenAI(api_key=key, base_url=KIMI_BASE_URL)
+                if long_lived_process():
+                    self.research = ResearchQueue(self._generate_kimi_research)
+                    logger.info("Kimi K2.5 Research Core initialized.")
+                else:
+                    # Tickets would die with the request's isolate (see research_queue)
+                    logger.warning("Deferred Kimi research needs a long-lived process; disabled in this runtime.")
             except Exception as e:
                 logger.error(f"Failed to init Kimi client: {e}")
         else:
@@ -92,7 +140,8 @@ class StrategyEvaluator:
         self,
         strategy_name: str,
         asset: str,
-        market_data: Optional[Dict[str, Any]] = None
+        market_data: Optional[Dict[str, Any]] = None,
+        research: bool = True
     ) -> StrategyEvaluation:
         """
         Evaluate a strategy for a given asset.
@@ -101,6 +150,7 @@ class StrategyEvaluator:
             strategy_name: Name of strategy to evaluate (e.g., 'graham', 'multi_agent')
             asset: Asset symbol (e.g., 'AAPL', 'BTC')
             market_data: Optional market data override
+            research: Queue a Kimi summary for strong signals (backtests pass False)
             
         Returns:
             StrategyEvaluation with decision, confidence, and reasoning
@@ -108,33 +158,297 @@ class StrategyEvaluator:
         logger.info(f"Evaluating {strategy_name} strategy for {asset}")
         
         # Get unified multi-source data
-        try:
-            unified_data = self.feed.get_unified_data(
-                symbol=asset,
-                market_data=market_data or {},
-                event_config={
-                    'recession': 'will-the-us-enter-a-recession-in-2025',
-                    'btc_100k': 'will-bitcoin-be-above-100000-on-january-1-2025'
-                }
-            )
-        except Exception as e:
-            logger.error(f"Failed to get unified data: {e}")
-            unified_data = {}
+        unified_data = self._get_unified_data(asset, market_data or {})
+        return self.evaluate_unified(strategy_name, asset, unified_data, research)
+    
+    async def evaluate_strategy_async(
+        self,
+        strategy_name: str,
+        asset: str,
+        market_data: Optional[Dict[str, Any]] = None
+    ) -> StrategyEvaluation:
+        """
+        evaluate_strategy for async servers: same result, nothing blocks the loop.
+        
+        The source fetches are awaited, so one event loop can have hundreds
+        of evaluations waiting on the network at once. Agents themselves are
+        fast and run inline; research is queued as in evaluate_strategy.
+        """
+        logger.info(f"Evaluating {strategy_name} strategy for {asset}")
         
+        unified_data = await self._get_unified_data_async(asset, market_data or {})
+        return self.evaluate_unified(strategy_name, asset, unified_data)
+    
+    def evaluate_many(
+        self,
+        strategy_name: str,
+        assets: List[str],
+        market_data: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> Dict[str, StrategyEvaluation]:
+        """
+        Evaluate one strategy across many assets.
+        
+        The Polymarket events in DEFAULT_EVENT_CONFIG are the same for every
+        asset, so feeds with get_unified_data_many fetch them once; the
+        per-asset sources are fetched concurrently.
+        
+        Args:
+            strategy_name: Name of strategy to evaluate
+            assets: Asset symbols (duplicates are evaluated once)
+            market_data: Optional {asset: market data override}
+            
+        Returns:
+            {asset: StrategyEvaluation} in the order given
+        """
+        logger.info(f"Evaluating {strategy_name} strategy for {len(assets)} assets")
+        
+        unified = self._get_unified_data_many(assets, market_data or {})
+        return {
+            asset: self.evaluate_unified(strategy_name, asset, data)
+            for asset, data in unified.items()
+        }
+    
+    async def evaluate_many_async(
+        self,
+        strategy_name: str,
+        assets: List[str],
+        market_data: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> Dict[str, StrategyEvaluation]:
+        """evaluate_many for async servers"""
+        logger.info(f"Evaluating {strategy_name} strategy for {len(assets)} assets")
+        
+        unified = await self._get_unified_data_many_async(assets, market_data or {})
+        return {
+            asset: self.evaluate_unified(strategy_name, asset, data)
+            for asset, data in unified.items()
+        }
+    
+    def evaluate_unified(
+        self,
+        strategy_name: str,
+        asset: str,
+        unified_data: Dict[str, Any],
+        research: bool = True
+    ) -> StrategyEvaluation:
+        """
+        Evaluate a strategy on unified data that was already fetched, e.g. one
+        snapshot shared by several strategies.
+        
+        research=False skips queueing a Kimi summary.
+        """
         # Evaluate based on strategy type
         if strategy_name == 'multi_agent':
             return self._evaluate_multi_agent(asset, unified_data)
         elif strategy_name in self.agents:
-            return self._evaluate_single_agent(strategy_name, asset, unified_data)
+            return self._evaluate_single_agent(strategy_name, asset, unified_data, research)
         else:
             # Default: Graham defensive
-            return self._evaluate_single_agent('graham', asset, unified_data)
+            return self._evaluate_single_agent('graham', asset, unified_data, research)
+    
+    def fork(self) -> 'StrategyEvaluator':
+        """
+        Evaluator sharing this one's feed and research client but with its
+        own copies of the agents (same parameters and state), so several
+        strategies can run side by side without sharing price_history.
+        """
+        clone = copy.copy(self)
+        clone.agents = copy.deepcopy(self.agents)
+        return clone
+    
+    def register_agent(self, agent_name: str, agent: BaseAgent) -> BaseAgent:
+        """
+        Make an extra agent available as a strategy and to configure_agent,
+        e.g. for a sweep. It does not join multi_agent (see MULTI_AGENT_VOTERS).
+        """
+        self.agents[agent_name] = agent
+        return agent
+    
+    def configure_agent(self, agent_name: str, **params) -> BaseAgent:
+        """
+        Override tunable parameters on a registered agent.
+        
+        Example:
+            evaluator.configure_agent('graham', pb_threshold=1.2, rsi_threshold=30)
+            
+        Raises:
+            ValueError: Unknown agent or parameter
+        """
+        agent = self.agents.get(agent_name)
+        if agent is None:
+            raise ValueError(f"Unknown agent '{agent_name}'. Available: {sorted(self.agents)}")
+        
+        for param, value in params.items():
+            if param.startswith('_') or not hasattr(agent, param):
+                raise ValueError(f"{type(agent).__name__} has no parameter '{param}'")
+            setattr(agent, param, value)
+        return agent
+    
+    def evaluate_strategy_vectorized(
+        self,
+        strategy_name: str,
+        asset: str,
+        bars: Dict[str, Any],
+        market_data: Optional[Dict[str, Any]] = None
+    ) -> StrategyEvaluationFrame:
+        """
+        Evaluate a strategy over a whole price series at once.
+        
+        Mirrors evaluate_strategy bar by bar, but fetches the unified
+        snapshot once and asks each agent for a SignalFrame. Kimi research
+        is skipped since nothing reads it during a replay. Feeds that serve
+        a different snapshot per bar (per_bar_snapshots) cannot be
+        broadcast this way; use evaluate_strategy per bar for them.
+        
+        Args:
+            strategy_name: Name of strategy to evaluate
+            asset: Asset symbol
+            bars: Dict of NumPy columns ('price', 'volume', 'open', 'high', 'low')
+            market_data: Bar used to fetch the unified snapshot (defaults to the first bar)
+            
+        Returns:
+            StrategyEvaluationFrame with one row per bar
+            
+        Raises:
+            NotImplementedError: If an agent has no vectorized signal path
+            ValueError: If the feed serves per-bar snapshots
+        """
+        logger.info(f"Evaluating {strategy_name} strategy for {asset} over {len(bars['price'])} bars")
+        
+        if self.per_bar_snapshots:
+            raise ValueError(
+                f"{type(self.feed).__name__} serves a snapshot per bar; the vectorized path "
+                "would broadcast the first one over the whole series"
+            )
+        
+        if market_data is None:
+            market_data = {
+                name: float(column[0]) for name, column in bars.items()
+                if name in ('price', 'volume', 'open', 'high', 'low') and len(column)
+            }
+        agent_bars = dict(bars, unified=self._get_unified_data(asset, market_data))
+        
+        if strategy_name == 'multi_agent':
+            return self._evaluate_multi_agent_vectorized(agent_bars)
+        
+        agent = self.agents.get(strategy_name) or self.agents['graham']
+        frame = agent.generate_signals(agent_bars)
+        has_signal = frame.has_signal
+        confidence = np.where(has_signal, frame.confidence, 0.0)
+        return StrategyEvaluationFrame(
+            decision=np.where(has_signal, frame.action, 0).astype(np.int8),
+            confidence=confidence,
+            approved=has_signal & (confidence > 0.7)
+        )
+    
+    def _voters(self) -> List[Tuple[str, BaseAgent]]:
+        """multi_agent's voting agents, in MULTI_AGENT_VOTERS order"""
+        return [(name, self.agents[name]) for name in MULTI_AGENT_VOTERS if name in self.agents]
+    
+    @property
+    def per_bar_snapshots(self) -> bool:
+        """Whether the feed's unified data changes from bar to bar (ReplayDataFeed, AsOfDataFeed)"""
+        return bool(getattr(self.feed, 'snapshot_per_bar', False))
+    
+    def _evaluate_multi_agent_vectorized(self, bars: Dict[str, Any]) -> StrategyEvaluationFrame:
+        """Confidence-weighted vote across agents, as in _evaluate_multi_agent"""
+        n = len(bars['price'])
+        signal_count = np.zeros(n)
+        scores = {1: np.zeros(n), -1: np.zeros(n), 0: np.zeros(n)}
+        
+        for _, agent in self._voters():
+            frame = agent.generate_signals(bars)
+            has_signal = frame.has_signal
+            signal_count += has_signal
+            for action, score in scores.items():
+                score += np.where(has_signal & (frame.action == action), frame.confidence, 0.0)
+        
+        buy_score, sell_score, hold_score = scores[1], scores[-1], scores[0]
+        buy = (buy_score > sell_score) & (buy_score > hold_score)
+        sell = (sell_score > buy_score) & (sell_score > hold_score)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            confidence = np.where(buy, buy_score, np.where(sell, sell_score, hold_score)) / signal_count
+        confidence = np.where(signal_count > 0, confidence, 0.0)
+        
+        return StrategyEvaluationFrame(
+            decision=np.where(buy, 1, np.where(sell, -1, 0)).astype(np.int8),
+            confidence=confidence,
+            approved=(signal_count > 0) & (confidence > 0.65)
+        )
+    
+    def _get_unified_data(self, asset: str, market_data: Dict[str, Any]) -> Dict:
+        """Fetch unified multi-source data, falling back to an empty view"""
+        try:
+            return self.feed.get_unified_data(
+                symbol=asset,
+                market_data=market_data,
+                event_config=DEFAULT_EVENT_CONFIG
+            )
+        except Exception as e:
+            logger.error(f"Failed to get unified data: {e}")
+            return {}
+    
+    def _get_unified_data_many(self, assets: List[str], market_data: Dict[str, Dict]) -> Dict[str, Dict]:
+        """_get_unified_data for many assets, sharing asset-independent fetches where the feed can"""
+        assets = list(dict.fromkeys(assets))
+        fetch_many = getattr(self.feed, 'get_unified_data_many', None)
+        if fetch_many is None:
+            return {asset: self._get_unified_data(asset, market_data.get(asset, {})) for asset in assets}
+        try:
+            return fetch_many(symbols=assets, market_data=market_data, event_config=DEFAULT_EVENT_CONFIG)
+        except Exception as e:
+            logger.error(f"Failed to get unified data: {e}")
+            return {asset: {} for asset in assets}
+    
+    async def _get_unified_data_many_async(
+        self,
+        assets: List[str],
+        market_data: Dict[str, Dict]
+    ) -> Dict[str, Dict]:
+        """_get_unified_data_many without blocking the event loop"""
+        assets = list(dict.fromkeys(assets))
+        fetch_many = getattr(self.feed, 'get_unified_data_many_async', None)
+        if fetch_many is None:
+            results = await asyncio.gather(*(
+                self._get_unified_data_async(asset, market_data.get(asset, {})) for asset in assets
+            ))
+            return dict(zip(assets, results))
+        try:
+            return await fetch_many(symbols=assets, market_data=market_data, event_config=DEFAULT_EVENT_CONFIG)
+        except Exception as e:
+            logger.error(f"Failed to get unified data: {e}")
+            return {asset: {} for asset in assets}
+    
+    async def _get_unified_data_async(
+        self,
+        asset: str,
+        market_data: Dict[str, Any],
+        event_config: Dict[str, str] = DEFAULT_EVENT_CONFIG
+    ) -> Dict:
+        """_get_unified_data without blocking the event loop"""
+        try:
+            fetch = getattr(self.feed, 'get_unified_data_async', None)
+            if fetch is not None:
+                return await fetch(symbol=asset, market_data=market_data, event_config=event_config)
+            # Feeds without an async path (replay, as-of) run on the loop's executor
+            return await asyncio.get_running_loop().run_in_executor(None, functools.partial(
+                self.feed.get_unified_data,
+                symbol=asset, market_data=market_data, event_config=event_config
+            ))
+        except Exception as e:
+            logger.error(f"Failed to get unified data: {e}")
+            return {}
+    
+    def _agent_input(self, unified_data: Dict) -> Dict:
+        """Agent payload: bar fields for price-driven agents plus the unified view"""
+        return {**unified_data.get('market', {}), 'unified': unified_data}
     
     def _evaluate_single_agent(
         self,
         agent_name: str,
         asset: str,
-        unified_data: Dict
+        unified_data: Dict,
+        research: bool = True
     ) -> StrategyEvaluation:
         """Evaluate using a single agent"""
         agent = self.agents.get(agent_name)
@@ -143,7 +457,7 @@ class StrategyEvaluator:
             agent = self.agents['graham']
         
         # Generate signal from agent
-        signal = agent.generate_signal({'unified': unified_data})
+        signal = agent.generate_signal(self._agent_input(unified_data))
         
         if not signal:
             return StrategyEvaluation(
@@ -158,13 +472,10 @@ class StrategyEvaluator:
         # Convert signal to evaluation
         triggers = self._extract_triggers_from_signal(signal, unified_data)
         
-        # Kimi K2.5 Research Layer
-        research_summary = None
-        if self.kimi_client and signal.confidence > 0.6:
-            # Only burn tokens on high-conviction signals
-            research_summary = self._generate_kimi_research(
-                asset, signal.action, unified_data
-            )
+        # Kimi K2.5 Research Layer: queued, never awaited here
+        research_ticket = None
+        if research and self.research and self._wants_research(agent_name, signal.confidence):
+            research_ticket = self.research.submit(asset, signal.action, unified_data)
         
         return StrategyEvaluation(
             decision=Decision(signal.action),
@@ -173,30 +484,56 @@ class StrategyEvaluator:
             reasoning=signal.metadata.get('reasoning', {}),
             final_action='APPROVED' if signal.confidence > 0.7 else 'PENDING',
             timestamp=int(signal.timestamp),
-            research_summary=research_summary
+            research_ticket=research_ticket
         )
 
+    def _wants_research(self, strategy_name: str, confidence: float) -> bool:
+        """Only burn tokens on high-conviction single-agent signals"""
+        return strategy_name != 'multi_agent' and confidence > RESEARCH_MIN_CONFIDENCE
+    
+    def _research_request(self, asset: str, decision: str, data: Dict) -> Dict[str, Any]:
+        """Kimi chat completion arguments for a research summary"""
+        # Construct a data-dense prompt
+        context = f"Asset: {asset}\nDecision: {decision}\n"
+        context += f"Fundamentals: {data.get('fundamentals', {})}\n"
+        context += f"Prediction Markets: {data.get('events', {})}\n"
+        context += f"On-Chain: {data.get('onchain', {})}\n"
+        return {
+            'model': "moonshot-v1-8k",
+            'messages': [
+                {"role": "system", "content": "You are a specialized financial analyst. Summarize the provided data points into a concise 2-sentence rationale for the trade decision."},
+                {"role": "user", "content": context}
+            ],
+            'temperature': 0.3
+        }
+    
+    def _research_key(self, asset: str, decision: str, data: Dict, request: Dict[str, Any]) -> str:
+        """Cache key: the data behind the prompt, not its text (see llm_cache)"""
+        return prompt_fingerprint(
+            request['model'], request['temperature'],
+            system=request['messages'][0]['content'],
+            asset=asset,
+            decision=decision,
+            fundamentals=data.get('fundamentals', {}),
+            events=data.get('events', {}),
+            onchain=data.get('onchain', {})
+        )
+    
     def _generate_kimi_research(self, asset: str, decision: str, data: Dict) -> str:
-        """Call Kimi K2.5 to generate a research summary."""
+        """Call Kimi K2.5 to generate a research summary (cached on unchanged inputs)."""
+        request = self._research_request(asset, decision, data)
+        key = self._research_key(asset, decision, data, request)
+        cached = self.research_cache.get(key)
+        if cached is not None:
+            return cached
         try:
-            # Construct a data-dense prompt
-            context = f"Asset: {asset}\nDecision: {decision}\n"
-            context += f"Fundamentals: {data.get('fundamentals', {})}\n"
-            context += f"Prediction Markets: {data.get('events', {})}\n"
-            context += f"On-Chain: {data.get('onchain', {})}\n"
-            
-            completion = self.kimi_client.chat.completions.create(
-                model="moonshot-v1-8k",
-                messages=[
-                    {"role": "system", "content": "You are a specialized financial analyst. Summarize the provided data points into a concise 2-sentence rationale for the trade decision."},
-                    {"role": "user", "content": context}
-                ],
-                temperature=0.3
-            )
-            return completion.choices[0].message.content
+            completion = self.kimi_client.chat.completions.create(**request)
+            summary = completion.choices[0].message.content
         except Exception as e:
             logger.error(f"Kimi research failed: {e}")
             return "Research unavailable"
+        self.research_cache.put(key, summary)
+        return summary
     
     def _evaluate_multi_agent(
         self,
@@ -206,9 +543,9 @@ class StrategyEvaluator:
         """Evaluate using consensus from multiple agents"""
         signals = []
         
-        for agent_name, agent in self.agents.items():
+        for agent_name, agent in self._voters():
             try:
-                signal = agent.generate_signal({'unified': unified_data})
+                signal = agent.generate_signal(self._agent_input(unified_data))
                 if signal:
                     signals.append((agent_name, signal))
             except Exception as e:
@@ -312,27 +649,54 @@ class StrategyEvaluator:
                 event_config={'all': 'true'} # Broad event fetch
             )
             
-            # Add Kimi Analysis if available (Optional for just a snapshot to save tokens? 
-            # Or maybe we want it. Let's include it if key is present.)
-            ai_summary = None
-            if self.kimi_client:
-                 try:
-                    ai_summary = self._generate_kimi_research(asset, "ANALYSIS", unified)
-                 except:
-                    pass
-
-            return {
-                'timestamp': unified['timestamp'],
-                'asset': asset,
-                'fundamentals': unified.get('fundamentals', {}),
-                'prediction_markets': unified.get('events', {}),
-                'onchain': unified.get('onchain', {}),
-                'technicals': unified.get('technical', {}),
-                'ai_analysis': ai_summary
-            }
+            return self._snapshot(asset, unified, self._queue_analysis(asset, unified))
         except Exception as e:
             logger.error(f"Snapshot failed: {e}")
             return {'error': str(e)}
+    
+    async def get_research_snapshot_async(self, asset: str) -> Dict[str, Any]:
+        """get_research_snapshot without blocking the event loop"""
+        try:
+            unified = await self._get_unified_data_async(asset, {}, event_config={'all': 'true'})
+            return self._snapshot(asset, unified, self._queue_analysis(asset, unified))
+        except Exception as e:
+            logger.error(f"Snapshot failed: {e}")
+            return {'error': str(e)}
+    
+    def get_research(self, ticket_id: str) -> Optional[Dict[str, Any]]:
+        """Research ticket as a dict (status, summary, ...); None if unknown"""
+        ticket = self.research.get(ticket_id) if self.research else None
+        return ticket.to_dict() if ticket else None
+    
+    async def wait_for_research(self, ticket_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """get_research, long-polling up to timeout seconds for a pending ticket"""
+        if self.research is None:
+            return None
+        try:
+            await self.research.wait_async(ticket_id, timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.get_research(ticket_id)
+    
+    def _queue_analysis(self, asset: str, unified: Dict) -> Optional[str]:
+        """Ticket for a snapshot's Kimi analysis, if research is enabled"""
+        if self.research is None or not unified:
+            return None
+        return self.research.submit(asset, "ANALYSIS", unified)
+    
+    @staticmethod
+    def _snapshot(asset: str, unified: Dict, research_ticket: Optional[str]) -> Dict[str, Any]:
+        """ai_analysis arrives later under research_ticket (see get_research)"""
+        return {
+            'timestamp': unified['timestamp'],
+            'asset': asset,
+            'fundamentals': unified.get('fundamentals', {}),
+            'prediction_markets': unified.get('events', {}),
+            'onchain': unified.get('onchain', {}),
+            'technicals': unified.get('technical', {}),
+            'ai_analysis': None,
+            'research_ticket': research_ticket
+        }
 
 # Singleton instance for reuse
 _evaluator_instance: Optional[StrategyEvaluator] = None
@@ -0,0 +1,256 @@
+"""
+Successive-halving search over BacktestEngine.
+
+Every candidate is first backtested on a short, recent slice of the bar
+series. Only the best 1/eta of each rung is promoted to a slice eta times
+longer, up to the full history, so most of the compute goes to parameter
+sets that already look good. Promotion is asynchronous (ASHA): a candidate
+moves up as soon as it ranks in the top 1/eta of the results its rung has
+so far, which keeps every worker busy instead of waiting for a rung to
+finish.
+"""
+import logging
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from backtest_engine import BacktestEngine
+from backtest_sweep import _init_worker, _run_one, expand_grid
+from shared_dataset import shared_price_data
+from walk_forward import _date_range
+
+logger = logging.getLogger(__name__)
+
+
+def rung_budgets(n_bars: int, min_bars: int, eta: int = 3) -> List[int]:
+    """
+    Bars per rung: min_bars, min_bars * eta, ... and finally n_bars.
+
+    Example:
+        rung_budgets(1000, 50) -> [50, 150, 450, 1000]
+    """
+    if min_bars <= 0:
+        raise ValueError("min_bars must be positive")
+    if eta < 2:
+        raise ValueError("eta must be at least 2")
+    budgets = []
+    bars = min_bars
+    while bars < n_bars:
+        budgets.append(bars)
+        bars *= eta
+    budgets.append(n_bars)
+    return budgets
+
+
+def _schedule(
+    fn: Callable,
+    next_task: Callable[[], Optional[Tuple[Any, tuple]]],
+    on_done: Callable[[Any, Any], None],
+    initargs: tuple,
+    max_workers: int
+):
+    """
+    Keep up to max_workers calls of fn in flight on _init_worker processes.
+
+    next_task() returns (key, args) for the next call or None when nothing
+    can start yet; on_done(key, result_or_exception) runs in this process as
+    each call finishes, so it may unlock new tasks.
+    """
+    if max_workers == 1:
+        # Same setup as the workers, but never touch this process's log level
+        _init_worker(*initargs[:3], False, *initargs[4:])
+        while True:
+            task = next_task()
+            if task is None:
+                return
+            key, args = task
+            try:
+                on_done(key, fn(*args))
+            except Exception as e:
+                on_done(key, e)
+
+    with shared_price_data(initargs[0]) as shared:
+        initargs = (shared, *initargs[1:])
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=initargs) as pool:
+            running = {}
+            while True:
+                while len(running) < max_workers:
+                    task = next_task()
+                    if task is None:
+                        break
+                    key, args = task
+                    running[pool.submit(fn, *args)] = key
+                if not running:
+                    return
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    key = running.pop(future)
+                    try:
+                        on_done(key, future.result())
+                    except Exception as e:
+                        on_done(key, e)
+
+
+class SuccessiveHalvingOptimizer:
+    """
+    Early-stopping search: weak parameter sets never see the full history.
+
+    Example:
+        sho = SuccessiveHalvingOptimizer(min_bars=250, eta=3,
+                                         feed_factory=partial(ReplayDataFeed.from_path, 'spy.db'))
+        table = sho.run('trend_follower', 'SPY', '2015-01-01', '2024-12-31',
+                        {'fast_period': range(2, 40), 'slow_period': range(20, 220, 8)})
+        best = table[0]  # ran on the full history
+    """
+
+    def __init__(
+        self,
+        min_bars: int,
+        eta: int = 3,
+        initial_capital: float = 100000.0,
+        max_workers: Optional[int] = None,
+        feed_factory: Optional[Callable] = None,
+        vectorized: bool = False,
+        rank_by: str = 'sharpe_ratio',
+        quiet: bool = True,
+        cache_path: Optional[str] = None
+    ):
+        """
+        Args:
+            min_bars: Bars in the first (shortest) rung
+            eta: Promotion ratio; 1/eta of a rung moves to a slice eta times longer
+            initial_capital: Starting capital for every run
+            max_workers: Worker processes (defaults to the CPU count); 1 runs in-process
+            feed_factory: Picklable zero-arg callable building each worker's feed
+            vectorized: Use the vectorized replay for every run
+            rank_by: BacktestResult metric candidates are promoted on, highest first
+            quiet: Drop per-bar INFO logging inside workers
+            cache_path: BacktestCache file shared by the workers
+        """
+        rung_budgets(min_bars + 1, min_bars, eta)  # validate early
+        self.min_bars = min_bars
+        self.eta = eta
+        self.initial_capital = initial_capital
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.feed_factory = feed_factory
+        self.vectorized = vectorized
+        self.rank_by = rank_by
+        self.quiet = quiet
+        self.cache_path = cache_path
+
+    def run(
+        self,
+        strategy_name: str,
+        symbol: str,
+        start_date: str,
+        end_date: str,
+        param_grid: Dict[str, List[Any]],
+        price_data: Optional[List[Dict]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Search every combination in the grid.
+
+        Args:
+            strategy_name: Strategy to test (e.g., 'graham', 'trend_follower')
+            symbol: Asset symbol
+            start_date: Start date (YYYY-MM-DD)
+            end_date: End date (YYYY-MM-DD)
+            param_grid: {param: [values]}; see backtest_sweep.apply_params
+            price_data: Optional historical price data (fetched once if omitted)
+
+        Returns:
+            One row per combination: {'rank', 'params', 'rung', 'bars',
+            <BacktestResult metrics on the last slice it ran>}. Rows are ordered
+            by rung reached, then by rank_by; failed runs come last with an
+            'error' entry instead of metrics. A candidate whose promoted run
+            fails keeps its last successful row, with a 'promotion_error'.
+        """
+        combinations = expand_grid(param_grid)
+        return self.run_combinations(strategy_name, symbol, start_date, end_date, combinations, price_data)
+
+    def run_combinations(
+        self,
+        strategy_name: str,
+        symbol: str,
+        start_date: str,
+        end_date: str,
+        combinations: List[Dict[str, Any]],
+        price_data: Optional[List[Dict]] = None
+    ) -> List[Dict[str, Any]]:
+        """Same as run, for an explicit list of parameter dicts (e.g. random samples)"""
+        if price_data is None:
+            price_data = BacktestEngine(self.initial_capital)._fetch_real_historical_data(
+                symbol, start_date, end_date
+            )
+
+        n_bars = len(price_data)
+        budgets = rung_budgets(n_bars, self.min_bars, self.eta)
+        top = len(budgets) - 1
+        logger.info(
+            f"Successive halving over {len(combinations)} parameter sets for {strategy_name} on {symbol}: "
+            f"rungs of {budgets} bars across {self.max_workers} workers"
+        )
+
+        # Scores per rung: {candidate: score}; failed runs score -inf
+        scores: List[Dict[int, float]] = [{} for _ in budgets]
+        promoted: List[Set[int]] = [set() for _ in budgets]
+        rows: Dict[int, Dict[str, Any]] = {}
+        fresh = iter(range(len(combinations)))
+        spent = [0]
+
+        def task(candidate: int, rung: int) -> Tuple[Tuple[int, int], tuple]:
+            # Slices end at the last bar, so every rung scores the recent regime
+            bar_range = (n_bars - budgets[rung], n_bars)
+            slice_start, slice_end = _date_range(price_data, bar_range)
+            spent[0] += budgets[rung]
+            return (candidate, rung), (
+                strategy_name, symbol, slice_start, slice_end,
+                combinations[candidate], self.vectorized, bar_range
+            )
+
+        def next_task():
+            # Promotions first, highest rung first, so good candidates finish early
+            for rung in reversed(range(top)):
+                done = scores[rung]
+                ranked = sorted(done, key=done.get, reverse=True)[:len(done) // self.eta]
+                for candidate in ranked:
+                    if candidate not in promoted[rung] and done[candidate] != float('-inf'):
+                        promoted[rung].add(candidate)
+                        return task(candidate, rung + 1)
+            candidate = next(fresh, None)
+            return None if candidate is None else task(candidate, 0)
+
+        def on_done(key: Tuple[int, int], outcome):
+            candidate, rung = key
+            row = {'params': combinations[candidate], 'rung': rung, 'bars': budgets[rung]}
+            if isinstance(outcome, Exception):
+                logger.error(f"Run {row['params']} on {budgets[rung]} bars failed: {outcome}")
+                scores[rung][candidate] = float('-inf')
+                if candidate in rows:
+                    # Keep the lower rung's metrics; the candidate just stops there
+                    rows[candidate]['promotion_error'] = str(outcome)
+                    return
+                row['error'] = str(outcome)
+            else:
+                row.update(outcome)
+                scores[rung][candidate] = outcome[self.rank_by]
+            rows[candidate] = row
+
+        initargs = (price_data, self.initial_capital, self.feed_factory, self.quiet, self.cache_path)
+        _schedule(_run_one, next_task, on_done, initargs, self.max_workers)
+
+        full_grid = len(combinations) * n_bars
+        logger.info(
+            f"Successive halving replayed {spent[0]:,} bars vs {full_grid:,} for the full grid "
+            f"({len(scores[top])} sets reached the full history)"
+        )
+
+        ok = sorted(
+            (r for r in rows.values() if 'error' not in r),
+            key=lambda r: (r['rung'], r[self.rank_by]),
+            reverse=True
+        )
+        failed = [r for r in rows.values() if 'error' in r]
+        for rank, row in enumerate(ok + failed, start=1):
+            row['rank'] = rank
+        return ok + failed
@@ -0,0 +1,107 @@
+"""
+Test suite for the as-of join of multi-rate sources.
+"""
+
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from backtest_engine import BacktestEngine
+from market_data.asof_join import AsOfDataFeed, AsOfSource, align_sources, asof_indices, asof_join, unified_sections
+from test_backtest_engine import make_price_data
+
+DAY = 86400
+NS = 1_000_000_000
+
+
+def test_asof_indices_lag_and_max_age():
+    clock = np.arange(10, dtype=np.int64) * NS
+    timestamps = np.array([2, 5, 5, 8], dtype=np.int64) * NS
+
+    assert asof_indices(clock, timestamps).tolist() == [-1, -1, 0, 0, 0, 2, 2, 2, 3, 3]
+    assert asof_indices(clock, timestamps, lag=1).tolist() == [-1, -1, -1, 0, 0, 0, 2, 2, 2, 3]
+    assert asof_indices(clock, timestamps, max_age=1).tolist() == [-1, -1, 0, 0, -1, 2, 2, -1, 3, 3]
+
+
+def test_quarterly_fundamentals_never_leak_ahead():
+    bars = make_price_data(365)
+    quarters = [datetime(2019, 12, 31), datetime(2020, 3, 31), datetime(2020, 6, 30), datetime(2020, 9, 30)]
+    # Unsorted input is fine
+    fundamentals = AsOfSource(
+        'fundamentals', quarters[::-1], {'price_to_book': [4.0, 3.0, 2.0, 1.0]}, lag=45 * DAY
+    )
+    odds = AsOfSource('events', [datetime(2020, 2, 1, 12)], {'recession': [0.4]})
+    table = align_sources(bars, [fundamentals, odds])
+
+    for i, bar in enumerate(bars):
+        known = [q for q in quarters if q + timedelta(days=45) <= bar['timestamp']]
+        pb = table['fundamentals.price_to_book'][i]
+        if known:
+            assert pb == {quarters[0]: 1.0, quarters[1]: 2.0, quarters[2]: 3.0, quarters[3]: 4.0}[known[-1]]
+        else:
+            assert np.isnan(pb)
+
+    row = 50  # 2020-02-20
+    assert unified_sections(table, row) == {
+        'fundamentals': {'price_to_book': 1.0},
+        'events': {'recession': {'yes_probability': 0.4}}
+    }
+    assert 'events' not in unified_sections(table, 30)
+
+
+def test_asof_feed_drives_graham_backtest():
+    bars = make_price_data(120)
+    cheap = AsOfSource('fundamentals', [datetime(2019, 12, 1), datetime(2020, 3, 1)], {
+        'price_to_book': [0.9, 2.5],
+        'price_to_earnings': [9.0, 40.0],
+        'debt_to_equity': [0.2, 0.2]
+    })
+    rsi = AsOfSource('technical', [bar['timestamp'] for bar in bars], {'rsi_14': np.full(120, 28.0)})
+    table = align_sources(bars, [cheap, rsi])
+
+    feed = AsOfDataFeed({'SPY': table})
+    engine = BacktestEngine(feed=feed)
+    unified = feed.get_unified_data('SPY', engine._market_data('SPY', bars[10]))
+    assert unified['fundamentals']['price_to_book'] == 0.9
+    assert unified['technical'] == {'rsi_14': 28.0}
+    assert unified['consensus']['action'] == 'HOLD'
+
+    result = engine.run_backtest('graham', 'SPY', '', '', price_data=bars, use_cache=False)
+    # Cheap until March: the only entry is before the fundamentals turn expensive
+    buys = [t.timestamp for t in result.trades if t.action == 'BUY']
+    assert buys and all(ts < datetime(2020, 3, 1) for ts in buys)
+    assert feed.data_version.startswith('asof:')
+
+
+def test_join_millions_of_rows_quickly():
+    n = 2_000_000
+    clock = np.arange(n, dtype=np.int64) * 60 * NS
+    prices = {'timestamp': clock, 'price': np.ones(n)}
+    rng = np.random.default_rng(0)
+    odds_ts = np.sort(rng.integers(0, n * 60, n // 4)) * NS
+    sources = [
+        AsOfSource('events', odds_ts, {'recession': rng.random(n // 4)}, unit='ns'),
+        AsOfSource('onchain', clock[::1440], {'chain_tvl': rng.random(len(clock[::1440]))}, lag=DAY, unit='ns'),
+    ]
+
+    started = time.perf_counter()
+    table = align_sources(prices, sources)
+    assert time.perf_counter() - started < 1.0
+    assert len(table['events.recession']) == n
+
+
+def test_numeric_timestamps_need_a_unit():
+    clock = np.array([1_699_999_950, 1_700_000_100], dtype=np.int64) * NS
+    values = {'chain_tvl': np.array([1.0])}
+
+    # The same epoch seconds mean the same instant as a list, an array or datetime64
+    for timestamps in ([1_700_000_000], np.array([1_700_000_000]), np.array([1_700_000_000], dtype='datetime64[s]')):
+        unit = None if isinstance(timestamps, np.ndarray) and timestamps.dtype.kind == 'M' else 's'
+        joined = asof_join(clock, AsOfSource('onchain', timestamps, values, unit=unit))
+        assert np.isnan(joined['onchain.chain_tvl'][0]) and joined['onchain.chain_tvl'][1] == 1.0
+
+    for timestamps in ([1_700_000_000], np.array([1_700_000_000])):
+        with pytest.raises(ValueError):
+            asof_join(clock, AsOfSource('onchain', timestamps, values))
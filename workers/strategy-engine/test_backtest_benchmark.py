@@ -0,0 +1,40 @@
+"""
+Test suite for the backtest benchmark harness.
+"""
+
+import json
+
+import numpy as np
+
+from backtest_benchmark import compare_results, default_targets, run_suite, synthetic_chunks, synthetic_ohlcv
+
+
+def test_synthetic_series_is_deterministic_and_chunked():
+    whole = synthetic_ohlcv(2500, seed=3)
+    chunks = list(synthetic_chunks(2500, seed=3, chunk_bars=1000))
+    assert [len(c['price']) for c in chunks] == [1000, 1000, 500]
+    assert np.array_equal(whole['price'], synthetic_ohlcv(2500, seed=3)['price'])
+    assert not np.array_equal(whole['price'], synthetic_ohlcv(2500, seed=4)['price'])
+    assert (np.diff(whole['timestamp']) > 0).all()
+    assert (whole['high'] >= whole['price']).all() and (whole['low'] <= whole['price']).all()
+
+
+def test_suite_measures_every_target():
+    targets = default_targets()
+    assert 'compute_metrics' in targets and 'generate_signal:trend_follower' in targets
+
+    run = run_suite(sizes=(300,), isolate=False)
+    json.dumps(run)  # machine-readable as-is
+    assert {r['target'] for r in run['results']} == set(targets)
+    for row in run['results']:
+        assert 'error' not in row, row
+        assert row['bars_per_sec'] > 0 and row['peak_rss_mb'] > 0
+        assert row['alloc_peak_bytes'] > 0
+
+
+def test_compare_flags_regressions():
+    def run(**speeds):
+        return {'results': [{'target': t, 'n_bars': 1000, 'bars_per_sec': s} for t, s in speeds.items()]}
+
+    rows = compare_results(run(a=100.0, b=100.0, c=100.0), run(a=50.0, b=105.0, c=200.0))
+    assert [(r['target'], r['verdict']) for r in rows] == [('a', 'slower'), ('b', 'same'), ('c', 'faster')]
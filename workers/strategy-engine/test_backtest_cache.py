@@ -0,0 +1,91 @@
+"""
+Test suite for the backtest result cache.
+"""
+
+from backtest_cache import BacktestCache
+from backtest_engine import BacktestEngine
+from backtest_sweep import ParameterSweep
+from test_backtest_engine import CountingFeed, make_price_data
+
+
+def make_cached_engine(cache, feed=None):
+    return BacktestEngine(initial_capital=100000.0, feed=feed or CountingFeed(), cache=cache)
+
+
+def test_repeat_run_is_served_from_cache(tmp_path):
+    cache = BacktestCache(str(tmp_path / 'cache.db'))
+    price_data = make_price_data(200)
+
+    feed = CountingFeed()
+    first = make_cached_engine(cache, feed).run_backtest('trend_follower', 'SPY', '2020-01-01', '2020-07-19', price_data=price_data)
+    calls = feed.calls
+    second = make_cached_engine(cache, feed).run_backtest('trend_follower', 'SPY', '2020-01-01', '2020-07-19', price_data=price_data)
+
+    assert feed.calls == calls
+    assert second.summary() == first.summary()
+    assert second.trades == first.trades
+    assert second.equity_curve == first.equity_curve
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+
+def test_inputs_change_the_key(tmp_path):
+    cache = BacktestCache(str(tmp_path / 'cache.db'))
+    price_data = make_price_data(200)
+    engine = make_cached_engine(cache)
+
+    engine.run_backtest('trend_follower', 'SPY', '2020-01-01', '2020-07-19', price_data=price_data)
+    engine.evaluator.configure_agent('trend_follower', fast_period=3)
+    engine.run_backtest('trend_follower', 'SPY', '2020-01-01', '2020-07-19', price_data=price_data)
+    engine.run_backtest('trend_follower', 'SPY', '2020-01-01', '2020-07-19', price_data=price_data[:-1])
+    engine.run_backtest('trend_follower', 'QQQ', '2020-01-01', '2020-07-19', price_data=price_data)
+
+    assert cache.stats()['misses'] == 4
+    assert cache.stats()['entries'] == 4
+
+
+def test_bypass_and_refresh(tmp_path):
+    cache = BacktestCache(str(tmp_path / 'cache.db'))
+    price_data = make_price_data(100)
+    engine = make_cached_engine(cache)
+
+    engine.run_backtest('trend_follower', 'SPY', '', '', price_data=price_data, use_cache=False)
+    assert cache.stats() == {**cache.stats(), 'hits': 0, 'misses': 0, 'entries': 0}
+
+    engine.run_backtest('trend_follower', 'SPY', '', '', price_data=price_data)
+    engine.run_backtest('trend_follower', 'SPY', '', '', price_data=price_data, refresh=True)
+    assert cache.stats()['hits'] == 0
+    assert cache.stats()['entries'] == 1
+
+
+def test_lru_eviction_by_size(tmp_path):
+    cache = BacktestCache(str(tmp_path / 'cache.db'))
+    price_data = make_price_data(300)
+    engine = make_cached_engine(cache)
+
+    engine.run_backtest('trend_follower', 'SPY', '', '', price_data=price_data)
+    entry_size = cache.stats()['bytes']
+    cache.max_bytes = int(entry_size * 2.5)
+
+    engine.run_backtest('trend_follower', 'AAA', '', '', price_data=price_data)
+    engine.run_backtest('trend_follower', 'SPY', '', '', price_data=price_data)  # touch SPY
+    engine.run_backtest('trend_follower', 'BBB', '', '', price_data=price_data)  # evicts AAA
+
+    assert cache.stats()['evictions'] == 1
+    assert cache.stats()['bytes'] <= cache.max_bytes
+    engine.run_backtest('trend_follower', 'SPY', '', '', price_data=price_data)
+    assert cache.stats()['hits'] == 2
+
+
+def test_sweep_workers_share_cache(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    price_data = make_price_data(200)
+    grid = {'fast_period': [3, 5], 'slow_period': [10, 15]}
+
+    first = ParameterSweep(max_workers=2, feed_factory=CountingFeed, cache_path=path).run(
+        'trend_follower', 'SPY', '', '', grid, price_data=price_data
+    )
+    second = ParameterSweep(max_workers=1, feed_factory=CountingFeed, cache_path=path).run(
+        'trend_follower', 'SPY', '', '', grid, price_data=price_data
+    )
+    assert first == second
+    assert BacktestCache(path).stats()['entries'] == 4
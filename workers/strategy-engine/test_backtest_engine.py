@@ -0,0 +1,388 @@
+"""
+Test suite for the backtest engine.
+Runs offline against a static unified snapshot instead of live sources.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from backtest_engine import BacktestEngine
+from agents.mean_reversion import MeanReversion
+from agents.trend_follower import TrendFollower
+
+
+class StaticFeed:
+    """Stands in for MultiSourceDataFeed with a fixed unified snapshot"""
+
+    def __init__(self, snapshot=None):
+        self.snapshot = snapshot or {}
+
+    def get_unified_data(self, symbol, market_data, event_config=None):
+        return {**self.snapshot, 'symbol': symbol, 'market': market_data}
+
+
+def make_price_data(n_bars, seed=7, volatility=0.04):
+    """Deterministic random walk with periodic gaps so strong crossovers happen"""
+    rng = random.Random(seed)
+    start = datetime(2020, 1, 1)
+    price = 100.0
+    bars = []
+    for i in range(n_bars):
+        price *= 1 + rng.gauss(0, volatility)
+        if i % 20 == 10:
+            price *= 2.0 if (i // 20) % 2 else 0.5
+        price = max(price, 1.0)
+        bars.append({
+            'timestamp': start + timedelta(days=i),
+            'price': price,
+            'volume': rng.uniform(1e5, 1e6),
+            'open': price * 0.99,
+            'high': price * 1.01,
+            'low': price * 0.98
+        })
+    return bars
+
+
+def make_engine(snapshot=None):
+    engine = BacktestEngine(initial_capital=100000.0)
+    engine.evaluator.feed = StaticFeed(snapshot)
+    return engine
+
+
+# Fundamentals that pass the Graham value screen with no macro risk
+GRAHAM_BUY_SNAPSHOT = {
+    'fundamentals': {
+        'source': 'yahoo_finance',
+        'price_to_book': 0.9,
+        'price_to_earnings': 9.0,
+        'debt_to_equity': 0.2
+    },
+    'events': {},
+    'technical': {'rsi_14': 28.0},
+    'conflicts': [],
+    'consensus': {'action': 'BUY', 'sources_count': 2}
+}
+
+
+def assert_same_result(loop, vectorized):
+    assert vectorized.total_return == loop.total_return
+    assert vectorized.max_drawdown == loop.max_drawdown
+    assert vectorized.sharpe_ratio == pytest.approx(loop.sharpe_ratio, abs=0.01)
+    assert vectorized.win_rate == loop.win_rate
+    assert vectorized.total_trades == loop.total_trades
+    assert vectorized.winning_trades == loop.winning_trades
+    assert vectorized.losing_trades == loop.losing_trades
+    assert vectorized.avg_win == pytest.approx(loop.avg_win, abs=0.01)
+    assert vectorized.avg_loss == pytest.approx(loop.avg_loss, abs=0.01)
+
+    assert [(t.timestamp, t.action) for t in vectorized.trades] == \
+        [(t.timestamp, t.action) for t in loop.trades]
+    for v, l in zip(vectorized.trades, loop.trades):
+        assert v.price == l.price
+        assert v.quantity == pytest.approx(l.quantity, rel=1e-9)
+        assert v.pnl == pytest.approx(l.pnl, rel=1e-9, abs=1e-6)
+
+    assert [ts for ts, _ in vectorized.equity_curve] == [ts for ts, _ in loop.equity_curve]
+    assert [eq for _, eq in vectorized.equity_curve] == \
+        pytest.approx([eq for _, eq in loop.equity_curve], rel=1e-9)
+
+
+@pytest.mark.parametrize('strategy_name, snapshot', [
+    ('trend_follower', None),
+    ('graham', GRAHAM_BUY_SNAPSHOT),
+    ('multi_agent', GRAHAM_BUY_SNAPSHOT),
+    ('multi_agent', None),
+])
+def test_vectorized_matches_loop(strategy_name, snapshot):
+    """Vectorized replay reproduces the per-bar loop's BacktestResult"""
+    price_data = make_price_data(600)
+
+    loop = make_engine(snapshot).run_backtest(
+        strategy_name, 'SPY', '2020-01-01', '2021-08-23', price_data=price_data
+    )
+    vectorized = make_engine(snapshot).run_backtest(
+        strategy_name, 'SPY', '2020-01-01', '2021-08-23', price_data=price_data, vectorized=True
+    )
+
+    if strategy_name == 'trend_follower':
+        assert loop.total_trades >= 2
+    assert_same_result(loop, vectorized)
+
+
+class HalfwayFeed(StaticFeed):
+    """Per-bar feed: no fundamentals until `switch`, then the Graham buy snapshot"""
+
+    snapshot_per_bar = True
+
+    def __init__(self, switch):
+        super().__init__(GRAHAM_BUY_SNAPSHOT)
+        self.switch = switch
+
+    def get_unified_data(self, symbol, market_data, event_config=None):
+        if market_data['timestamp'] < self.switch:
+            return {'symbol': symbol, 'market': market_data}
+        return super().get_unified_data(symbol, market_data, event_config)
+
+
+def test_vectorized_falls_back_to_loop_for_per_bar_feeds():
+    price_data = make_price_data(300)
+    switch = price_data[150]['timestamp'].timestamp()
+
+    def run(vectorized):
+        engine = BacktestEngine(initial_capital=100000.0)
+        engine.evaluator.feed = HalfwayFeed(switch)
+        return engine.run_backtest(
+            'graham', 'SPY', '2020-01-01', '2020-10-27', price_data=price_data, vectorized=vectorized
+        )
+
+    loop = run(False)
+    assert loop.total_trades > 0
+    assert_same_result(loop, run(True))
+
+    engine = BacktestEngine(initial_capital=100000.0)
+    engine.evaluator.feed = HalfwayFeed(switch)
+    with pytest.raises(ValueError):
+        engine.evaluator.evaluate_strategy_vectorized('graham', 'SPY', {'price': [1.0]})
+
+
+@pytest.mark.parametrize('agent_factory', [
+    lambda: TrendFollower(fast_period=3, slow_period=12),
+    lambda: MeanReversion(window=15, num_std=1.5),
+])
+def test_generate_signals_matches_generate_signal(agent_factory):
+    """SignalFrame rows equal the signals a fresh agent emits bar by bar"""
+    import numpy as np
+
+    price_data = make_price_data(400, seed=11)
+    prices = np.array([bar['price'] for bar in price_data])
+    frame = agent_factory().generate_signals({'price': prices})
+
+    agent = agent_factory()
+    for i, bar in enumerate(price_data):
+        signal = agent.generate_signal(bar)
+        if signal is None:
+            assert np.isnan(frame.confidence[i])
+        else:
+            assert frame.action[i] == {'BUY': 1, 'SELL': -1, 'HOLD': 0}[signal.action]
+            assert frame.confidence[i] == signal.confidence
+
+
+def test_vectorized_without_trades():
+    """A flat series yields the empty-metrics result"""
+    price_data = [
+        {'timestamp': datetime(2021, 1, 1) + timedelta(days=i), 'price': 50.0}
+        for i in range(100)
+    ]
+    result = make_engine().run_backtest(
+        'trend_follower', 'SPY', '2021-01-01', '2021-04-10', price_data=price_data, vectorized=True
+    )
+    assert result.total_trades == 0
+    assert result.trades == []
+    assert [eq for _, eq in result.equity_curve] == [100000.0] * 100
+
+
+class CountingFeed(StaticFeed):
+    """StaticFeed that counts upstream fetches"""
+
+    def __init__(self, snapshot=None):
+        super().__init__(snapshot)
+        self.calls = 0
+
+    def get_unified_data(self, symbol, market_data, event_config=None):
+        self.calls += 1
+        return {'timestamp': datetime.now().isoformat(),
+                **super().get_unified_data(symbol, market_data, event_config)}
+
+
+def test_recorded_snapshots_replay_offline(tmp_path):
+    """A replayed run matches the recorded one without touching the upstream feed"""
+    from market_data.snapshot_store import ReplayDataFeed, SnapshotRecorder, SnapshotStore
+
+    price_data = make_price_data(300)
+    store = SnapshotStore(str(tmp_path / 'snapshots.db'))
+    upstream = CountingFeed(GRAHAM_BUY_SNAPSHOT)
+
+    recorded = BacktestEngine(feed=SnapshotRecorder(store, feed=upstream)).run_backtest(
+        'multi_agent', 'SPY', '2020-01-01', '2020-10-27', price_data=price_data
+    )
+    assert upstream.calls == 300
+    assert store.count('SPY') == 300
+
+    replayed = BacktestEngine(feed=ReplayDataFeed(SnapshotStore(store.path))).run_backtest(
+        'multi_agent', 'SPY', '2020-01-01', '2020-10-27', price_data=price_data
+    )
+    assert upstream.calls == 300
+    assert replayed == recorded
+
+
+def test_replay_uses_latest_snapshot_at_or_before_bar(tmp_path):
+    from market_data.snapshot_store import ReplayDataFeed, SnapshotStore
+
+    store = SnapshotStore(str(tmp_path / 'snapshots.db'))
+    store.put_many('BTC', [
+        (datetime(2024, 1, 1), {'events': {'recession': {'yes_probability': 0.1}}}),
+        (datetime(2024, 1, 3), {'events': {'recession': {'yes_probability': 0.4}}}),
+    ])
+    feed = ReplayDataFeed(store)
+
+    def odds(day):
+        bar = {'timestamp': datetime(2024, 1, day).replace(hour=12), 'price': 1.0}
+        return feed.get_unified_data('BTC', bar)['events']['recession']['yes_probability']
+
+    assert odds(2) == 0.1
+    assert odds(3) == 0.4
+    with pytest.raises(KeyError):
+        feed.get_unified_data('BTC', {'timestamp': datetime(2023, 12, 31), 'price': 1.0})
+
+
+def test_columnar_results_and_metrics():
+    """Trades and equity are columnar; extra metrics agree with a plain-Python pass"""
+    from backtest_columns import EquityCurve, TradeLog, _compute_metrics_pure, compute_metrics
+
+    price_data = make_price_data(600)
+    result = make_engine().run_backtest(
+        'trend_follower', 'SPY', '2020-01-01', '2021-08-23', price_data=price_data
+    )
+
+    assert isinstance(result.trades, TradeLog) and isinstance(result.equity_curve, EquityCurve)
+    assert result.equity_curve.values.dtype == 'float64'
+    assert result.equity_curve.nbytes == 16 * len(price_data)
+    assert [ts for ts, _ in result.equity_curve] == [bar['timestamp'] for bar in price_data]
+    assert result.trades[0].action == 'BUY'
+
+    metrics = compute_metrics(result.trades, result.equity_curve, 100000.0)
+    assert metrics == _compute_metrics_pure(result.trades, result.equity_curve, 100000.0)
+    assert 0 < result.exposure < 1
+    assert result.max_drawdown_duration > 0
+    assert result.sortino_ratio != 0.0
+
+
+class SimulatedCrash(BaseException):
+    """Like a pod eviction: not an Exception, so nothing on the way swallows it"""
+
+
+class CrashingFeed(StaticFeed):
+    """StaticFeed that dies after a fixed number of bars"""
+
+    def __init__(self, crash_after, snapshot=None):
+        super().__init__(snapshot)
+        self.remaining = crash_after
+
+    def get_unified_data(self, symbol, market_data, event_config=None):
+        self.remaining -= 1
+        if self.remaining < 0:
+            raise SimulatedCrash()
+        return super().get_unified_data(symbol, market_data, event_config)
+
+
+@pytest.mark.parametrize('strategy_name', ['trend_follower', 'multi_agent'])
+def test_resume_from_checkpoint_matches_uninterrupted_run(tmp_path, strategy_name):
+    from backtest_checkpoint import BacktestCheckpoint
+
+    price_data = make_price_data(400)
+    expected = make_engine().run_backtest(strategy_name, 'SPY', '', '', price_data=price_data)
+
+    checkpoint = BacktestCheckpoint(str(tmp_path / 'run.ckpt'), every_bars=50)
+    crashing = BacktestEngine(initial_capital=100000.0, feed=CrashingFeed(crash_after=275))
+    with pytest.raises(SimulatedCrash):
+        crashing.run_backtest(strategy_name, 'SPY', '', '', price_data=price_data, checkpoint=checkpoint)
+    assert (tmp_path / 'run.ckpt').exists()
+
+    # Bars 0-249 come from the checkpoint, so the resumed feed only sees 150
+    feed = CrashingFeed(crash_after=150)
+    resumed = BacktestEngine(initial_capital=100000.0, feed=feed).run_backtest(
+        strategy_name, 'SPY', '', '', price_data=price_data, checkpoint=checkpoint
+    )
+
+    assert feed.remaining == 0
+    assert resumed.summary() == expected.summary()
+    assert resumed.trades == expected.trades
+    assert resumed.equity_curve == expected.equity_curve
+    assert not (tmp_path / 'run.ckpt').exists()
+
+
+def test_checkpoints_append_only_new_rows(tmp_path):
+    from backtest_checkpoint import BacktestCheckpoint
+
+    price_data = make_price_data(400)
+    expected = make_engine().run_backtest('trend_follower', 'SPY', '', '', price_data=price_data)
+
+    checkpoint = BacktestCheckpoint(str(tmp_path / 'run.ckpt'), every_bars=50)
+    crashing = BacktestEngine(initial_capital=100000.0, feed=CrashingFeed(crash_after=275))
+    with pytest.raises(SimulatedCrash):
+        crashing.run_backtest('trend_follower', 'SPY', '', '', price_data=price_data, checkpoint=checkpoint)
+
+    # Five saves: each equity row and settled trade is on disk once, plus a 16-byte block header per save
+    saved = BacktestCheckpoint(str(tmp_path / 'run.ckpt')).load(crashing._cache_key(
+        'trend_follower', 'SPY', '', '', price_data, False
+    ))
+    assert len(saved['equity_curve']) == 250
+    settled = len(saved['trades']) - (saved['position'] > 0)
+    assert (tmp_path / 'run.ckpt.log').stat().st_size == 5 * 16 + 250 * 16 + settled * 33
+    assert (tmp_path / 'run.ckpt').stat().st_size < 4096
+
+    # Rows written after the last state (a crash mid-save) are ignored
+    with open(tmp_path / 'run.ckpt.log', 'ab') as f:
+        f.write(b'\xff' * 100)
+    resumed = BacktestEngine(initial_capital=100000.0, feed=CrashingFeed(crash_after=150)).run_backtest(
+        'trend_follower', 'SPY', '', '', price_data=price_data, checkpoint=checkpoint
+    )
+    assert resumed.summary() == expected.summary()
+    assert resumed.trades == expected.trades
+    assert resumed.equity_curve == expected.equity_curve
+    assert not (tmp_path / 'run.ckpt.log').exists()
+
+
+def test_resumed_progress_reports_count_exposure_before_the_checkpoint(tmp_path):
+    from backtest_checkpoint import BacktestCheckpoint
+
+    price_data = make_price_data(400)
+    expected = []
+    make_engine().run_backtest(
+        'trend_follower', 'SPY', '', '', price_data=price_data, on_progress=expected.append, progress_every=100
+    )
+    assert 0 < expected[-1]['exposure'] < 1
+
+    checkpoint = BacktestCheckpoint(str(tmp_path / 'run.ckpt'), every_bars=50)
+    crashing = BacktestEngine(initial_capital=100000.0, feed=CrashingFeed(crash_after=275))
+    with pytest.raises(SimulatedCrash):
+        crashing.run_backtest('trend_follower', 'SPY', '', '', price_data=price_data, checkpoint=checkpoint)
+
+    frames = []
+    BacktestEngine(initial_capital=100000.0, feed=CrashingFeed(crash_after=150)).run_backtest(
+        'trend_follower', 'SPY', '', '', price_data=price_data, checkpoint=checkpoint,
+        on_progress=frames.append, progress_every=100
+    )
+    assert frames == expected[2:]
+
+
+def test_checkpoint_from_another_run_is_rejected(tmp_path):
+    from backtest_checkpoint import BacktestCheckpoint
+
+    checkpoint = BacktestCheckpoint(str(tmp_path / 'run.ckpt'), every_bars=10)
+    engine = BacktestEngine(initial_capital=100000.0, feed=CrashingFeed(crash_after=25))
+    with pytest.raises(SimulatedCrash):
+        engine.run_backtest('trend_follower', 'SPY', '', '', price_data=make_price_data(100), checkpoint=checkpoint)
+
+    with pytest.raises(ValueError, match='different backtest'):
+        make_engine().run_backtest('trend_follower', 'QQQ', '', '', price_data=make_price_data(100), checkpoint=checkpoint)
+
+
+def test_run_backtests_shares_one_data_pass():
+    strategies = ['graham', 'event_driven', 'trend_follower', 'multi_agent']
+    price_data = make_price_data(200)
+
+    feed = CountingFeed(GRAHAM_BUY_SNAPSHOT)
+    results = BacktestEngine(initial_capital=100000.0, feed=feed).run_backtests(
+        strategies, 'SPY', '', '', price_data=price_data
+    )
+
+    assert feed.calls == len(price_data)
+    assert list(results) == strategies
+    for name in strategies:
+        expected = make_engine(GRAHAM_BUY_SNAPSHOT).run_backtest(name, 'SPY', '', '', price_data=price_data)
+        assert results[name].summary() == expected.summary()
+        assert results[name].trades == expected.trades
+        assert results[name].equity_curve == expected.equity_curve
@@ -0,0 +1,86 @@
+"""
+Test suite for the downsampled frontend export.
+"""
+
+import json
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from backtest_columns import EquityCurve, to_epoch_ns
+from backtest_engine import BacktestResult
+from backtest_export import (
+    drawdown_series, export_binary, export_json, export_payload, lttb_indices, read_binary
+)
+from test_backtest_engine import make_engine, make_price_data
+
+
+def make_result(n_bars, step=timedelta(minutes=5), seed=3):
+    rng = np.random.default_rng(seed)
+    values = 100000 * np.exp(np.cumsum(rng.normal(0, 0.001, n_bars)))
+    values[n_bars // 3] *= 0.8  # one-bar crash the chart must show
+    start = to_epoch_ns(datetime(2021, 1, 1))
+    timestamps = start + np.arange(n_bars, dtype=np.int64) * int(step.total_seconds() * 1e9)
+    return BacktestResult(
+        strategy='trend_follower', symbol='BTC-USD', start_date='2021-01-01', end_date='2024-01-01',
+        total_return=1.5, max_drawdown=22.0, sharpe_ratio=0.8, win_rate=0.5,
+        total_trades=0, winning_trades=0, losing_trades=0, avg_win=0.0, avg_loss=0.0,
+        equity_curve=EquityCurve(timestamps, values)
+    )
+
+
+def test_lttb_keeps_endpoints_and_extremes():
+    x = np.arange(10_000, dtype=float)
+    y = np.sin(x / 500)
+    y[4321] = 5.0
+    y[7000] = -5.0
+    kept = lttb_indices(x, y, 100)
+
+    assert len(kept) == 100
+    assert kept[0] == 0 and kept[-1] == len(x) - 1
+    assert (np.diff(kept) > 0).all()
+    assert 4321 in kept and 7000 in kept
+
+    assert (lttb_indices(x[:50], y[:50], 100) == np.arange(50)).all()
+
+
+def test_drawdown_is_measured_from_running_peak():
+    drawdown = drawdown_series(np.array([100.0, 120.0, 90.0, 130.0]), initial_capital=100.0)
+    assert np.allclose(drawdown, [0.0, 0.0, -25.0, 0.0])
+
+
+def test_multi_year_intraday_curve_exports_in_a_few_kilobytes(tmp_path):
+    result = make_result(3 * 365 * 288)  # three years of 5-minute bars
+    json_path = tmp_path / 'backtest_results.json'
+    size = export_json(result, str(json_path), points=250)
+    assert size < 30_000
+
+    payload = json.loads(json_path.read_text())
+    assert payload['summary']['maxDrawdown'] == -22.0
+    assert payload['summary']['sourcePoints'] == len(result.equity_curve)
+    assert len(payload['equityCurve']) == len(payload['drawdownCurve']) == 250
+    # The crash bar survives downsampling in both series
+    crash = result.equity_curve[len(result.equity_curve) // 3][0].isoformat(timespec='seconds')
+    assert crash in {p['time'] for p in payload['equityCurve']}
+    assert min(p['value'] for p in payload['drawdownCurve']) <= -20
+
+    bin_path = tmp_path / 'backtest_results.bin'
+    assert export_binary(result, str(bin_path), points=250) < 8_000
+    decoded = read_binary(str(bin_path))
+    ts, values = decoded['equity']
+    assert decoded['header']['summary'] == payload['summary']
+    assert np.allclose(values, [p['value'] for p in payload['equityCurve']], rtol=1e-6)
+    assert ts[0] == to_epoch_ns(datetime(2021, 1, 1)) // 10**6
+
+
+def test_export_of_engine_result_matches_page_format():
+    engine = make_engine()
+    result = engine.run_backtest('trend_follower', 'TEST', '2024-01-01', '2024-12-31',
+                                 price_data=make_price_data(400))
+    payload = export_payload(result, initial_capital=engine.initial_capital, points=100, max_trades=5)
+
+    assert set(payload) == {'summary', 'equityCurve', 'drawdownCurve', 'trades'}
+    assert payload['equityCurve'][0]['time'] == result.equity_curve[0][0].strftime('%Y-%m-%d')
+    assert len(payload['trades']) == min(5, len(result.trades))
+    if payload['trades']:
+        assert set(payload['trades'][0]) == {'date', 'pair', 'side', 'price', 'pnl'}
@@ -0,0 +1,160 @@
+"""
+Test suite for the distributed backtest queue.
+Runs against a throwaway local redis-server. Where none is installed the
+single-process tests fall back to fakeredis; multi-process ones are skipped.
+"""
+
+import shutil
+import socket
+import subprocess
+import time
+
+import pytest
+
+pytest.importorskip('redis')
+
+from backtest_queue import BacktestJob, BacktestQueue, DistributedSweep, QueueWorker, start_workers
+from backtest_sweep import ParameterSweep
+from test_backtest_engine import StaticFeed, make_price_data
+
+GRID = {'fast_period': [3, 5, 8], 'slow_period': [15, 30]}
+
+
+def load_test_prices(symbol, start_date, end_date):
+    return make_price_data(300)
+
+
+@pytest.fixture(scope='module')
+def redis_url():
+    """URL of a local redis-server, or None where none is installed"""
+    server = shutil.which('redis-server')
+    if server is None:
+        yield None
+        return
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    proc = subprocess.Popen(
+        [server, '--port', str(port), '--save', '', '--appendonly', 'no'],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    url = f'redis://127.0.0.1:{port}/0'
+    try:
+        import redis
+        client = redis.Redis.from_url(url)
+        for _ in range(50):
+            try:
+                client.ping()
+                break
+            except redis.ConnectionError:
+                time.sleep(0.1)
+        yield url
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def make_queue(redis_url, name, **kwargs):
+    kwargs = {'lease_seconds': 2.0, 'max_attempts': 2, **kwargs}
+    if redis_url is not None:
+        return BacktestQueue(redis_url, name=name, **kwargs)
+    fakeredis = pytest.importorskip('fakeredis')
+    return BacktestQueue(name=name, client=fakeredis.FakeRedis(), **kwargs)
+
+
+@pytest.fixture
+def queue(redis_url, request):
+    queue = make_queue(redis_url, f'test:{request.node.name}')
+    queue.purge()
+    yield queue
+    queue.purge()
+
+
+@pytest.fixture
+def server_queue(redis_url, queue):
+    """queue, for tests whose workers run in other processes"""
+    if redis_url is None:
+        pytest.skip('redis-server not installed')
+    return queue
+
+
+def test_distributed_sweep_matches_local_sweep(server_queue):
+    queue = server_queue
+    workers = start_workers(
+        queue, 3, idle_timeout=2.0, feed_factory=StaticFeed, price_loader=load_test_prices
+    )
+    table = DistributedSweep(queue, timeout=120).run('trend_follower', 'TEST', '2020-01-01', '2020-12-31', GRID)
+    for process in workers:
+        process.join(timeout=30)
+
+    local = ParameterSweep(max_workers=1, feed_factory=StaticFeed).run(
+        'trend_follower', 'TEST', '2020-01-01', '2020-12-31', GRID, price_data=make_price_data(300)
+    )
+    assert [row['params'] for row in table] == [row['params'] for row in local]
+    assert [row['total_return'] for row in table] == [row['total_return'] for row in local]
+    assert queue.stats()['pending'] == queue.stats()['running'] == 0
+
+
+def test_failing_job_is_retried_then_reported(queue):
+    bad = BacktestJob('trend_follower', 'TEST', '2020-01-01', '2020-12-31', {'no_such_param': 1})
+    queue.submit([bad])
+    worker = QueueWorker(queue, feed_factory=StaticFeed, price_loader=load_test_prices)
+
+    assert worker.run(max_jobs=1) == 1
+    assert queue.job(bad.job_id).attempts == 1
+    assert queue.stats()['pending'] == 1  # back in line for a second attempt
+
+    worker.run(max_jobs=1)
+    outcome = queue.results([bad.job_id])[bad.job_id]
+    assert outcome['attempts'] == 2 and 'error' in outcome
+
+
+def test_job_of_a_dead_worker_is_requeued(queue):
+    job = BacktestJob('trend_follower', 'TEST', '2020-01-01', '2020-12-31', {'fast_period': 5})
+    queue.submit([job])
+    assert queue.claim('crashed-worker', timeout=1).job_id == job.job_id
+    assert queue.requeue_expired() == 0  # lease still valid
+
+    time.sleep(2.2)
+    assert queue.requeue_expired() == 1
+    QueueWorker(queue, feed_factory=StaticFeed, price_loader=load_test_prices).run(max_jobs=1)
+    assert 'ok' in queue.results([job.job_id])[job.job_id]
+
+
+def test_job_finishing_during_orphan_pass_is_not_rerun(redis_url, request, monkeypatch):
+    queue = make_queue(redis_url, f'test:{request.node.name}', max_attempts=1)
+    queue.purge()
+    job = BacktestJob('trend_follower', 'TEST', '2020-01-01', '2020-12-31', {'fast_period': 5})
+    queue.submit([job])
+    # Claimed, but the worker died before leasing it: an orphan in processing
+    queue.client.lmove(queue._key('pending'), queue._key('processing'), 'RIGHT', 'LEFT')
+
+    # The worker (not dead after all) finishes right after the orphan pass reads processing
+    lrange = type(queue.client.pipeline()).lrange
+
+    def lrange_then_finish(pipe, *args):
+        ids = lrange(pipe, *args)
+        monkeypatch.undo()
+        queue.complete(job.job_id, {'total_return': 1.0})
+        return ids
+
+    monkeypatch.setattr(type(queue.client.pipeline()), 'lrange', lrange_then_finish)
+    queue.requeue_expired()
+    assert queue.client.zscore(queue._key('leases'), job.job_id) is None
+
+    assert queue.requeue_expired() == 0
+    assert queue.results([job.job_id])[job.job_id] == {'ok': {'total_return': 1.0}}
+    queue.purge()
+
+
+def test_stray_lease_on_finished_job_is_cleared_not_rerun(queue):
+    job = BacktestJob('trend_follower', 'TEST', '2020-01-01', '2020-12-31', {'fast_period': 5})
+    queue.submit([job])
+    queue.claim('worker', timeout=1)
+    queue.complete(job.job_id, {'total_return': 1.0})
+    queue.client.zadd(queue._key('leases'), {job.job_id: time.time() - 1})
+
+    assert queue.requeue_expired() == 0
+    assert queue.client.zcard(queue._key('leases')) == 0
+    assert queue.stats()['pending'] == 0
+    assert queue.results([job.job_id])[job.job_id] == {'ok': {'total_return': 1.0}}
@@ -0,0 +1,81 @@
+"""
+Test suite for async progress streaming of backtests.
+"""
+
+import asyncio
+
+import pytest
+
+from backtest_stream import stream_backtest
+from test_backtest_engine import make_engine, make_price_data
+
+
+async def collect(engine, strategy_name, price_data, **kwargs):
+    return [frame async for frame in stream_backtest(engine, strategy_name, 'SPY', '', '', price_data, **kwargs)]
+
+
+def test_frames_track_the_run_and_end_with_its_result():
+    price_data = make_price_data(400)
+    expected = make_engine().run_backtest('trend_follower', 'SPY', '', '', price_data=price_data)
+
+    frames = asyncio.run(collect(make_engine(), 'trend_follower', price_data, progress_every=50))
+
+    progress, final = frames[:-1], frames[-1]
+    assert [f.bars_processed for f in progress] == list(range(50, 401, 50))
+    assert all(f.total_bars == 400 and not f.done for f in progress)
+    assert progress[-1].equity == pytest.approx(expected.equity_curve[-1][1], abs=0.01)
+    assert all(f.max_drawdown >= f.drawdown >= 0 for f in progress)
+
+    assert final.done and final.bars_processed == 400
+    assert final.result.summary() == expected.summary()
+    assert final.result.trades == expected.trades
+    assert final.to_dict()['result']['total_return'] == expected.total_return
+
+
+def test_concurrent_streams_share_an_engine_safely():
+    engine = make_engine()
+    price_data = make_price_data(300)
+    expected = {
+        name: make_engine().run_backtest(name, 'SPY', '', '', price_data=price_data).summary()
+        for name in ('trend_follower', 'multi_agent')
+    }
+
+    async def both():
+        return await asyncio.gather(
+            collect(engine, 'trend_follower', price_data),
+            collect(engine, 'multi_agent', price_data),
+            collect(engine, 'trend_follower', price_data),
+        )
+
+    runs = asyncio.run(both())
+    assert [frames[-1].result.summary() for frames in runs] == [
+        expected['trend_follower'], expected['multi_agent'], expected['trend_follower']
+    ]
+
+
+def test_closing_the_stream_cancels_the_replay():
+    price_data = make_price_data(2000)
+
+    async def first_frame():
+        stream = stream_backtest(make_engine(), 'trend_follower', 'SPY', '', '', price_data, progress_every=10)
+        frame = await stream.__anext__()
+        await stream.aclose()
+        return frame
+
+    assert asyncio.run(first_frame()).bars_processed == 10
+
+
+def test_streamed_input_ends_on_the_final_bar():
+    price_data = make_price_data(1500)
+    expected = make_engine().run_backtest('trend_follower', 'SPY', '', '', price_data=price_data)
+    values = [equity for _, equity in expected.equity_curve]
+    peak = max(100000.0, *values)
+
+    chunks = (price_data[i:i + 400] for i in range(0, len(price_data), 400))
+    frames = asyncio.run(collect(make_engine(), 'trend_follower', chunks, progress_every=1000))
+
+    assert [f.bars_processed for f in frames] == [1000, 1500, 1500]
+    final = frames[-1]
+    assert final.done and final.total_bars is None
+    assert final.drawdown == round((peak - values[-1]) / peak * 100, 2)
+    assert final.result.total_return == expected.total_return
@@ -0,0 +1,172 @@
+"""
+Test suite for parameter search on top of the backtest engine.
+"""
+
+import pytest
+
+from backtest_sweep import ParameterSweep, expand_grid
+from walk_forward import WalkForwardOptimizer, split_windows
+from test_backtest_engine import StaticFeed, make_engine, make_price_data
+
+
+GRID = {'fast_period': [3, 5], 'slow_period': [10, 15]}
+
+
+def test_expand_grid():
+    assert expand_grid(GRID) == [
+        {'fast_period': 3, 'slow_period': 10},
+        {'fast_period': 3, 'slow_period': 15},
+        {'fast_period': 5, 'slow_period': 10},
+        {'fast_period': 5, 'slow_period': 15},
+    ]
+
+
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_sweep_matches_individual_runs(max_workers):
+    """Each row equals a direct run_backtest with the same parameters"""
+    price_data = make_price_data(300)
+    table = ParameterSweep(max_workers=max_workers, feed_factory=StaticFeed).run(
+        'trend_follower', 'SPY', '2020-01-01', '2020-10-27', GRID, price_data=price_data
+    )
+
+    assert [row['rank'] for row in table] == [1, 2, 3, 4]
+    sharpes = [row['sharpe_ratio'] for row in table]
+    assert sharpes == sorted(sharpes, reverse=True)
+
+    for row in table:
+        engine = make_engine()
+        engine.evaluator.configure_agent('trend_follower', **row['params'])
+        expected = engine.run_backtest(
+            'trend_follower', 'SPY', '2020-01-01', '2020-10-27', price_data=price_data
+        )
+        assert row['total_return'] == expected.total_return
+        assert row['total_trades'] == expected.total_trades
+
+
+def test_sweep_reports_bad_parameters():
+    table = ParameterSweep(max_workers=1, feed_factory=StaticFeed).run(
+        'multi_agent', 'SPY', '2020-01-01', '2020-10-27',
+        {'mean_reversion.window': [10], 'trend_follower.no_such_param': [1]},
+        price_data=make_price_data(50)
+    )
+    assert 'no_such_param' in table[0]['error']
+
+
+def test_sweep_registers_mean_reversion_without_changing_multi_agent():
+    from agents.mean_reversion import MeanReversion
+    from strategy_evaluator import MULTI_AGENT_VOTERS
+
+    price_data = make_price_data(200)
+    table = ParameterSweep(max_workers=1, feed_factory=StaticFeed).run(
+        'mean_reversion', 'SPY', '', '', {'window': [10, 20]}, price_data=price_data
+    )
+    assert all('error' not in row for row in table)
+    engine = make_engine()
+    engine.evaluator.register_agent('mean_reversion', MeanReversion(window=10))
+    expected = engine.run_backtest('mean_reversion', 'SPY', '', '', price_data=price_data)
+    assert next(row for row in table if row['params'] == {'window': 10})['total_return'] == expected.total_return
+
+    # Live consensus keeps its voters whatever else is registered
+    assert 'mean_reversion' not in make_engine().evaluator.agents
+    assert [name for name, _ in engine.evaluator._voters()] == list(MULTI_AGENT_VOTERS)
+    plain = make_engine().run_backtest('multi_agent', 'SPY', '', '', price_data=price_data)
+    assert engine.run_backtest('multi_agent', 'SPY', '', '', price_data=price_data).summary() == plain.summary()
+
+
+def test_split_windows():
+    assert split_windows(100, 40, 20) == [((0, 40), (40, 60)), ((20, 60), (60, 80)), ((40, 80), (80, 100))]
+    assert split_windows(100, 40, 20, step=30, anchored=True) == [((0, 40), (40, 60)), ((0, 70), (70, 90))]
+    assert split_windows(50, 40, 20) == []
+
+
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_walk_forward_scores_in_sample_winner(max_workers):
+    """Each window's OOS metrics come from the best IS parameters"""
+    price_data = make_price_data(300)
+    result = WalkForwardOptimizer(
+        in_sample_bars=150, out_of_sample_bars=50, max_workers=max_workers, feed_factory=StaticFeed
+    ).run('trend_follower', 'SPY', '2020-01-01', '2020-10-27', GRID, price_data=price_data)
+
+    assert [w.index for w in result.windows] == [0, 1, 2]
+    for window in result.windows:
+        assert window.error is None
+        is_table = ParameterSweep(max_workers=1, feed_factory=StaticFeed).run(
+            'trend_follower', 'SPY', '', '', GRID,
+            price_data=price_data[slice(*window.in_sample)]
+        )
+        assert window.best_params == is_table[0]['params']
+
+        engine = make_engine()
+        engine.evaluator.configure_agent('trend_follower', **window.best_params)
+        expected = engine.run_backtest(
+            'trend_follower', 'SPY', '', '', price_data=price_data[slice(*window.out_of_sample)]
+        )
+        assert window.out_of_sample_metrics['total_return'] == expected.total_return
+
+    assert result.summary()['windows'] == 3
+
+
+def test_rung_budgets():
+    from successive_halving import rung_budgets
+
+    assert rung_budgets(1000, 50) == [50, 150, 450, 1000]
+    assert rung_budgets(300, 100, eta=3) == [100, 300]
+    assert rung_budgets(80, 100) == [80]
+    with pytest.raises(ValueError):
+        rung_budgets(100, 10, eta=1)
+
+
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_successive_halving_promotes_to_full_history(max_workers):
+    from successive_halving import SuccessiveHalvingOptimizer
+
+    grid = {'fast_period': [3, 5, 8], 'slow_period': [10, 15, 20]}
+    price_data = make_price_data(300)
+    table = SuccessiveHalvingOptimizer(
+        min_bars=100, eta=3, max_workers=max_workers, feed_factory=StaticFeed
+    ).run('trend_follower', 'SPY', '', '', grid, price_data=price_data)
+
+    assert len(table) == 9
+    assert [row['rank'] for row in table] == list(range(1, 10))
+    finalists = [row for row in table if row['rung'] == 1]
+    assert 3 <= len(finalists) < 9
+    assert table[:len(finalists)] == finalists
+
+    for row in table:
+        engine = make_engine()
+        engine.evaluator.configure_agent('trend_follower', **row['params'])
+        expected = engine.run_backtest(
+            'trend_follower', 'SPY', '', '', price_data=price_data[-row['bars']:]
+        )
+        assert row['total_return'] == expected.total_return
+
+    # The winner is the best finalist on the full history
+    full_grid = ParameterSweep(max_workers=1, feed_factory=StaticFeed).run(
+        'trend_follower', 'SPY', '', '', grid, price_data=price_data
+    )
+    assert table[0]['sharpe_ratio'] == max(
+        row['sharpe_ratio'] for row in full_grid if row['params'] in [f['params'] for f in finalists]
+    )
+
+
+def test_successive_halving_keeps_rows_whose_promotion_failed(monkeypatch):
+    import successive_halving
+    from backtest_sweep import _run_one
+
+    def fail_on_full_history(*args):
+        if args[-1] == (0, 300):
+            raise RuntimeError("feed unavailable")
+        return _run_one(*args)
+    monkeypatch.setattr(successive_halving, '_run_one', fail_on_full_history)
+
+    grid = {'fast_period': [3, 5, 8], 'slow_period': [10, 15, 20]}
+    table = successive_halving.SuccessiveHalvingOptimizer(
+        min_bars=100, eta=3, max_workers=1, feed_factory=StaticFeed
+    ).run('trend_follower', 'SPY', '', '', grid, price_data=make_price_data(300))
+
+    assert len(table) == 9
+    assert all('error' not in row and row['rung'] == 0 for row in table)
+    promoted = [row for row in table if 'promotion_error' in row]
+    assert promoted and all(row['promotion_error'] == "feed unavailable" for row in promoted)
+    # Failed promotions still rank on their rung-0 metrics
+    assert [row['sharpe_ratio'] for row in table] == sorted((row['sharpe_ratio'] for row in table), reverse=True)
@@ -0,0 +1,193 @@
+"""
+Test suite for the memory-mapped OHLCV history store.
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+import backtest_vectorized
+
+from backtest_columns import epoch_ns_array
+from backtest_engine import BacktestEngine
+from market_data.history_store import HistoryStore
+from test_backtest_engine import StaticFeed, assert_same_result, make_engine, make_price_data
+
+
+def to_columns(price_data):
+    return {
+        'timestamp': epoch_ns_array(bar['timestamp'] for bar in price_data),
+        'open': np.array([bar['open'] for bar in price_data]),
+        'high': np.array([bar['high'] for bar in price_data]),
+        'low': np.array([bar['low'] for bar in price_data]),
+        'close': np.array([bar['price'] for bar in price_data]),
+        'volume': np.array([bar['volume'] for bar in price_data]),
+    }
+
+
+def test_append_and_slice_by_date(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    columns = to_columns(make_price_data(100))
+
+    assert store.append('SPY', {k: v[:60] for k, v in columns.items()}) == 60
+    # Overlapping append only adds the new bars
+    assert store.append('SPY', {k: v[50:] for k, v in columns.items()}) == 40
+    assert store.append('SPY', columns) == 0
+    assert store.count('SPY') == 100
+    assert store.symbols() == ['SPY']
+
+    window = store.load('SPY', '2020-01-11', '2020-01-21')
+    assert len(window['close']) == 10
+    assert (window['close'] == columns['close'][10:20]).all()
+    assert (window['timestamp'] == columns['timestamp'][10:20]).all()
+    # A slice is a view over the mapped file, not a copy
+    assert isinstance(window['close'].base, np.memmap) or isinstance(window['close'], np.memmap)
+    assert not window['close'].flags.writeable
+
+    assert len(store.load('SPY', '2030-01-01')['close']) == 0
+    assert len(store.load('QQQ')['close']) == 0
+
+
+def test_interrupted_append_is_discarded(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    columns = to_columns(make_price_data(30))
+    store.append('SPY', {k: v[:20] for k, v in columns.items()})
+
+    # Crash after writing prices but before the timestamps
+    with open(tmp_path / 'SPY' / 'close.f8', 'ab') as f:
+        f.write(np.zeros(5).tobytes())
+    assert store.count('SPY') == 20
+
+    store.append('SPY', {k: v[20:] for k, v in columns.items()})
+    assert (store.load('SPY')['close'] == columns['close']).all()
+
+
+def test_backtest_on_stored_columns(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    price_data = make_price_data(600)
+    store.append('SPY', to_columns(price_data))
+
+    loop = make_engine().run_backtest('trend_follower', 'SPY', '', '', price_data=price_data)
+    bars = store.load('SPY')
+    vectorized = make_engine().run_backtest('trend_follower', 'SPY', '', '', price_data=bars, vectorized=True)
+    from_columns = make_engine().run_backtest('trend_follower', 'SPY', '', '', price_data=bars)
+
+    assert_same_result(loop, vectorized)
+    assert from_columns.summary() == loop.summary()
+
+
+class FakeYahoo:
+    """Serves get_ohlcv from a fixed series and records requested ranges"""
+
+    def __init__(self, columns):
+        self.columns = columns
+        self.requests = []
+
+    def get_ohlcv(self, symbol, start, end, interval='1d'):
+        self.requests.append((start, end))
+        start = datetime.fromisoformat(start) if isinstance(start, str) else start
+        end = datetime.fromisoformat(end) if isinstance(end, str) else end
+        ts = self.columns['timestamp']
+        keep = (ts >= epoch_ns_array([start])[0]) & (ts < epoch_ns_array([end])[0])
+        return {k: v[keep] for k, v in self.columns.items()}
+
+
+def test_engine_tops_up_history_store(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    engine = BacktestEngine(feed=StaticFeed(), history=store)
+    engine._yahoo = FakeYahoo(to_columns(make_price_data(100)))
+
+    first = engine.load_history('SPY', '2020-01-01', '2020-02-20')
+    assert len(first['close']) == 50
+    assert engine.load_history('SPY', '2020-01-11', '2020-02-20')['close'][0] == first['close'][10]
+    assert len(engine._yahoo.requests) == 1
+
+    later = engine.load_history('SPY', '2020-01-01', '2020-03-01')
+    assert len(later['close']) == 60
+    assert engine._yahoo.requests[-1][0] > datetime(2020, 2, 19)
+
+    with pytest.raises(ValueError, match='Strict Real Data'):
+        engine.load_history('SPY', '2019-01-01', '2019-06-01')
+
+
+def test_prepend_backfills_older_bars(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    columns = to_columns(make_price_data(100))
+    store.append('SPY', {k: v[40:] for k, v in columns.items()})
+    view = store.load('SPY')
+
+    assert store.prepend('SPY', {k: v[:50] for k, v in columns.items()}) == 40
+    assert store.prepend('SPY', columns) == 0
+    loaded = store.load('SPY')
+    for name, column in columns.items():
+        assert (loaded[name] == column).all()
+    # Views taken before the rewrite still see the bars they had
+    assert (view['close'] == columns['close'][40:]).all()
+    assert store.coverage('SPY') == (int(columns['timestamp'][0]), int(columns['timestamp'][-1]) + 1)
+
+
+def test_engine_backfills_history_before_the_stored_range(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    engine = BacktestEngine(feed=StaticFeed(), history=store)
+    engine._yahoo = FakeYahoo(to_columns(make_price_data(100)))
+
+    assert len(engine.load_history('SPY', '2020-02-01', '2020-03-01')['close']) == 29
+    window = engine.load_history('SPY', '2020-01-01', '2020-02-05')
+    assert len(window['close']) == 35
+    assert engine._yahoo.requests[-1] == (datetime(2020, 1, 1), datetime(2020, 2, 1))
+    assert store.count('SPY') == 60
+
+
+def test_engine_does_not_refetch_ranges_without_bars(tmp_path):
+    """End dates past the last bar (weekends, holidays) are only asked for once"""
+    store = HistoryStore(str(tmp_path))
+    engine = BacktestEngine(feed=StaticFeed(), history=store)
+    engine._yahoo = FakeYahoo(to_columns(make_price_data(100)))
+
+    for _ in range(3):
+        assert len(engine.load_history('SPY', '2020-03-01', '2020-05-01')['close']) == 40
+    assert len(engine._yahoo.requests) == 1
+
+
+def test_default_fetch_runs_without_numpy(monkeypatch):
+    """Without NumPy get_ohlcv returns lists and the per-bar loop runs on them"""
+    price_data = make_price_data(120)
+    lists = {name: values.tolist() for name, values in to_columns(price_data).items()}
+
+    class ListYahoo:
+        def get_ohlcv(self, symbol, start, end, interval='1d'):
+            return lists
+
+    expected = make_engine().run_backtest('trend_follower', 'SPY', '2020-01-01', '2020-04-30', price_data=price_data)
+    monkeypatch.setattr(backtest_vectorized, 'np', None)
+    engine = make_engine()
+    engine._yahoo = ListYahoo()
+
+    assert engine._fetch_real_historical_data('SPY', '2020-01-01', '2020-04-30') == price_data
+    result = engine.run_backtest('trend_follower', 'SPY', '2020-01-01', '2020-04-30')
+    assert result.total_trades == expected.total_trades
+    assert result.total_return == expected.total_return
+
+
+@pytest.mark.parametrize('strategy_name', ['trend_follower', 'multi_agent'])
+def test_streamed_chunks_match_materialized_run(tmp_path, strategy_name):
+    store = HistoryStore(str(tmp_path))
+    price_data = make_price_data(600)
+    store.append('SPY', to_columns(price_data))
+
+    expected = make_engine().run_backtest(strategy_name, 'SPY', '', '', price_data=price_data)
+    chunks = store.iter_chunks('SPY', chunk_bars=64)
+    streamed = make_engine().run_backtest(strategy_name, 'SPY', '', '', price_data=chunks)
+
+    assert streamed.trades == expected.trades
+    assert len(streamed.equity_curve) == 0
+    for name, value in expected.summary().items():
+        assert getattr(streamed, name) == pytest.approx(value, abs=0.011), name
+
+    # Bar-dict chunks from a generator work the same way
+    generator = (price_data[i:i + 100] for i in range(0, 600, 100))
+    assert make_engine().run_backtest(strategy_name, 'SPY', '', '', price_data=generator).trades == expected.trades
+
+    with pytest.raises(ValueError, match='Streamed'):
+        make_engine().run_backtest(strategy_name, 'SPY', '', '', price_data=iter([]), vectorized=True)
@@ -0,0 +1,108 @@
+"""
+Test suite for the LLM response cache.
+Stand-in Kimi and Gemini clients; no network calls.
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+from llm_cache import LLMCache, canonicalize, prompt_fingerprint
+from orchestrator.battle_manager import BattleManager
+from test_backtest_engine import GRAHAM_BUY_SNAPSHOT, StaticFeed
+from test_strategy_evaluator import SlowKimi, make_evaluator
+
+
+def test_fingerprint_ignores_noise_but_not_data():
+    fund = {'price_to_book': 0.812345678, 'timestamp': '2025-01-01T00:00:00'}
+    key = prompt_fingerprint('moonshot-v1-8k', 0.3, asset='BTC', fundamentals=fund)
+    refetched = {'timestamp': '2025-01-01T00:05:00', 'price_to_book': 0.812349}
+    assert prompt_fingerprint('moonshot-v1-8k', 0.3, asset='BTC', fundamentals=refetched) == key
+
+    assert prompt_fingerprint('moonshot-v1-8k', 0.3, asset='BTC', fundamentals={'price_to_book': 0.85}) != key
+    assert prompt_fingerprint('moonshot-v1-8k', 0.7, asset='BTC', fundamentals=fund) != key
+    assert prompt_fingerprint('moonshot-v1-32k', 0.3, asset='BTC', fundamentals=fund) != key
+    assert canonicalize({'x': (1.23456, float('nan')), 'ok': True}) == {'x': [1.235, 'nan'], 'ok': True}
+
+
+def test_ttl_and_lru_eviction():
+    cache = LLMCache(max_entries=2, ttl_seconds=60)
+    cache.put('a', 'A')
+    cache.put('b', 'B')
+    assert cache.get('a') == 'A'  # a is now the most recent
+    cache.put('c', 'C')
+    assert cache.get('b') is None
+    assert cache.get('a') == 'A' and cache.get('c') == 'C'
+
+    cache.put('short', 'S', ttl_seconds=0.05)
+    time.sleep(0.1)
+    assert cache.get('short') is None
+
+    stats = cache.stats()
+    assert stats['hits'] == 3 and stats['misses'] == 2
+    assert stats['hit_rate'] == 0.6
+    assert stats['evictions'] == 2 and stats['entries'] == 1
+
+
+def test_disk_tier_outlives_the_process_cache(tmp_path):
+    path = str(tmp_path / 'llm.db')
+    first = LLMCache(path=path)
+    first.put('k', {'summary': 'Cheap and safe.'})
+    first.put('old', 'stale', ttl_seconds=-1)
+    first.close()
+
+    second = LLMCache(path=path)
+    assert second.get('k') == {'summary': 'Cheap and safe.'}
+    assert second.get('old') is None
+    assert second.get('k') == {'summary': 'Cheap and safe.'}  # now from memory
+    stats = second.stats()
+    assert (stats['hits'], stats['disk_hits'], stats['misses']) == (2, 1, 1)
+    assert stats['disk_entries'] == 1
+
+
+def test_kimi_research_is_reused_for_unchanged_inputs():
+    kimi = SlowKimi(delay=0)
+    evaluator = make_evaluator(StaticFeed(GRAHAM_BUY_SNAPSHOT))
+    evaluator.kimi_client = kimi
+    data = {'fundamentals': {'price_to_book': 0.8, 'timestamp': 'a'}, 'events': {}, 'onchain': {}}
+
+    assert evaluator._generate_kimi_research('AAPL', 'BUY', data) == 'Cheap and safe.'
+    refetched = {**data, 'fundamentals': {'price_to_book': 0.8, 'timestamp': 'b'}}
+    assert evaluator._generate_kimi_research('AAPL', 'BUY', refetched) == 'Cheap and safe.'
+    assert kimi.calls == 1
+    evaluator._generate_kimi_research('AAPL', 'SELL', refetched)
+    assert kimi.calls == 2
+
+    # Failures are not cached
+    evaluator.kimi_client = None
+    assert evaluator._generate_kimi_research('MSFT', 'BUY', data) == 'Research unavailable'
+    assert evaluator.research_cache.get(evaluator._research_key(
+        'MSFT', 'BUY', data, evaluator._research_request('MSFT', 'BUY', data)
+    )) is None
+    assert evaluator.research_cache.stats()['hits'] == 1
+
+
+def test_battle_explanations_are_reused_across_rounds():
+    calls = []
+
+    def generate_content(model, contents):
+        calls.append(contents)
+        return SimpleNamespace(text=' Momentum won. ')
+
+    manager = BattleManager([SimpleNamespace(name='TrendFollower')])
+    manager.llm_enabled = True
+    manager.gemini_model = 'gemini-2.0-flash'
+    manager.gemini_client = SimpleNamespace(models=SimpleNamespace(generate_content=generate_content))
+    winner = SimpleNamespace(agent_name='TrendFollower', reason='Breakout', confidence=0.8)
+    events = {'recession': {'yes_probability': 0.2}}
+
+    for epoch, price in ((1, 100.0), (2, 100.001)):
+        manager.current_epoch = epoch
+        explanation = asyncio.run(manager._generate_explanation(
+            winner, [winner], {'symbol': 'BTC', 'price': price}, events
+        ))
+        assert explanation == 'Momentum won.'
+    assert len(calls) == 1
+
+    asyncio.run(manager._generate_explanation(winner, [winner], {'symbol': 'BTC', 'price': 120.0}, events))
+    assert len(calls) == 2
@@ -0,0 +1,57 @@
+"""
+Test suite for Monte Carlo resampling of backtest results.
+"""
+
+import pytest
+
+import monte_carlo
+from monte_carlo import MonteCarloSimulator, _path_metrics, bar_returns, trip_growth
+from test_backtest_engine import make_engine, make_price_data
+
+
+@pytest.fixture(scope='module')
+def result():
+    price_data = make_price_data(600)
+    return make_engine().run_backtest('trend_follower', 'SPY', '', '', price_data=price_data)
+
+
+def test_trip_growth_rebuilds_the_equity_path(result):
+    growth = trip_growth(result)
+    assert len(growth) == result.total_trades
+    assert 100000.0 * growth.prod() == pytest.approx(result.equity_curve.values[-1])
+
+    # The unshuffled path reproduces the observed metrics
+    metrics = _path_metrics(bar_returns(result)[None, :] + 1, 252)
+    assert metrics['total_return'][0] == pytest.approx(result.total_return, abs=0.01)
+    assert metrics['max_drawdown'][0] == pytest.approx(result.max_drawdown, abs=0.01)
+    assert metrics['sharpe_ratio'][0] == pytest.approx(result.sharpe_ratio, abs=0.01)
+
+
+@pytest.mark.parametrize('method, block_size', [('trades', 1), ('returns', 1), ('returns', 5)])
+def test_distribution_and_intervals(result, method, block_size):
+    mc = MonteCarloSimulator(n_resamples=2000, method=method, block_size=block_size, seed=1, max_workers=1).run(result)
+
+    for metric in monte_carlo.METRICS:
+        assert len(mc.samples[metric]) == 2000
+        low, high = mc.confidence_interval(metric)
+        assert low < high
+    summary = mc.summary()
+    assert summary['max_drawdown']['observed'] == result.max_drawdown
+    assert summary['max_drawdown']['ci_low'] >= 0
+    assert 0.0 <= mc.probability('total_return', 0.0) <= 1.0
+
+
+def test_seeded_runs_do_not_depend_on_workers(result, monkeypatch):
+    monkeypatch.setattr(monte_carlo, 'CHUNK_CELLS', 20_000)  # force several chunks
+    serial = MonteCarloSimulator(n_resamples=500, method='returns', seed=7, max_workers=1).run(result)
+    pooled = MonteCarloSimulator(n_resamples=500, method='returns', seed=7, max_workers=2).run(result)
+
+    for metric in monte_carlo.METRICS:
+        assert (serial.samples[metric] == pooled.samples[metric]).all()
+
+
+def test_needs_trades():
+    flat = [dict(bar, price=50.0) for bar in make_price_data(50)]
+    empty = make_engine().run_backtest('trend_follower', 'SPY', '', '', price_data=flat)
+    with pytest.raises(ValueError, match='at least two'):
+        MonteCarloSimulator(n_resamples=10, max_workers=1).run(empty)
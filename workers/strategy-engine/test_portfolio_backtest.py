@@ -0,0 +1,129 @@
+"""
+Test suite for the multi-asset portfolio backtest.
+"""
+
+from datetime import timedelta
+
+import numpy as np
+import pytest
+
+from portfolio_backtest import PortfolioBacktester, align_on_clock, load_universe
+from test_backtest_engine import StaticFeed, make_engine, make_price_data
+
+
+def make_universe_data():
+    """Three symbols on overlapping but different calendars"""
+    spy = make_price_data(200, seed=1)
+    btc = make_price_data(230, seed=2)
+    eth = [{**bar, 'timestamp': bar['timestamp'] + timedelta(days=15)} for bar in make_price_data(180, seed=3)]
+    return {'SPY': spy, 'BTC': btc, 'ETH': eth}
+
+
+def test_load_universe():
+    universe = load_universe()
+    assert universe['symbols'] == ['SPY', 'BTC', 'ETH', 'NVDA']
+    assert universe['asset_classes']['BTC'] == 'crypto'
+    assert universe['max_position_size'] == 0.05
+
+
+def test_align_on_clock_forward_fills():
+    data = make_universe_data()
+    clock, prices, rows = align_on_clock(data, ['SPY', 'ETH'])
+
+    assert len(clock) == 200
+    assert list(rows['ETH'][:2]) == [15, 16]
+    # ETH has no price before its first bar and holds its last price after its last bar
+    assert all(p != p for p in prices[:15, 1])
+    assert (prices[195:, 1] == data['ETH'][-1]['price']).all()
+    assert (prices[:, 0] == [bar['price'] for bar in data['SPY']]).all()
+
+
+def test_single_symbol_matches_run_backtest():
+    """With the loop's 95% sizing a one-asset portfolio is the plain backtest"""
+    price_data = make_price_data(300)
+    result = PortfolioBacktester(max_position_size=0.95, max_workers=1, feed_factory=StaticFeed).run(
+        'trend_follower', '2020-01-01', '2020-10-27', price_data={'SPY': price_data}, symbols=['SPY']
+    )
+    expected = make_engine().run_backtest('trend_follower', 'SPY', '2020-01-01', '2020-10-27', price_data=price_data)
+
+    assert expected.total_trades > 0
+    assert result.total_return == expected.total_return
+    assert result.total_trades == expected.total_trades
+    assert result.max_drawdown == expected.max_drawdown
+    assert [(t.timestamp, t.action) for t in result.trades] == [(t.timestamp, t.action) for t in expected.trades]
+
+
+@pytest.mark.parametrize('vectorized', [False, True])
+def test_portfolio_ledger(vectorized):
+    data = make_universe_data()
+    serial = PortfolioBacktester(max_workers=1, feed_factory=StaticFeed, vectorized=vectorized).run(
+        'trend_follower', '2020-01-01', '2020-08-18', price_data=data, symbols=['SPY', 'BTC', 'ETH']
+    )
+    pooled = PortfolioBacktester(max_workers=3, feed_factory=StaticFeed, vectorized=vectorized).run(
+        'trend_follower', '2020-01-01', '2020-08-18', price_data=data, symbols=['SPY', 'BTC', 'ETH']
+    )
+
+    assert serial.summary() == pooled.summary()
+    assert len(serial.equity_curve) == 230
+    assert sum(s['total_trades'] for s in serial.per_symbol.values()) == serial.total_trades
+    assert all(s['total_trades'] > 0 for s in serial.per_symbol.values())
+
+    # Every entry is capped at 5% of equity at the time
+    equity = dict(serial.equity_curve)
+    for trade in serial.trades:
+        if trade.action == 'BUY':
+            assert trade.price * trade.quantity <= 0.05 * equity[trade.timestamp] + 1e-6
+
+
+def test_exposure_is_a_fraction_of_bars_with_overlapping_positions():
+    # Three assets held over the same 9 of 10 bars: 0.9, not 2.7
+    overlapping = {'entry': np.array([0, 0, 0]), 'exit': np.array([9, 9, 9])}
+    assert PortfolioBacktester._exposure(overlapping, 10) == 0.9
+    assert PortfolioBacktester._exposure({'entry': np.array([0, 5]), 'exit': np.array([3, 8])}, 10) == 0.6
+
+    data = make_universe_data()
+    result = PortfolioBacktester(max_workers=1, feed_factory=StaticFeed, vectorized=True).run(
+        'trend_follower', '2020-01-01', '2020-08-18', price_data=data, symbols=['SPY', 'BTC', 'ETH']
+    )
+    ts = result.equity_curve.timestamps
+    trades = result.trades
+    exposed = np.zeros(len(ts), dtype=bool)
+    for i in range(0, len(trades), 2):
+        exposed[np.searchsorted(ts, trades.timestamps[i]):np.searchsorted(ts, trades.timestamps[i + 1])] = True
+    assert result.exposure == round(exposed.mean(), 4)
+
+
+def test_portfolio_trade_logs_compare_by_value():
+    data = make_universe_data()
+    first, second = (
+        PortfolioBacktester(max_workers=1, feed_factory=StaticFeed, vectorized=True).run(
+            'trend_follower', '2020-01-01', '2020-08-18', price_data=data, symbols=['SPY', 'BTC', 'ETH']
+        ).trades
+        for _ in range(2)
+    )
+    assert first == second
+    assert first == list(second)
+
+    second.assets = second.assets[::-1].copy()
+    assert first != second
+
+
+def test_fetches_crypto_as_usd_pairs_and_skips_missing_symbols(monkeypatch):
+    from backtest_engine import BacktestEngine
+
+    data = make_universe_data()
+    fetched = []
+
+    def fetch(self, symbol, start_date, end_date):
+        fetched.append(symbol)
+        if symbol == 'NVDA':
+            raise ValueError("Strict Real Data Only: Failed to fetch history.")
+        return data[symbol.replace('-USD', '')]
+    monkeypatch.setattr(BacktestEngine, '_fetch_real_historical_data', fetch)
+
+    result = PortfolioBacktester(max_workers=1, feed_factory=StaticFeed).run(
+        'trend_follower', '2020-01-01', '2020-08-18'
+    )
+
+    assert fetched == ['SPY', 'BTC-USD', 'ETH-USD', 'NVDA']
+    assert result.symbols == ['SPY', 'BTC', 'ETH']
@@ -0,0 +1,88 @@
+"""
+Test suite for ResearchQueue.
+Stand-in generate functions; no Kimi calls.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from research_queue import FAILED, PENDING, READY, ResearchQueue
+
+
+def slow_generate(delay=0.2):
+    def generate(asset, decision, data):
+        time.sleep(delay)
+        return f"{asset} {decision}: {data['note']}"
+    return generate
+
+
+def test_submit_returns_before_generation():
+    queue = ResearchQueue(slow_generate(0.5))
+    start = time.perf_counter()
+    ticket_id = queue.submit('AAPL', 'BUY', {'note': 'cheap'})
+    assert time.perf_counter() - start < 0.1
+    assert queue.get(ticket_id).status == PENDING
+
+    ticket = queue.wait(ticket_id, timeout=5)
+    assert ticket.status == READY
+    assert ticket.summary == 'AAPL BUY: cheap'
+    assert ticket.completed_at >= ticket.created_at
+    assert queue.stats() == {PENDING: 0, READY: 1, FAILED: 0}
+
+
+def test_wait_times_out_on_pending_ticket():
+    queue = ResearchQueue(slow_generate(0.5))
+    ticket_id = queue.submit('AAPL', 'BUY', {'note': 'cheap'})
+    with pytest.raises(TimeoutError):
+        queue.wait(ticket_id, timeout=0.05)
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(queue.wait_async(ticket_id, timeout=0.05))
+    # The timed-out waiters did not cancel the work
+    assert asyncio.run(queue.wait_async(ticket_id, timeout=5)).status == READY
+
+
+def test_finished_tickets_are_pushed():
+    queue = ResearchQueue(slow_generate(0.05))
+    pushed, ready = [], []
+    done = threading.Event()
+
+    def subscriber(ticket):
+        pushed.append(ticket.ticket_id)
+        if len(pushed) == 3:
+            done.set()
+
+    queue.subscribe(subscriber)
+    ids = [queue.submit(f'SYM{i}', 'SELL', {'note': 'rich'}) for i in range(2)]
+    ids.append(queue.submit('BTC', 'BUY', {'note': 'cheap'}, on_ready=lambda t: ready.append(t.summary)))
+    assert done.wait(5)
+    assert sorted(pushed) == sorted(ids)
+    queue.wait(ids[-1], timeout=5)
+    assert ready == ['BTC BUY: cheap']
+
+
+def test_generation_errors_fail_the_ticket():
+    def broken(asset, decision, data):
+        raise RuntimeError('rate limited')
+
+    queue = ResearchQueue(broken)
+    seen = []
+    queue.subscribe(seen.append)
+    queue.subscribe(lambda ticket: 1 / 0)  # a bad subscriber does not break the queue
+    ticket = queue.wait(queue.submit('AAPL', 'BUY', {}), timeout=5)
+    assert ticket.status == FAILED
+    assert ticket.error == 'rate limited'
+    assert seen == [ticket]
+
+
+def test_oldest_finished_tickets_are_evicted():
+    queue = ResearchQueue(lambda asset, decision, data: 'ok', max_tickets=3)
+    ids = []
+    for i in range(5):
+        ids.append(queue.submit(f'SYM{i}', 'HOLD', {}))
+        queue.wait(ids[-1], timeout=5)
+    assert [queue.get(t) is not None for t in ids] == [False, False, True, True, True]
+    assert queue.get('unknown') is None
+    assert queue.wait('unknown') is None
@@ -0,0 +1,105 @@
+"""
+Test suite for the columnar YAML rule backtester.
+"""
+
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from rule_backtest import evaluate_rules, run_rule_backtest
+from strategy_parser import StrategyParser
+
+GRAHAM_YAML = os.path.join(
+    os.path.dirname(__file__), '..', '..', 'strategies', 'examples', 'graham_defensive.yaml'
+)
+
+
+def make_metric_table(n_rows, seed=11):
+    rng = np.random.default_rng(seed)
+    table = {
+        'timestamp': [datetime(2018, 1, 1) + timedelta(days=i) for i in range(n_rows)],
+        'price': 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n_rows))),
+        'price_to_book': rng.uniform(0.8, 2.2, n_rows),
+        'price_to_sales': rng.uniform(1.0, 4.0, n_rows),
+        'us_recession_2025_odds': rng.uniform(0.0, 0.5, n_rows),
+        'major_conflict_2025_odds': rng.uniform(0.0, 0.3, n_rows),
+        'rsi_14': rng.uniform(10, 90, n_rows),
+    }
+    table['rsi_14'][::17] = np.nan
+    return table
+
+
+def test_rules_match_row_by_row_evaluation():
+    strategy = StrategyParser.parse_yaml_file(GRAHAM_YAML)
+    table = make_metric_table(500)
+    frame = evaluate_rules(strategy, table)
+
+    for row in range(500):
+        passed = 0
+        for rule in strategy.rules:
+            data = {
+                c.metric: table[c.metric][row] for c in rule.conditions
+                if not np.isnan(table[c.metric][row])
+            }
+            rule_passed, _ = rule.evaluate(data)
+            assert frame.rule_passed[rule.id][row] == rule_passed
+            passed += rule_passed
+        assert frame.passed_count[row] == passed
+        assert frame.signal[row] == (passed >= strategy.execution.require_confirmations)
+
+
+def test_missing_metric_fails_its_rule_and_qualified_column_wins():
+    strategy = StrategyParser.parse_yaml_file(GRAHAM_YAML)
+    table = make_metric_table(50)
+    del table['rsi_14']
+    table['polymarket.us_recession_2025_odds'] = np.zeros(50)
+    table['us_recession_2025_odds'] = np.ones(50)
+    frame = evaluate_rules(strategy, table)
+
+    assert not frame.rule_passed['technical_confirmation'].any()
+    assert (frame.rule_passed['macro_risk_filter'] == (table['major_conflict_2025_odds'] < 0.15)).all()
+
+
+def test_fills_follow_signal_with_position_size():
+    strategy = StrategyParser.parse_yaml_file(GRAHAM_YAML)
+    table = make_metric_table(1000)
+    signal = evaluate_rules(strategy, table).signal
+    result = run_rule_backtest(strategy, table, initial_capital=100000.0)
+
+    assert result.symbol == 'AAPL'
+    assert (result.start_date, result.end_date) == ('2018-01-01', '2020-09-26')
+    assert len(result.equity_curve) == 1000
+
+    # Per-row reference ledger: long position_size of capital while confirmed
+    capital, quantity, entry, pnls = 100000.0, 0.0, 0.0, []
+    for price, on in zip(table['price'], signal):
+        if on and quantity == 0:
+            quantity = capital * strategy.execution.position_size / price
+            capital -= quantity * price
+            entry = price
+        elif not on and quantity > 0:
+            capital += quantity * price
+            pnls.append((price - entry) * quantity)
+            quantity = 0.0
+    if quantity > 0:
+        capital += quantity * table['price'][-1]
+        pnls.append((table['price'][-1] - entry) * quantity)
+
+    assert result.total_trades == len(pnls)
+    assert result.equity_curve.values[-1] == pytest.approx(capital)
+    assert [t.pnl for t in result.trades if t.action == 'SELL'] == pytest.approx(pnls)
+
+
+def test_numeric_timestamps_need_a_unit():
+    strategy = StrategyParser.parse_yaml_file(GRAHAM_YAML)
+    table = make_metric_table(200)
+    expected = run_rule_backtest(strategy, table)
+
+    seconds = np.array([int((t - datetime(1970, 1, 1)).total_seconds()) for t in table['timestamp']])
+    with pytest.raises(ValueError):
+        run_rule_backtest(strategy, dict(table, timestamp=seconds))
+    result = run_rule_backtest(strategy, dict(table, timestamp=seconds), unit='s')
+    assert result.summary() == expected.summary()
+    assert result.trades == expected.trades
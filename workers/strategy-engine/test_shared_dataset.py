@@ -0,0 +1,77 @@
+"""
+Test suite for shared-memory price datasets.
+"""
+
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from backtest_vectorized import load_price_arrays
+from shared_dataset import DatasetHandle, SharedDataset, attach_price_data, shared_price_data
+import backtest_engine
+from backtest_checkpoint import BacktestCheckpoint
+from backtest_engine import BacktestEngine
+from test_backtest_engine import CrashingFeed, SimulatedCrash, make_engine, make_price_data
+
+
+def _worker_sum(handle):
+    columns = handle.attach()
+    return float(columns['price'].sum()), columns['price'].flags.writeable
+
+
+def test_workers_attach_one_copy():
+    price_data = make_price_data(1000)
+    expected = load_price_arrays(price_data)
+
+    with SharedDataset(price_data) as dataset:
+        # Workers only receive the block name and layout
+        assert len(pickle.dumps(dataset.handle)) < 500
+        assert dataset.nbytes == 6 * 8 * 1000
+
+        columns = dataset.handle.attach()
+        for name, column in expected.items():
+            assert (columns[name] == column).all()
+
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            results = list(pool.map(_worker_sum, [dataset.handle] * 4))
+        assert results == [(float(expected['price'].sum()), False)] * 4
+
+
+def test_shared_price_data_per_symbol():
+    data = {'SPY': make_price_data(50, seed=1), 'BTC': make_price_data(80, seed=2)}
+    with shared_price_data(data) as shared:
+        assert all(isinstance(handle, DatasetHandle) for handle in shared.values())
+        attached = attach_price_data(shared)
+        assert len(attached['SPY']['price']) == 50
+        assert attached['BTC']['price'][-1] == pytest.approx(data['BTC'][-1]['price'])
+
+    with shared_price_data([]) as shared:
+        assert shared == []
+
+
+def test_per_bar_loop_streams_attached_columns(tmp_path, monkeypatch):
+    price_data = make_price_data(300)
+    expected = make_engine().run_backtest('trend_follower', 'SPY', '', '', price_data=price_data)
+
+    def whole_series(columns):
+        raise AssertionError("attached columns were expanded into one list of bar dicts")
+    monkeypatch.setattr(backtest_engine, 'price_bars', whole_series)
+
+    with SharedDataset(price_data) as dataset:
+        columns = dataset.handle.attach()
+        result = make_engine().run_backtest('trend_follower', 'SPY', '', '', price_data=columns)
+        assert result.summary() == expected.summary()
+        assert result.trades == expected.trades
+        assert result.equity_curve == expected.equity_curve
+
+        # Resuming from a checkpoint also picks up mid-way through the columns
+        checkpoint = BacktestCheckpoint(str(tmp_path / 'run.ckpt'), every_bars=50)
+        crashing = BacktestEngine(initial_capital=100000.0, feed=CrashingFeed(crash_after=175))
+        with pytest.raises(SimulatedCrash):
+            crashing.run_backtest('trend_follower', 'SPY', '', '', price_data=columns, checkpoint=checkpoint)
+        resumed = BacktestEngine(initial_capital=100000.0, feed=CrashingFeed(crash_after=150)).run_backtest(
+            'trend_follower', 'SPY', '', '', price_data=columns, checkpoint=checkpoint
+        )
+        assert resumed.summary() == expected.summary()
+        assert resumed.equity_curve == expected.equity_curve
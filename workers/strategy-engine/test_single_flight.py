@@ -0,0 +1,96 @@
+"""
+Test suite for single-flight coalescing of upstream fetches.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from market_data.single_flight import SingleFlight
+from test_strategy_evaluator import make_counting_feed
+
+
+def test_identical_calls_share_one_fetch():
+    flights = SingleFlight(ThreadPoolExecutor(max_workers=4))
+    calls = []
+
+    def fetch(symbol):
+        calls.append(symbol)
+        time.sleep(0.2)
+        return {'symbol': symbol}
+
+    futures = [flights.submit(('fundamentals', 'BTC'), fetch, 'BTC') for _ in range(25)]
+    other = flights.submit(('fundamentals', 'ETH'), fetch, 'ETH')
+    assert all(f.result() == {'symbol': 'BTC'} for f in futures)
+    assert other.result() == {'symbol': 'ETH'}
+    assert sorted(calls) == ['BTC', 'ETH']
+    assert flights.stats() == {'calls': 26, 'coalesced': 24, 'in_flight': 0}
+
+    # Completed fetches are not cached
+    flights.submit(('fundamentals', 'BTC'), fetch, 'BTC').result()
+    assert calls.count('BTC') == 2
+
+
+def test_failure_reaches_every_waiter_and_is_not_kept():
+    flights = SingleFlight(ThreadPoolExecutor(max_workers=2))
+    gate = threading.Event()
+
+    def failing():
+        gate.wait()
+        raise ConnectionError('upstream down')
+
+    futures = [flights.submit('events', failing) for _ in range(5)]
+    gate.set()
+    for future in futures:
+        with pytest.raises(ConnectionError):
+            future.result()
+    assert flights.submit('events', lambda: 'recovered').result() == 'recovered'
+
+
+def test_coroutine_fetches_share_one_flight_with_threads():
+    flights = SingleFlight(ThreadPoolExecutor(max_workers=2))
+    calls = []
+
+    async def fetch(symbol):
+        calls.append(symbol)
+        await asyncio.sleep(0.2)
+        return {'symbol': symbol}
+
+    async def failing():
+        raise ConnectionError('upstream down')
+
+    async def callers():
+        futures = [flights.submit_async(('fundamentals', 'BTC'), fetch, 'BTC') for _ in range(10)]
+        # A blocking caller on another thread joins the same flight
+        threaded = asyncio.get_running_loop().run_in_executor(
+            None, lambda: flights.submit(('fundamentals', 'BTC'), lambda: 'never runs').result()
+        )
+        results = await asyncio.gather(*(asyncio.wrap_future(f) for f in futures), threaded)
+        with pytest.raises(ConnectionError):
+            await asyncio.wrap_future(flights.submit_async('events', failing))
+        return results
+
+    results = asyncio.run(callers())
+    assert results == [{'symbol': 'BTC'}] * 11
+    assert calls == ['BTC']
+    assert flights.stats() == {'calls': 12, 'coalesced': 10, 'in_flight': 0}
+
+
+def test_refresh_storm_hits_each_upstream_once():
+    feed, calls = make_counting_feed(delay=0.2)
+    config = {'recession': 'will-the-us-enter-a-recession-in-2025'}
+    requests = ThreadPoolExecutor(max_workers=10)
+
+    async def storm():
+        # Dashboard, research page and a scheduled job, many times over
+        loop = asyncio.get_running_loop()
+        threaded = [loop.run_in_executor(requests, feed.get_unified_data, 'AAPL', {}, config) for _ in range(10)]
+        native = [feed.get_unified_data_async('AAPL', {}, config) for _ in range(10)]
+        return await asyncio.gather(*threaded, *native)
+
+    results = asyncio.run(storm())
+    assert calls == {'events': 1, 'fundamentals': 1}
+    assert all(r['fundamentals'] == results[0]['fundamentals'] for r in results)
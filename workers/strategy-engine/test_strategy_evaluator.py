@@ -0,0 +1,295 @@
+"""
+Test suite for the async evaluation path.
+Runs offline with stand-in feeds and a stand-in Kimi client.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import strategy_evaluator
+from backtest_engine import BacktestEngine
+from market_data import multi_source_feed
+from market_data.multi_source_feed import MultiSourceDataFeed
+from research_queue import READY, ResearchQueue
+from strategy_evaluator import StrategyEvaluator
+from test_backtest_engine import GRAHAM_BUY_SNAPSHOT, StaticFeed, make_price_data
+
+
+class SlowAsyncFeed(StaticFeed):
+    """Unified data that takes `delay` seconds of network wait to arrive"""
+
+    def __init__(self, snapshot=None, delay=0.2):
+        super().__init__(snapshot)
+        self.delay = delay
+
+    async def get_unified_data_async(self, symbol, market_data, event_config=None):
+        await asyncio.sleep(self.delay)
+        return self.get_unified_data(symbol, market_data, event_config)
+
+
+class SlowKimi:
+    """OpenAI stand-in: chat.completions.create sleeps, then answers"""
+
+    def __init__(self, delay=0.2):
+        self.calls = 0
+        lock = threading.Lock()
+
+        def create(**request):
+            with lock:
+                self.calls += 1
+            time.sleep(delay)
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content='Cheap and safe.'))])
+
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=create))
+
+
+def stub_source(owner, name, fetch, delay=0.0):
+    """Replace a source's blocking fetch and its *_async twin with fetch, after delay seconds of network wait"""
+    def blocking(*args):
+        time.sleep(delay)
+        return fetch(*args)
+
+    async def awaitable(*args):
+        await asyncio.sleep(delay)
+        return fetch(*args)
+
+    setattr(owner, name, blocking)
+    setattr(owner, f'{name}_async', awaitable)
+
+
+def make_evaluator(feed):
+    evaluator = StrategyEvaluator(feed=feed)
+    evaluator.kimi_client = evaluator.research = None
+    return evaluator
+
+
+def with_kimi(evaluator, kimi, max_workers=4):
+    evaluator.kimi_client = kimi
+    evaluator.research = ResearchQueue(evaluator._generate_kimi_research, max_workers=max_workers)
+    return evaluator
+
+
+def test_async_evaluation_matches_sync():
+    evaluator = make_evaluator(StaticFeed(GRAHAM_BUY_SNAPSHOT))
+    expected = evaluator.evaluate_strategy('graham', 'AAPL', {'price': 100.0})
+    # StaticFeed has no async path, so it runs on the loop's executor
+    actual = asyncio.run(evaluator.evaluate_strategy_async('graham', 'AAPL', {'price': 100.0}))
+    assert actual.decision == expected.decision
+    assert actual.confidence == expected.confidence
+    assert actual.final_action == expected.final_action
+
+
+def test_concurrent_evaluations_share_one_loop():
+    kimi = SlowKimi(delay=0.2)
+    evaluator = with_kimi(make_evaluator(SlowAsyncFeed(GRAHAM_BUY_SNAPSHOT, delay=0.2)), kimi, max_workers=50)
+
+    async def serve(n):
+        return await asyncio.gather(*(
+            evaluator.evaluate_strategy_async('graham', f'SYM{i}', {'price': 100.0}) for i in range(n)
+        ))
+
+    start = time.perf_counter()
+    evaluations = asyncio.run(serve(200))
+    elapsed = time.perf_counter() - start
+
+    # 200 requests x 0.2s fetch serialized would take 40s; research is not awaited at all
+    assert elapsed < 1.5
+    assert all(e.research_ticket and e.research_summary is None for e in evaluations)
+
+    tickets = [evaluator.research.wait(e.research_ticket, timeout=10) for e in evaluations]
+    assert kimi.calls == 200
+    assert all(t.status == READY and t.summary == 'Cheap and safe.' for t in tickets)
+
+
+def test_decision_does_not_wait_for_research():
+    evaluator = with_kimi(make_evaluator(StaticFeed(GRAHAM_BUY_SNAPSHOT)), SlowKimi(delay=1.0))
+
+    start = time.perf_counter()
+    evaluation = evaluator.evaluate_strategy('graham', 'AAPL', {'price': 100.0})
+    assert time.perf_counter() - start < 0.5
+    assert evaluation.research_ticket is not None
+    assert evaluator.get_research(evaluation.research_ticket)['status'] == 'pending'
+
+    ticket = asyncio.run(evaluator.wait_for_research(evaluation.research_ticket, timeout=5))
+    assert ticket['status'] == 'ready'
+    assert ticket['summary'] == 'Cheap and safe.'
+    assert ticket['decision'] == evaluation.decision.value
+
+    # Research off: no ticket, same decision
+    plain = evaluator.evaluate_unified('graham', 'AAPL', {'fundamentals': {}}, research=False)
+    assert plain.research_ticket is None
+
+
+def test_backtests_never_queue_research():
+    kimi = SlowKimi(delay=0.0)
+    engine = BacktestEngine(initial_capital=100000.0, feed=StaticFeed(GRAHAM_BUY_SNAPSHOT))
+    with_kimi(engine.evaluator, kimi)
+    price_data = make_price_data(50)
+
+    engine.run_backtest('graham', 'SPY', '', '', price_data=price_data)
+    engine.run_backtests(['graham', 'event_driven'], 'SPY', '', '', price_data=price_data)
+    assert sum(engine.evaluator.research.stats().values()) == 0
+    assert kimi.calls == 0
+
+    # The same evaluator still queues research for a live signal
+    assert engine.evaluator.evaluate_strategy('graham', 'SPY', {'price': 100.0}).research_ticket is not None
+
+
+def test_research_needs_a_long_lived_process(monkeypatch):
+    monkeypatch.setattr(strategy_evaluator, 'OpenAI', lambda **kwargs: SlowKimi())
+    assert StrategyEvaluator(feed=StaticFeed(), api_key='key').research is not None
+
+    # Pyodide (Python Workers): tickets could not outlive the request
+    monkeypatch.setattr(sys, 'platform', 'emscripten')
+    evaluator = StrategyEvaluator(feed=StaticFeed(), api_key='key')
+    assert evaluator.research is None
+    assert evaluator.evaluate_strategy('graham', 'AAPL', {'price': 100.0}).research_ticket is None
+
+
+def test_multi_source_feed_awaits_sources_together():
+    feed = MultiSourceDataFeed(use_mock=True)
+    stub_source(feed.prediction_markets, 'get_events', lambda config: {'recession': {'yes_probability': 0.2}}, 0.3)
+    stub_source(feed.onchain, 'get_crypto_market_health', lambda symbol: {'source': 'onchain'}, 0.3)
+    stub_source(feed.fundamentals, 'get_value_metrics', lambda symbol: {'source': 'unavailable'}, 0.3)
+    stub_source(feed, '_calculate_technical_indicators', lambda market_data: {'signal': 'HOLD'}, 0.3)
+
+    async def fetch_with_heartbeat():
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        beat = asyncio.ensure_future(heartbeat())
+        unified = await feed.get_unified_data_async('BTC', {'price': 1.0}, {'recession': 'slug'})
+        beat.cancel()
+        return unified, ticks
+
+    start = time.perf_counter()
+    unified, ticks = asyncio.run(fetch_with_heartbeat())
+    assert time.perf_counter() - start < 1.0  # sources overlap
+    assert ticks > 10  # the loop kept running while they waited
+    sync = feed.get_unified_data('BTC', {'price': 1.0}, {'recession': 'slug'})
+    assert {k: v for k, v in unified.items() if k != 'timestamp'} == {k: v for k, v in sync.items() if k != 'timestamp'}
+
+
+def test_async_sources_await_httpx_without_threads():
+    httpx = pytest.importorskip('httpx')
+    seen = []
+
+    def respond(request):
+        seen.append(request.url.host)
+        path = request.url.path
+        if request.url.host == 'gamma-api.polymarket.com':
+            return httpx.Response(200, json={'question': 'Recession?', 'tokens': [
+                {'outcome': 'Yes', 'price': 0.2}, {'outcome': 'No', 'price': 0.8}]})
+        if path.startswith('/v2/historicalChainTvl/'):
+            return httpx.Response(200, json=[{'date': 1, 'tvl': 100.0}, {'date': 2, 'tvl': 120.0}])
+        if path.startswith('/v10/finance/quoteSummary/'):
+            return httpx.Response(200, json={'quoteSummary': {'result': [{
+                'defaultKeyStatistics': {'marketCap': {'raw': 600.0}},
+                'financialData': {'currentPrice': {'raw': 50.0}}}]}})
+        if path.startswith('/v8/finance/chart/'):
+            closes = [100.0 - i for i in range(20)]
+            return httpx.Response(200, json={'chart': {'result': [{'indicators': {'quote': [{'close': closes}]}}]}})
+        return httpx.Response(404)
+
+    feed = MultiSourceDataFeed(use_mock=False)
+    for clients in (feed.prediction_markets.polymarket.http, feed.onchain.defillama.http,
+                    feed.fundamentals.yahoo.http, feed.fundamentals.http):
+        clients.options['transport'] = httpx.MockTransport(respond)
+
+    unified = asyncio.run(feed.get_unified_data_async('BTC', {'price': 50.0}, {'recession': 'slug'}))
+    assert unified['events']['recession']['yes_probability'] == 0.2
+    assert unified['onchain']['interpretation']['sentiment'] == 'BULLISH'  # TVL +20%
+    assert unified['fundamentals']['price'] == 50.0
+    assert unified['fundamentals']['price_to_book'] == 5.0  # market cap / TVL
+    assert unified['technical']['signal'] == 'BUY'  # falling closes, RSI 0
+    assert set(seen) == {'gamma-api.polymarket.com', 'api.llama.fi', 'query2.finance.yahoo.com'}
+    assert not feed.executor._threads
+
+
+def test_hundreds_of_async_evaluations_keep_their_data(monkeypatch):
+    monkeypatch.setattr(multi_source_feed, 'SOURCE_TIMEOUT', 0.5)
+    feed = MultiSourceDataFeed(use_mock=True)
+    stub_source(feed.prediction_markets, 'get_events', lambda config: {'recession': {'yes_probability': 0.2}})
+    stub_source(feed.fundamentals, 'get_value_metrics',
+                lambda symbol: {'source': 'yahoo_finance', 'symbol': symbol}, 0.2)
+    stub_source(feed, '_calculate_technical_indicators', lambda market_data: {'signal': 'HOLD'})
+
+    async def serve(n):
+        return await asyncio.gather(*(
+            feed.get_unified_data_async(f'SYM{i}', {'price': 1.0}, {'recession': 'slug'}) for i in range(n)
+        ))
+
+    # 200 x 0.2s through 5 threads would be 8s; awaited on the loop they all fit in the timeout
+    start = time.perf_counter()
+    unified = asyncio.run(serve(200))
+    assert time.perf_counter() - start < 0.5
+    assert all(u['fundamentals'] == {'source': 'yahoo_finance', 'symbol': f'SYM{i}'} for i, u in enumerate(unified))
+    assert all(u['events'] for u in unified)
+    assert not feed.executor._threads  # the sync API's pool was never used
+
+
+def test_slow_source_does_not_empty_the_others(monkeypatch):
+    monkeypatch.setattr(multi_source_feed, 'SOURCE_TIMEOUT', 0.1)
+    feed = MultiSourceDataFeed(use_mock=True)
+    stub_source(feed.prediction_markets, 'get_events', lambda config: {'recession': {'yes_probability': 0.2}})
+    stub_source(feed.fundamentals, 'get_value_metrics', lambda symbol: {'source': 'late'}, 0.5)
+    stub_source(feed, '_calculate_technical_indicators', lambda market_data: {'signal': 'HOLD'})
+
+    for unified in (
+        asyncio.run(feed.get_unified_data_async('AAPL', {'price': 1.0}, {'recession': 'slug'})),
+        feed.get_unified_data('MSFT', {'price': 1.0}, {'recession': 'slug'}),
+    ):
+        assert unified['fundamentals'] == {}
+        assert unified['events'] == {'recession': {'yes_probability': 0.2}}
+        assert unified['technical'] == {'signal': 'HOLD'}
+
+
+def make_counting_feed(delay=0.0):
+    """MultiSourceDataFeed whose sources count calls instead of going to the network"""
+    feed = MultiSourceDataFeed(use_mock=True)
+    calls = {'events': 0, 'fundamentals': 0}
+
+    def get_events(event_config):
+        calls['events'] += 1
+        return {'recession': {'yes_probability': 0.1}}
+
+    def get_value_metrics(symbol):
+        calls['fundamentals'] += 1
+        return {'source': 'yahoo_finance', 'price_to_book': 0.8 if symbol.startswith('V') else 3.0,
+                'price_to_earnings': 9.0, 'debt_to_equity': 0.2}
+
+    stub_source(feed.prediction_markets, 'get_events', get_events, delay)
+    stub_source(feed.fundamentals, 'get_value_metrics', get_value_metrics, delay)
+    stub_source(feed.onchain, 'get_crypto_market_health', lambda symbol: {})
+    stub_source(feed, '_calculate_technical_indicators', lambda market_data: {'rsi_14': 28.0})
+    return feed, calls
+
+
+def test_evaluate_many_fetches_events_once():
+    feed, calls = make_counting_feed()
+    evaluator = make_evaluator(feed)
+    assets = [f'V{i}' for i in range(20)] + [f'X{i}' for i in range(20)] + ['V0']
+
+    batch = evaluator.evaluate_many('graham', assets)
+    assert list(batch) == list(dict.fromkeys(assets))
+    assert calls == {'events': 1, 'fundamentals': 40}
+
+    for asset in ('V3', 'X7'):
+        single = evaluator.evaluate_strategy('graham', asset)
+        assert batch[asset].decision == single.decision
+        assert batch[asset].confidence == single.confidence
+
+    calls.update(events=0, fundamentals=0)
+    batch_async = asyncio.run(evaluator.evaluate_many_async('graham', assets))
+    assert calls == {'events': 1, 'fundamentals': 40}
+    assert {a: e.decision for a, e in batch_async.items()} == {a: e.decision for a, e in batch.items()}
@@ -0,0 +1,276 @@
+"""
+Walk-forward optimization on top of the parameter sweep.
+
+The bar series is cut into rolling (or anchored) in-sample / out-of-sample
+windows. Each window's grid is optimized on its in-sample bars and the
+winning parameters are then scored on the following out-of-sample bars,
+which gives a performance estimate free of look-ahead. Windows are
+independent, so they run concurrently on the sweep's worker pool.
+"""
+import logging
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from backtest_columns import from_epoch_ns
+from backtest_engine import BacktestEngine
+from backtest_sweep import _run_one, _worker_state, expand_grid, rank_rows, run_in_pool
+
+logger = logging.getLogger(__name__)
+
+
+def split_windows(
+    n_bars: int,
+    in_sample: int,
+    out_of_sample: int,
+    step: Optional[int] = None,
+    anchored: bool = False
+) -> List[Tuple[Tuple[int, int], Tuple[int, int]]]:
+    """
+    Bar ranges for each walk-forward window.
+
+    Args:
+        n_bars: Length of the price series
+        in_sample: Bars used to optimize
+        out_of_sample: Bars used to score the optimized parameters
+        step: Bars to roll forward between windows (defaults to out_of_sample,
+              so out-of-sample segments tile the series without overlap)
+        anchored: Keep every in-sample range starting at bar 0 (expanding window)
+
+    Returns:
+        [((is_start, is_stop), (oos_start, oos_stop)), ...] as half-open ranges
+    """
+    if in_sample <= 0 or out_of_sample <= 0:
+        raise ValueError("in_sample and out_of_sample must be positive")
+    step = step or out_of_sample
+
+    windows = []
+    start = 0
+    while start + in_sample + out_of_sample <= n_bars:
+        is_stop = start + in_sample
+        windows.append(((0 if anchored else start, is_stop), (is_stop, is_stop + out_of_sample)))
+        start += step
+    return windows
+
+
+def _date_range(price_data: Union[List[Dict], Dict], bar_range: Tuple[int, int]) -> Tuple[str, str]:
+    """First and last bar dates of a range, as run_backtest's YYYY-MM-DD strings"""
+    def fmt(ts):
+        return ts.strftime('%Y-%m-%d') if isinstance(ts, datetime) else str(ts)
+
+    if isinstance(price_data, dict):
+        # Columns (e.g. attached shared memory): epoch-ns timestamps
+        ts = price_data['timestamp']
+        return fmt(from_epoch_ns(ts[bar_range[0]])), fmt(from_epoch_ns(ts[bar_range[1] - 1]))
+    return fmt(price_data[bar_range[0]]['timestamp']), fmt(price_data[bar_range[1] - 1]['timestamp'])
+
+
+def _run_window(
+    strategy_name: str,
+    symbol: str,
+    combinations: List[Dict[str, Any]],
+    in_sample: Tuple[int, int],
+    out_of_sample: Tuple[int, int],
+    vectorized: bool,
+    rank_by: str
+) -> Dict[str, Any]:
+    """Optimize one window on its in-sample bars, then score the winner out of sample"""
+    price_data = _worker_state['price_data']
+
+    is_start, is_end = _date_range(price_data, in_sample)
+    rows = []
+    for params in combinations:
+        try:
+            metrics = _run_one(strategy_name, symbol, is_start, is_end, params, vectorized, in_sample)
+            rows.append({'params': params, **metrics})
+        except Exception as e:
+            rows.append({'params': params, 'error': str(e)})
+    table = rank_rows(rows, rank_by)
+
+    best = table[0]
+    if 'error' in best:
+        raise ValueError(f"Every parameter set failed in sample: {best['error']}")
+
+    oos_start, oos_end = _date_range(price_data, out_of_sample)
+    oos_metrics = _run_one(
+        strategy_name, symbol, oos_start, oos_end, best['params'], vectorized, out_of_sample
+    )
+    return {
+        'best_params': best['params'],
+        'in_sample_metrics': {k: v for k, v in best.items() if k not in ('params', 'rank')},
+        'out_of_sample_metrics': oos_metrics
+    }
+
+
+@dataclass
+class WalkForwardWindow:
+    """One in-sample optimization and its out-of-sample score"""
+    index: int
+    in_sample: Tuple[int, int]
+    out_of_sample: Tuple[int, int]
+    best_params: Dict[str, Any] = field(default_factory=dict)
+    in_sample_metrics: Dict[str, Any] = field(default_factory=dict)
+    out_of_sample_metrics: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+@dataclass
+class WalkForwardResult:
+    """All windows of a walk-forward run plus out-of-sample aggregates"""
+    strategy_name: str
+    symbol: str
+    windows: List[WalkForwardWindow]
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Aggregate out-of-sample performance across the successful windows.
+
+        total_return compounds the per-window out-of-sample returns; the other
+        metrics are averaged. efficiency is mean OOS return over mean IS return.
+        """
+        ok = [w for w in self.windows if w.error is None]
+        if not ok:
+            return {'windows': len(self.windows), 'failed_windows': len(self.windows)}
+
+        compounded = 1.0
+        for w in ok:
+            compounded *= 1 + w.out_of_sample_metrics['total_return'] / 100
+
+        def mean(metrics_attr: str, key: str) -> float:
+            return sum(getattr(w, metrics_attr)[key] for w in ok) / len(ok)
+
+        is_return = mean('in_sample_metrics', 'total_return')
+        oos_return = mean('out_of_sample_metrics', 'total_return')
+        return {
+            'windows': len(self.windows),
+            'failed_windows': len(self.windows) - len(ok),
+            'total_return': round((compounded - 1) * 100, 2),
+            'avg_oos_return': round(oos_return, 2),
+            'avg_is_return': round(is_return, 2),
+            'avg_oos_sharpe': round(mean('out_of_sample_metrics', 'sharpe_ratio'), 2),
+            'worst_oos_drawdown': max(w.out_of_sample_metrics['max_drawdown'] for w in ok),
+            'efficiency': round(oos_return / is_return, 2) if is_return else 0.0
+        }
+
+
+class WalkForwardOptimizer:
+    """
+    Rolling in-sample optimization with out-of-sample scoring.
+
+    Example:
+        wfo = WalkForwardOptimizer(in_sample_bars=500, out_of_sample_bars=100,
+                                   feed_factory=partial(ReplayDataFeed.from_path, 'spy.db'))
+        result = wfo.run('trend_follower', 'SPY', '2015-01-01', '2024-12-31',
+                         {'fast_period': [5, 10, 20], 'slow_period': [50, 100]})
+        result.summary()['total_return']
+    """
+
+    def __init__(
+        self,
+        in_sample_bars: int,
+        out_of_sample_bars: int,
+        step_bars: Optional[int] = None,
+        anchored: bool = False,
+        initial_capital: float = 100000.0,
+        max_workers: Optional[int] = None,
+        feed_factory: Optional[Callable] = None,
+        vectorized: bool = False,
+        rank_by: str = 'sharpe_ratio',
+        quiet: bool = True,
+        cache_path: Optional[str] = None
+    ):
+        """
+        Args:
+            in_sample_bars: Bars per optimization window
+            out_of_sample_bars: Bars per scoring window
+            step_bars: Roll-forward distance (defaults to out_of_sample_bars)
+            anchored: Expanding in-sample window starting at the first bar
+            initial_capital: Starting capital for every run
+            max_workers: Worker processes (defaults to the CPU count); 1 runs in-process
+            feed_factory: Picklable zero-arg callable building each worker's feed
+            vectorized: Use the vectorized replay for every run
+            rank_by: Metric used to pick each window's parameters
+            quiet: Drop per-bar INFO logging inside workers
+            cache_path: BacktestCache file shared by the workers
+        """
+        self.in_sample_bars = in_sample_bars
+        self.out_of_sample_bars = out_of_sample_bars
+        self.step_bars = step_bars
+        self.anchored = anchored
+        self.initial_capital = initial_capital
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.feed_factory = feed_factory
+        self.vectorized = vectorized
+        self.rank_by = rank_by
+        self.quiet = quiet
+        self.cache_path = cache_path
+
+    def run(
+        self,
+        strategy_name: str,
+        symbol: str,
+        start_date: str,
+        end_date: str,
+        param_grid: Dict[str, List[Any]],
+        price_data: Optional[List[Dict]] = None
+    ) -> WalkForwardResult:
+        """
+        Optimize and score every window.
+
+        Args:
+            strategy_name: Strategy to test (e.g., 'graham', 'trend_follower')
+            symbol: Asset symbol
+            start_date: Start date (YYYY-MM-DD)
+            end_date: End date (YYYY-MM-DD)
+            param_grid: {param: [values]}; see backtest_sweep.apply_params
+            price_data: Optional historical price data (fetched once if omitted)
+
+        Returns:
+            WalkForwardResult with windows in chronological order
+        """
+        if price_data is None:
+            price_data = BacktestEngine(self.initial_capital)._fetch_real_historical_data(
+                symbol, start_date, end_date
+            )
+
+        splits = split_windows(
+            len(price_data), self.in_sample_bars, self.out_of_sample_bars,
+            self.step_bars, self.anchored
+        )
+        if not splits:
+            raise ValueError(
+                f"{len(price_data)} bars is too short for one "
+                f"{self.in_sample_bars}+{self.out_of_sample_bars} bar window"
+            )
+
+        combinations = expand_grid(param_grid)
+        logger.info(
+            f"Walk-forward {strategy_name} on {symbol}: {len(splits)} windows x "
+            f"{len(combinations)} parameter sets across {min(self.max_workers, len(splits))} workers"
+        )
+
+        initargs = (price_data, self.initial_capital, self.feed_factory, self.quiet, self.cache_path)
+        task_args = [
+            (strategy_name, symbol, combinations, is_range, oos_range, self.vectorized, self.rank_by)
+            for is_range, oos_range in splits
+        ]
+
+        windows = []
+        for args, outcome in run_in_pool(_run_window, task_args, initargs, self.max_workers):
+            window = WalkForwardWindow(
+                index=splits.index((args[3], args[4])),
+                in_sample=args[3],
+                out_of_sample=args[4]
+            )
+            if isinstance(outcome, Exception):
+                logger.error(f"Walk-forward window {window.index} failed: {outcome}")
+                window.error = str(outcome)
+            else:
+                window.best_params = outcome['best_params']
+                window.in_sample_metrics = outcome['in_sample_metrics']
+                window.out_of_sample_metrics = outcome['out_of_sample_metrics']
+            windows.append(window)
+
+        windows.sort(key=lambda w: w.index)
+        return WalkForwardResult(strategy_name=strategy_name, symbol=symbol, windows=windows)
@@ -1,6 +1,10 @@
 from js import Response
 from strategy_evaluator import get_evaluator
 import json
+import math
+
+# Largest batch POST /evaluate accepts; each asset fans out to several upstream sources
+MAX_BATCH_ASSETS = 100
 
 async def on_fetch(request, env):
     """
@@ -17,28 +21,62 @@ async def on_fetch(request, env):
 
     if method == "GET" and url.endswith("/evaluate"):
         # Default Graham evaluation
-        res = evaluator.evaluate_strategy("graham", "BTC")
+        res = await evaluator.evaluate_strategy_async("graham", "BTC")
         return Response.new(json.dumps(res.__dict__))
 
     if method == "POST" and url.endswith("/evaluate"):
         try:
             body = await request.json()
             strategy_name = body.get("strategy", "graham")
+            asset_class = body.get("asset_class", None)
+
+            # Batch: {"assets": [...], "market_data": {asset: {...}}}; shared sources are fetched once
+            assets = body.get("assets")
+            if assets is not None:
+                if (not isinstance(assets, list) or not 0 < len(assets) <= MAX_BATCH_ASSETS
+                        or not all(isinstance(a, str) and a for a in assets)):
+                    return Response.new(json.dumps(
+                        {"error": f"assets must be a list of 1-{MAX_BATCH_ASSETS} asset symbols"}
+                    ), status=400)
+                market_data = body.get("market_data", {})
+                if asset_class:
+                    market_data = {a: {**market_data.get(a, {}), 'asset_class': asset_class} for a in assets}
+                evaluations = await evaluator.evaluate_many_async(strategy_name, assets, market_data)
+                return Response.new(json.dumps({a: e.__dict__ for a, e in evaluations.items()}))
+
             asset = body.get("asset", "BTC")
             market_data = body.get("market_data", {})
-            asset_class = body.get("asset_class", None)
             
             # Inject asset class into market data context
             if asset_class:
                 market_data['asset_class'] = asset_class
             
-            evaluation = evaluator.evaluate_strategy(strategy_name, asset, market_data)
+            evaluation = await evaluator.evaluate_strategy_async(strategy_name, asset, market_data)
             
             # Serialize dataclass to dict
             return Response.new(json.dumps(evaluation.__dict__))
         except Exception as e:
             return Response.new(json.dumps({"error": str(e)}), status=400)
 
+    if method == "GET" and "/research/ticket" in url:
+        # Deferred Kimi summary: /research/ticket?id=<research_ticket>&wait=<seconds to long-poll>
+        from urllib.parse import parse_qs, urlparse
+        query = parse_qs(urlparse(url).query)
+        ticket_id = query.get('id', [''])[0]
+        if evaluator.research is None:
+            # No queue here: Python Workers isolates can't keep tickets (see research_queue)
+            return Response.new(json.dumps({"error": "Deferred research needs a long-lived strategy engine process"}), status=501)
+        try:
+            wait = float(query.get('wait', ['0'])[0])
+        except ValueError:
+            wait = float('nan')
+        if not math.isfinite(wait) or wait < 0:
+            return Response.new(json.dumps({"error": "wait must be a non-negative number of seconds"}), status=400)
+        ticket = await evaluator.wait_for_research(ticket_id, min(wait, 30.0)) if wait > 0 else evaluator.get_research(ticket_id)
+        if ticket is None:
+            return Response.new(json.dumps({"error": "Unknown research ticket"}), status=404)
+        return Response.new(json.dumps(ticket))
+
     if method == "GET" and "/research" in url:
         # Extract symbol from query params (e.g., /research/snapshot?symbol=BTC)
         # Basic parsing or assume it's in the URL path? URL parsing in Workers:
@@ -46,7 +84,7 @@ async def on_fetch(request, env):
         query = parse_qs(urlparse(url).query)
         symbol = query.get('symbol', ['BTC'])[0]
         
-        snapshot = evaluator.get_research_snapshot(symbol)
+        snapshot = await evaluator.get_research_snapshot_async(symbol)
         return Response.new(json.dumps(snapshot))
 
     if method == "GET" and "/health" in url: